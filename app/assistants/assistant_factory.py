@@ -1,35 +1,101 @@
 from app.services.api_integrations.calendar_integration import CalendarIntegration
 from app.services.api_integrations.travel_integration import TravelIntegration
 from app.services.api_integrations.gmail_integration import GmailIntegration
+from app.config.classifier_config import ClassifierConfig
 from app.config.assistant_config import AssistantConfig
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Tuple, List, Optional
+from app.config.settings import settings
+from utils.cache import TTLCache
 from utils.logger import logger
+import hashlib
+import json
+
+DEFAULT_MODEL = "gpt-4o-2024-08-06"
+CLASSIFIER_MODEL = "gpt-4o-mini"
+
+# Warm integrations keyed by (assistant name, user ID), shared across the container
+integration_pool = TTLCache(maxsize=settings.INTEGRATION_POOL_SIZE, ttl=settings.INTEGRATION_POOL_TTL)
 
 class AssistantFactory:
+    INTEGRATIONS = {
+        "TravelAssistant": TravelIntegration,
+        "CalendarAssistant": CalendarIntegration,
+        "GmailAssistant": GmailIntegration,
+        # Add other API integrations as they are created
+    }
+
     @staticmethod
     def get_assistant_name(category: str) -> str:
         return AssistantConfig.get_assistant_name(category)
-    
+
+    @staticmethod
+    def get_integration_class(name: str) -> Optional[type]:
+        return AssistantFactory.INTEGRATIONS.get(name)
+
     @staticmethod
     def get_api_integration(name: str, user_id: str) -> Any:
-        if name == "TravelAssistant":
-            return TravelIntegration()
-        elif name == "CalendarAssistant":
-            return CalendarIntegration(user_id)
-        elif name == "GmailAssistant":
-            return GmailIntegration(user_id)
-        # Add other API integrations as they are created
-        return None
+        """Return a pooled integration for the assistant and user, building it on first use"""
+        integration_class = AssistantFactory.get_integration_class(name)
+        if not integration_class:
+            return None
+
+        # Travel searches hold no per-user state, so all users share one instance
+        pool_key = (name, None if integration_class is TravelIntegration else user_id)
+        integration = integration_pool.get(pool_key)
+        if integration is not None:
+            if not integration.is_expired():
+                return integration
+            logger.info(f"Pooled {name} integration for user {user_id} expired, rebuilding")
+
+        if integration_class is TravelIntegration:
+            integration = TravelIntegration()
+        else:
+            integration = integration_class(user_id)
+        integration_pool.set(pool_key, integration)
+        return integration
+
+    @staticmethod
+    def invalidate_integrations(user_id: Optional[str] = None):
+        """Drop pooled integrations for one user, or all of them when no user is given"""
+        if user_id is None:
+            integration_pool.clear()
+            return
+        for key in integration_pool.keys():
+            if key[1] == user_id:
+                integration_pool.pop(key)
 
     @staticmethod
     def get_tools_for_assistant(name: str) -> Tuple[List[Dict[str, Any]], str]:
-        integration = AssistantFactory.get_api_integration(name)
-        if integration:
-            tools = integration.get_tools()
-            return tools, "gpt-4o-2024-08-06"
-        return [], "gpt-4o-2024-08-06"
+        if name == ClassifierConfig.ASSISTANT_NAME:
+            return [], CLASSIFIER_MODEL
+        integration_class = AssistantFactory.get_integration_class(name)
+        if integration_class:
+            return integration_class.get_tools(), DEFAULT_MODEL
+        return [], DEFAULT_MODEL
 
     @staticmethod
     def get_assistant_instructions(name: str) -> str:
-        integration = AssistantFactory.get_api_integration(name)
-        return integration.get_instructions() if integration else f"You are a {name}."
\ No newline at end of file
+        if name == ClassifierConfig.ASSISTANT_NAME:
+            return ClassifierConfig.SYSTEM_MESSAGE
+        integration_class = AssistantFactory.get_integration_class(name)
+        return integration_class.get_instructions() if integration_class else f"You are a {name}."
+
+    @staticmethod
+    def get_assistant_spec(name: str) -> Dict[str, Any]:
+        tools, model = AssistantFactory.get_tools_for_assistant(name)
+        return {
+            "name": name,
+            "instructions": AssistantFactory.get_assistant_instructions(name),
+            "tools": tools,
+            "model": model
+        }
+
+    @staticmethod
+    def compute_config_hash(spec: Dict[str, Any]) -> str:
+        """Stable hash of the fields that require an assistants.update when they change"""
+        payload = json.dumps(
+            {"instructions": spec["instructions"], "tools": spec["tools"], "model": spec["model"]},
+            sort_keys=True,
+            separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -1,70 +1,99 @@
+from app.assistants.assistant_registry import assistant_registry
 from app.assistants.assistant_factory import AssistantFactory
 from app.config.config_manager import ConfigManager
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Awaitable
 from app.config.settings import settings
 from utils.logger import logger
-from openai import OpenAI
+from app.openai_helper import get_async_openai_client
+from openai import AsyncOpenAI, NotFoundError
+import asyncio
 import time
 
+RUN_POLL_BACKOFF = 1.5
+
 class AssistantManager:
     def __init__(self, config_manager: ConfigManager):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        self._assistant_cache = {}
         self.config_manager = config_manager
+        # Shared by every AssistantManager in the container (Dispatcher, Classifier, sync)
+        self.registry = assistant_registry
 
-    async def list_assistants(self) -> Dict[str, str]:
-        response = self.client.beta.assistants.list()
-        return {assistant.name: assistant.id for assistant in response.data}
+    @property
+    def client(self) -> AsyncOpenAI:
+        return get_async_openai_client()
 
-    def retrieve_assistant(self, assistant_id: str) -> Any:
-        if assistant_id not in self._assistant_cache:
-            self._assistant_cache[assistant_id] = self.client.beta.assistants.retrieve(assistant_id)
-        return self._assistant_cache[assistant_id]
+    async def list_assistant_objects(self) -> List[Any]:
+        # Iterating the page follows pagination cursors past the first 100 assistants
+        return [assistant async for assistant in self.client.beta.assistants.list(limit=100)]
 
-    async def create_assistant(self, name: str, instructions: str, tools: List[Dict[str, Any]], model: str) -> Any:
-        return self.client.beta.assistants.create(
-            name=name,
-            instructions=instructions,
-            tools=tools,
-            model=model
-        )
+    async def list_assistants(self) -> Dict[str, str]:
+        assistants = await self.list_assistant_objects()
+        return {assistant.name: assistant.id for assistant in assistants}
+
+    async def retrieve_assistant(self, assistant_id: str) -> Any:
+        assistant = self.registry.get_assistant(assistant_id)
+        if assistant is None:
+            try:
+                assistant = await self.client.beta.assistants.retrieve(assistant_id)
+            except NotFoundError:
+                # Deleted or recreated remotely; the next lookup re-resolves the name
+                self.registry.invalidate_id(assistant_id)
+                raise
+            self.registry.set_assistant(assistant_id, assistant)
+        return assistant
+
+    async def create_assistant(self, name: str, instructions: str, tools: List[Dict[str, Any]], model: str,
+                               metadata: Optional[Dict[str, str]] = None) -> Any:
+        create_fields = {
+            "name": name,
+            "instructions": instructions,
+            "tools": tools,
+            "model": model
+        }
+        if metadata:
+            create_fields["metadata"] = metadata
+        assistant = await self.client.beta.assistants.create(**create_fields)
+        self.registry.set(name, assistant.id)
+        self.registry.set_assistant(assistant.id, assistant)
+        return assistant
 
     async def create_or_get_assistant(self, name: str) -> str:
-        assistants = await self.list_assistants()
-        assistant_id = assistants.get(name)
+        # Served from memory; the registry lists assistants only on a miss or in the background
+        assistant_id = await self.registry.resolve(name, self.list_assistants)
 
         if assistant_id:
             return assistant_id
 
-        tools, model = AssistantFactory.get_tools_for_assistant(name)
-        instructions = AssistantFactory.get_assistant_instructions(name)
-
+        spec = AssistantFactory.get_assistant_spec(name)
         assistant = await self.create_assistant(
             name=name,
-            instructions=instructions,
-            tools=tools,
-            model=model
+            instructions=spec["instructions"],
+            tools=spec["tools"],
+            model=spec["model"],
+            metadata={"config_hash": AssistantFactory.compute_config_hash(spec)}
         )
         return assistant.id
 
     async def update_assistant(self, assistant_id: str, name: Optional[str] = None, 
                                description: Optional[str] = None, instructions: Optional[str] = None, 
-                               tools: Optional[List[Dict[str, Any]]] = None) -> Any:
+                               tools: Optional[List[Dict[str, Any]]] = None, model: Optional[str] = None,
+                               metadata: Optional[Dict[str, str]] = None) -> Any:
         update_fields = {k: v for k, v in locals().items() if k != 'self' and v is not None}
         del update_fields['assistant_id']
-        updated_assistant = self.client.beta.assistants.update(assistant_id, **update_fields)
+        updated_assistant = await self.client.beta.assistants.update(assistant_id, **update_fields)
+        self.registry.set_assistant(assistant_id, updated_assistant)
         return updated_assistant
 
     async def delete_assistant(self, assistant_id: str) -> Any:
-        result = self.client.beta.assistants.delete(assistant_id)
+        result = await self.client.beta.assistants.delete(assistant_id)
+        self.registry.invalidate_id(assistant_id)
         return result
 
     async def create_thread(self) -> Any:
-        thread = self.client.beta.threads.create()
+        thread = await self.client.beta.threads.create()
         return thread
 
     async def create_message(self, thread_id: str, role: str, content: str) -> Any:
-        message = self.client.beta.threads.messages.create(
+        message = await self.client.beta.threads.messages.create(
             thread_id=thread_id,
             role=role,
             content=content
@@ -80,11 +109,11 @@ class AssistantManager:
             params["after"] = after
         if limit:
             params["limit"] = limit
-        response = self.client.beta.threads.messages.list(**params)
+        response = await self.client.beta.threads.messages.list(**params)
         return response
 
-    async def create_run(self, thread_id: str, assistant_id: str, instructions: Optional[str] = None) -> Any:
-        assistant = self.retrieve_assistant(assistant_id)
+    async def _build_run_params(self, thread_id: str, assistant_id: str, instructions: Optional[str] = None) -> Dict[str, Any]:
+        assistant = await self.retrieve_assistant(assistant_id)
         run_params = {
             "thread_id": thread_id,
             "assistant_id": assistant_id,
@@ -92,23 +121,68 @@ class AssistantManager:
         }
         if instructions:
             run_params["instructions"] = instructions
-        run = self.client.beta.threads.runs.create(**run_params)
+        return run_params
+
+    async def create_run(self, thread_id: str, assistant_id: str, instructions: Optional[str] = None) -> Any:
+        run_params = await self._build_run_params(thread_id, assistant_id, instructions)
+        run = await self.client.beta.threads.runs.create(**run_params)
         return run
 
-    def wait_on_run(self, thread_id: str, run_id: str) -> Any:
+    async def wait_on_run(self, thread_id: str, run_id: str) -> Any:
+        """Poll a run until it completes or needs tool outputs.
+
+        Polling starts at RUN_POLL_INITIAL_INTERVAL and backs off up to
+        RUN_POLL_MAX_INTERVAL, yielding to the event loop between polls.
+        """
+        interval = settings.RUN_POLL_INITIAL_INTERVAL
+        deadline = time.monotonic() + settings.RUN_TIMEOUT
         while True:
-            try:
-                run = self.client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run_id)
-                if run.status in ["completed", "requires_action"]:
-                    return run
-                elif run.status in ["failed", "cancelled", "expired"]:
-                    raise Exception(f"Run failed with status: {run.status}")
-                time.sleep(0.5)
-            except Exception as e:
-                raise
+            run = await self.client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run_id)
+            if run.status in ["completed", "requires_action"]:
+                return run
+            elif run.status in ["failed", "cancelled", "expired", "incomplete"]:
+                raise Exception(f"Run failed with status: {run.status}")
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Run {run_id} did not finish within {settings.RUN_TIMEOUT} seconds")
+            await asyncio.sleep(interval)
+            interval = min(interval * RUN_POLL_BACKOFF, settings.RUN_POLL_MAX_INTERVAL)
+
+    async def stream_run(self, thread_id: str, assistant_id: str,
+                         tool_handler: Callable[[List[Any]], Awaitable[List[Dict[str, Any]]]],
+                         instructions: Optional[str] = None) -> Any:
+        """Run an assistant over an event stream instead of polling.
+
+        Tool calls are handed to tool_handler as soon as the run reports
+        requires_action, and its outputs are streamed back on the same run.
+        Returns the final run once it completes.
+        """
+        run_params = await self._build_run_params(thread_id, assistant_id, instructions)
+        stream_manager = self.client.beta.threads.runs.stream(**run_params)
+        while True:
+            run = None
+            async with stream_manager as stream:
+                async for event in stream:
+                    if event.event.startswith("thread.run.") and not event.event.startswith("thread.run.step"):
+                        run = event.data
+
+            if run is None:
+                raise Exception("Run stream ended without a run status")
+            if run.status == "requires_action":
+                tool_calls = run.required_action.submit_tool_outputs.tool_calls
+                tool_outputs = await tool_handler(tool_calls)
+                stream_manager = self.client.beta.threads.runs.submit_tool_outputs_stream(
+                    thread_id=thread_id,
+                    run_id=run.id,
+                    tool_outputs=tool_outputs
+                )
+            elif run.status == "completed":
+                return run
+            else:
+                raise Exception(f"Run failed with status: {run.status}")
 
     async def submit_tool_outputs(self, thread_id: str, run_id: str, tool_outputs: List[Dict[str, Any]]) -> Any:
-        result = self.client.beta.threads.runs.submit_tool_outputs_and_poll(
+        # Callers poll with wait_on_run, which backs off instead of blocking
+        result = await self.client.beta.threads.runs.submit_tool_outputs(
             thread_id=thread_id,
             run_id=run_id,
             tool_outputs=tool_outputs
@@ -0,0 +1,55 @@
+from app.config.settings import settings
+from typing import Dict, Any, Optional
+from utils.logger import logger
+import json
+import os
+
+DEFAULT_MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assistant_manifest.json")
+
+_manifest_cache: Optional[Dict[str, Dict[str, Any]]] = None
+
+def get_manifest_path() -> str:
+    return settings.ASSISTANT_MANIFEST_PATH or DEFAULT_MANIFEST_PATH
+
+def load_manifest(path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Load the name -> {id, config_hash} manifest written by the sync command.
+
+    The default manifest is read once per process; a missing or unreadable
+    file yields an empty manifest so callers fall back to the OpenAI API.
+    """
+    global _manifest_cache
+    if path is None and _manifest_cache is not None:
+        return _manifest_cache
+
+    manifest_path = path or get_manifest_path()
+    manifest = {}
+    try:
+        with open(manifest_path, "r") as file:
+            manifest = json.load(file)
+        logger.debug(f"Loaded assistant manifest with {len(manifest)} entries from {manifest_path}")
+    except FileNotFoundError:
+        logger.debug(f"No assistant manifest found at {manifest_path}")
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Error reading assistant manifest {manifest_path}: {e}")
+
+    if path is None:
+        _manifest_cache = manifest
+    return manifest
+
+def save_manifest(manifest: Dict[str, Dict[str, Any]], path: Optional[str] = None) -> str:
+    global _manifest_cache
+    manifest_path = path or get_manifest_path()
+    # Update the in-process copy first so a read-only filesystem (Lambda)
+    # still benefits from a sync run inside the container
+    if path is None:
+        _manifest_cache = manifest
+    try:
+        with open(manifest_path, "w") as file:
+            json.dump(manifest, file, indent=4, sort_keys=True)
+        logger.info(f"Wrote assistant manifest with {len(manifest)} entries to {manifest_path}")
+    except OSError as e:
+        logger.warning(f"Could not write assistant manifest to {manifest_path}: {e}")
+    return manifest_path
+
+def get_assistant_ids(path: Optional[str] = None) -> Dict[str, str]:
+    return {name: entry["id"] for name, entry in load_manifest(path).items() if entry.get("id")}
@@ -0,0 +1,104 @@
+from app.assistants.assistant_manifest import get_assistant_ids
+from typing import Dict, Any, Optional, Callable, Awaitable
+from app.config.settings import settings
+from utils.logger import logger
+import asyncio
+import time
+
+class AssistantRegistry:
+    """Container-wide assistant name -> ID map with a TTL.
+
+    Seeded from the deploy-time manifest. Stale entries are still served while
+    a single background refresh runs; only a miss waits for the refresh.
+    """
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._ids: Dict[str, str] = {}
+        self._assistants: Dict[str, Any] = {}
+        self._refreshed_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._seeded = False
+
+    def _ensure_seeded(self):
+        if not self._seeded:
+            self._seeded = True
+            self.seed(get_assistant_ids())
+
+    def seed(self, assistant_ids: Dict[str, str]):
+        self._ids.update(assistant_ids)
+        self._refreshed_at = time.monotonic()
+
+    def is_stale(self) -> bool:
+        return self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.ttl
+
+    def get(self, name: str) -> Optional[str]:
+        self._ensure_seeded()
+        return self._ids.get(name)
+
+    def set(self, name: str, assistant_id: str):
+        self._ensure_seeded()
+        self._ids[name] = assistant_id
+
+    def invalidate(self, name: Optional[str] = None):
+        """Forget one assistant, or everything when no name is given"""
+        if name is None:
+            self._ids.clear()
+            self._assistants.clear()
+            self._refreshed_at = None
+            return
+        assistant_id = self._ids.pop(name, None)
+        if assistant_id:
+            self._assistants.pop(assistant_id, None)
+
+    def invalidate_id(self, assistant_id: str):
+        self._assistants.pop(assistant_id, None)
+        for name in [name for name, known_id in self._ids.items() if known_id == assistant_id]:
+            del self._ids[name]
+
+    def get_assistant(self, assistant_id: str) -> Optional[Any]:
+        return self._assistants.get(assistant_id)
+
+    def set_assistant(self, assistant_id: str, assistant: Any):
+        self._assistants[assistant_id] = assistant
+
+    async def refresh(self, fetch: Callable[[], Awaitable[Dict[str, str]]]):
+        # Concurrent callers share one in-flight list call
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._refresh(fetch))
+        await asyncio.shield(self._refresh_task)
+
+    async def _refresh(self, fetch: Callable[[], Awaitable[Dict[str, str]]]):
+        # Seed first, or a later lookup would lay the manifest back over the fresh IDs
+        self._ensure_seeded()
+        assistant_ids = await fetch()
+        # Drop cached assistant objects whose IDs changed under the same name
+        for name, assistant_id in assistant_ids.items():
+            previous_id = self._ids.get(name)
+            if previous_id and previous_id != assistant_id:
+                self._assistants.pop(previous_id, None)
+        self._ids = dict(assistant_ids)
+        self._refreshed_at = time.monotonic()
+        logger.debug(f"Assistant registry refreshed with {len(assistant_ids)} assistants")
+
+    def _refresh_in_background(self, fetch: Callable[[], Awaitable[Dict[str, str]]]):
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.ensure_future(self._refresh(fetch))
+        self._refresh_task.add_done_callback(self._log_refresh_error)
+
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            logger.error(f"Background assistant registry refresh failed: {task.exception()}")
+
+    async def resolve(self, name: str, fetch: Callable[[], Awaitable[Dict[str, str]]]) -> Optional[str]:
+        assistant_id = self.get(name)
+        if assistant_id:
+            if self.is_stale():
+                self._refresh_in_background(fetch)
+            return assistant_id
+
+        await self.refresh(fetch)
+        return self._ids.get(name)
+
+assistant_registry = AssistantRegistry(ttl=settings.ASSISTANT_REGISTRY_TTL)
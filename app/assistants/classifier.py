@@ -1,53 +1,63 @@
+from app.assistants.conversation_store import ConversationState, conversation_store
+from app.assistants.intent_classifier import EmbeddingIntentClassifier
 from app.config.assistant_config import AssistantCategory, AssistantConfig
 from app.assistants.assistant_manager import AssistantManager
 from app.config.config_manager import ConfigManager
+from app.config.settings import settings
+from utils.logger import logger
+from typing import Optional
 
 class Classifier:
     def __init__(self, assistant_manager: AssistantManager, config_manager: ConfigManager):
         self.assistant_manager = assistant_manager
         self.config_manager = config_manager
         self.classifier_assistant_id = None
-        self.thread_id = None
         self.categories = [category.value for category in AssistantCategory if category != AssistantCategory.CLASSIFIER]
+        self.local_classifier = EmbeddingIntentClassifier() if settings.LOCAL_CLASSIFIER_ENABLED else None
 
     async def initialize(self):
-        assistants = await self.assistant_manager.list_assistants()
+        # Resolved from the assistant manifest; created with the classifier spec if missing
         classifier_name = AssistantConfig.get_assistant_name(AssistantCategory.CLASSIFIER)
-        self.classifier_assistant_id = assistants.get(classifier_name)
-        if not self.classifier_assistant_id:
-            # Create the classifier assistant if it doesn't exist
-            classifier_config = AssistantConfig.CONFIGS[AssistantCategory.CLASSIFIER]
-            self.classifier_assistant_id = await self.assistant_manager.create_assistant(
-                name=classifier_name,
-                instructions=classifier_config.SYSTEM_MESSAGE,
-                tools=[],
-                model="gpt-4o-mini"
-            )
-
-
-    async def classify_message(self, user_input: str) -> str:
+        self.classifier_assistant_id = await self.assistant_manager.create_or_get_assistant(classifier_name)
+
+    async def classify_message(self, user_input: str, state: Optional[ConversationState] = None) -> str:
+        if self.local_classifier:
+            category = await self.local_classifier.classify(user_input, state.current_category if state else None)
+            if category:
+                return self._validate_classification(category)
+            logger.debug("Local classification uncertain, falling back to classifier assistant")
+
+        if state is None:
+            state = ConversationState("anonymous")
+        # The classifier thread is separate from the conversation thread, so it has its own lock
+        async with conversation_store.lock(f"{state.key}:classifier"):
+            return await self._classify_with_assistant(user_input, state)
+
+    async def _classify_with_assistant(self, user_input: str, state: ConversationState) -> str:
         if not self.classifier_assistant_id:
             await self.initialize()
 
-        if not self.thread_id:
+        if not state.classifier_thread_id:
             thread = await self.assistant_manager.create_thread()
-            self.thread_id = thread.id
+            state.classifier_thread_id = thread.id
+            await conversation_store.save(state)
+        thread_id = state.classifier_thread_id
 
-        await self.assistant_manager.create_message(self.thread_id, "user", user_input)
+        await self.assistant_manager.create_message(thread_id, "user", user_input)
 
-        messages = await self.assistant_manager.list_messages(self.thread_id, order="desc", limit=5)
+        messages = await self.assistant_manager.list_messages(thread_id, order="desc", limit=5)
         context = "\n".join([f"{msg.role}: {msg.content[0].text.value}" for msg in reversed(messages.data)])
 
         instructions = self._generate_classification_instructions(context)
 
         run = await self.assistant_manager.create_run(
-            thread_id=self.thread_id,
+            thread_id=thread_id,
             assistant_id=self.classifier_assistant_id,
             instructions=instructions
         )
 
-        run = self.assistant_manager.wait_on_run(self.thread_id, run.id)
-        classification = await self.assistant_manager.get_assistant_response(self.thread_id, run.id)
+        run = await self.assistant_manager.wait_on_run(thread_id, run.id)
+        classification = await self.assistant_manager.get_assistant_response(thread_id, run.id)
 
         return self._validate_classification(classification.strip().lower())
 
@@ -0,0 +1,198 @@
+from typing import Dict, Any, List, Optional
+from abc import ABC, abstractmethod
+from app.config.settings import settings
+from utils.cache import TTLCache
+from utils.logger import logger
+import threading
+import asyncio
+import sqlite3
+import weakref
+import json
+import time
+
+def conversation_key(user_id: Optional[str], thread_ts: Optional[str] = None) -> str:
+    """Messages in a Slack thread get their own conversation; everything else is per user"""
+    user_id = user_id or "anonymous"
+    return f"{user_id}:{thread_ts}" if thread_ts else user_id
+
+class ConversationState:
+    """OpenAI thread IDs and routing state for one Slack conversation"""
+    def __init__(self, key: str, user_id: Optional[str] = None, thread_id: Optional[str] = None,
+                 classifier_thread_id: Optional[str] = None, current_category: Optional[str] = None,
+                 recent_turns: Optional[List[str]] = None, updated_at: Optional[float] = None):
+        self.key = key
+        self.user_id = user_id
+        self.thread_id = thread_id
+        self.classifier_thread_id = classifier_thread_id
+        self.current_category = current_category
+        self.recent_turns = list(recent_turns or [])
+        self.updated_at = updated_at
+
+    def add_turn(self, user_input: str, max_turns: int):
+        self.recent_turns.append(user_input)
+        if len(self.recent_turns) > max_turns:
+            del self.recent_turns[:len(self.recent_turns) - max_turns]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "user_id": self.user_id,
+            "thread_id": self.thread_id,
+            "classifier_thread_id": self.classifier_thread_id,
+            "current_category": self.current_category,
+            "recent_turns": self.recent_turns,
+            "updated_at": self.updated_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ConversationState':
+        return cls(
+            key=data["key"],
+            user_id=data.get("user_id"),
+            thread_id=data.get("thread_id"),
+            classifier_thread_id=data.get("classifier_thread_id"),
+            current_category=data.get("current_category"),
+            recent_turns=data.get("recent_turns"),
+            updated_at=data.get("updated_at")
+        )
+
+class ConversationBackend(ABC):
+    """Persistent tier behind the in-memory conversation cache"""
+    @abstractmethod
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def save(self, key: str, data: Dict[str, Any]):
+        pass
+
+class SQLiteConversationBackend(ConversationBackend):
+    """Local persistence; on Lambda the file lives in /tmp and survives warm invocations"""
+    def __init__(self, db_file: str, ttl: Optional[float] = None):
+        self.db_file = db_file
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS conversations (key TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.conn.execute("SELECT data, updated_at FROM conversations WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        data, updated_at = row
+        if self.ttl is not None and time.time() - updated_at > self.ttl:
+            return None
+        return json.loads(data)
+
+    def save(self, key: str, data: Dict[str, Any]):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO conversations (key, data, updated_at) VALUES (?, ?, ?)",
+                (key, json.dumps(data), time.time())
+            )
+            self.conn.commit()
+
+class DynamoDBConversationBackend(ConversationBackend):
+    """Production persistence. The table is keyed by conversation_key; expires_at can be used as its TTL attribute"""
+    def __init__(self, table_name: str, ttl: Optional[float] = None):
+        import boto3
+        self.ttl = ttl
+        self.table = boto3.resource('dynamodb').Table(table_name)
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        response = self.table.get_item(Key={'conversation_key': key})
+        item = response.get('Item')
+        if not item:
+            return None
+        # DynamoDB deletes expired items lazily, so check expiry here as well
+        if 'expires_at' in item and int(item['expires_at']) < time.time():
+            return None
+        return json.loads(item['state'])
+
+    def save(self, key: str, data: Dict[str, Any]):
+        item = {
+            'conversation_key': key,
+            'state': json.dumps(data),
+            'updated_at': int(time.time())
+        }
+        if self.ttl is not None:
+            item['expires_at'] = int(time.time() + self.ttl)
+        self.table.put_item(Item=item)
+
+class ConversationStore:
+    """Per-conversation state with an LRU memory tier over an optional persistent backend.
+
+    Callers hold lock(key) while running a conversation, so messages in the same
+    conversation are serialized while different users proceed in parallel.
+    """
+    def __init__(self, backend: Optional[ConversationBackend] = None, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.backend = backend
+        self.ttl = ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Locks disappear once no coroutine holds a reference to them
+        self._locks: 'weakref.WeakValueDictionary[str, asyncio.Lock]' = weakref.WeakValueDictionary()
+
+    def lock(self, key: str) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+        return lock
+
+    async def get(self, key: str, user_id: Optional[str] = None) -> ConversationState:
+        state = self._cache.get(key)
+        if state is not None:
+            return state
+
+        data = None
+        if self.backend:
+            try:
+                data = await asyncio.to_thread(self.backend.load, key)
+            except Exception as e:
+                logger.error(f"Error loading conversation state for {key}: {e}")
+
+        state = ConversationState.from_dict(data) if data else ConversationState(key, user_id=user_id)
+        # Another coroutine may have loaded the same key while we were waiting on the backend
+        existing = self._cache.get(key)
+        if existing is not None:
+            return existing
+        self._cache.set(key, state)
+        return state
+
+    async def save(self, state: ConversationState):
+        state.updated_at = time.time()
+        self._cache.set(state.key, state)
+        if not self.backend:
+            return
+        try:
+            await asyncio.to_thread(self.backend.save, state.key, state.to_dict())
+        except Exception as e:
+            logger.error(f"Error saving conversation state for {state.key}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+def create_conversation_backend() -> Optional[ConversationBackend]:
+    backend = settings.CONVERSATION_STORE_BACKEND.lower()
+    try:
+        if backend == "dynamodb":
+            return DynamoDBConversationBackend(settings.CONVERSATION_TABLE_NAME, ttl=settings.CONVERSATION_TTL)
+        if backend == "sqlite":
+            return SQLiteConversationBackend(settings.CONVERSATION_DB_PATH, ttl=settings.CONVERSATION_TTL)
+    except Exception as e:
+        logger.error(f"Error creating {backend} conversation backend, keeping state in memory only: {e}")
+        return None
+    if backend != "memory":
+        logger.warning(f"Unknown conversation store backend: {backend}, keeping state in memory only")
+    return None
+
+# Shared by every Dispatcher and Classifier in the container
+conversation_store = ConversationStore(
+    create_conversation_backend(),
+    maxsize=settings.CONVERSATION_CACHE_SIZE,
+    ttl=settings.CONVERSATION_TTL
+)
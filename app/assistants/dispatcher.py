@@ -1,75 +1,123 @@
 from app.config.assistant_config import AssistantCategory, AssistantConfig
 from app.assistants.assistant_manager import AssistantManager
 from app.assistants.assistant_factory import AssistantFactory
+from app.assistants.conversation_store import ConversationState, conversation_key, conversation_store
 from app.assistants.classifier import Classifier
 from app.config.config_manager import ConfigManager
+from app.config.settings import settings
+from utils.cache import TTLCache
 from utils.logger import logger
-from typing import List
+from typing import Any, List, Optional, Awaitable
+from openai import NotFoundError
+import asyncio
+import hashlib
+import weakref
 import json
+import re
 
+# Shared by every Dispatcher in the container
+classification_cache = TTLCache(maxsize=settings.CLASSIFICATION_CACHE_SIZE, ttl=settings.CLASSIFICATION_CACHE_TTL)
+
+def normalize_message(text: str) -> str:
+    """Lowercase and strip punctuation/extra whitespace so near-identical requests share a key"""
+    text = re.sub(r"[^\w\s@']", " ", text.lower())
+    return " ".join(text.split())
+
+def classification_cache_key(user_input: str, recent_turns: List[str]) -> str:
+    context = "\n".join(normalize_message(turn) for turn in recent_turns)
+    context_hash = hashlib.sha1(context.encode("utf-8")).hexdigest()
+    return f"{normalize_message(user_input)}|{context_hash}"
 
 class Dispatcher:
     def __init__(self):
         self.config_manager = ConfigManager()
         self.assistant_manager = AssistantManager(self.config_manager)
         self.classifier = Classifier(self.assistant_manager, self.config_manager)
-        self.current_category = None
-        self.thread_id = None
-        self.user_id = None
-        
-    def set_user_context(self, user_id: str):
-        """Set the user context for the dispatcher"""
-        self.user_id = user_id
+        # Per-conversation state lives in the store so concurrent users never share a thread
+        self.conversation_store = conversation_store
+        self.tool_semaphores: 'weakref.WeakValueDictionary[Optional[str], asyncio.Semaphore]' = weakref.WeakValueDictionary()
 
-    async def dispatch(self, user_input: str, user_id: str = None) -> dict:
-        try:
-            logger.info(f"Starting dispatch for user input: {user_input} with user_id: {user_id}")
-            if user_id:
-                self.user_id = user_id
-                logger.debug(f"Updated dispatcher user_id to: {self.user_id}")
-            else:
-                logger.debug(f"Keeping existing dispatcher user_id: {self.user_id}")
-            
-            self.current_category = await self.classifier.classify_message(user_input)
-            
-            assistant_name = AssistantConfig.get_assistant_name(self.current_category)
-            logger.info(f"Selected assistant: {assistant_name}")
-            
-            chat_history = await self.get_chat_history()
-            assistant_id = await self.assistant_manager.create_or_get_assistant(assistant_name)
-            
-            if not self.thread_id:
-                thread = await self.assistant_manager.create_thread()
-                self.thread_id = thread.id
-            
-            await self.assistant_manager.create_message(self.thread_id, "user", user_input)
-            run = await self.assistant_manager.create_run(assistant_id=assistant_id, thread_id=self.thread_id)
-            
-            return await self.process_run(run, user_input, chat_history)
+    async def dispatch(self, user_input: str, user_id: str = None, classification: Optional[Awaitable[str]] = None,
+                       thread_ts: Optional[str] = None) -> dict:
+        """Classify and run the message; classification may be an already-started classify_message task"""
+        key = conversation_key(user_id, thread_ts)
+        # Runs on one OpenAI thread must not overlap, so messages in a conversation are serialized
+        async with self.conversation_store.lock(key):
+            state = await self.conversation_store.get(key, user_id)
+            try:
+                logger.info(f"Starting dispatch for user input: {user_input} with user_id: {user_id}")
 
-        except Exception as e:
-            logger.error(f"Error in dispatch: {str(e)}", exc_info=True)
-            return {'thread_id': self.thread_id, 'run_id': None, 'error': str(e)}
+                if classification is not None:
+                    state.current_category = await classification
+                else:
+                    state.current_category = await self.classify_message(user_input, user_id, thread_ts)
+
+                assistant_name = AssistantConfig.get_assistant_name(state.current_category)
+                logger.info(f"Selected assistant: {assistant_name}")
+
+                chat_history = await self.get_chat_history(state.thread_id)
+                assistant_id = await self.assistant_manager.create_or_get_assistant(assistant_name)
+
+                await self.add_user_message(state, user_input)
+                await self.conversation_store.save(state)
+
+                if settings.ASSISTANT_STREAMING:
+                    return await self.stream_run(assistant_id, state)
+
+                run = await self.assistant_manager.create_run(assistant_id=assistant_id, thread_id=state.thread_id)
+
+                return await self.process_run(run, state, chat_history)
 
-    async def process_run(self, run, user_input: str, chat_history: List[str]) -> dict:
+            except Exception as e:
+                logger.error(f"Error in dispatch: {str(e)}", exc_info=True)
+                return {'thread_id': state.thread_id, 'run_id': None, 'error': str(e)}
+
+    async def add_user_message(self, state: ConversationState, user_input: str):
+        """Add the message to the conversation thread, starting a new thread if the stored one is gone"""
+        if state.thread_id:
+            try:
+                await self.assistant_manager.create_message(state.thread_id, "user", user_input)
+                return
+            except NotFoundError:
+                logger.warning(f"Thread {state.thread_id} no longer exists, starting a new one for {state.key}")
+
+        thread = await self.assistant_manager.create_thread()
+        state.thread_id = thread.id
+        await self.assistant_manager.create_message(state.thread_id, "user", user_input)
+
+    async def classify_message(self, user_input: str, user_id: Optional[str] = None, thread_ts: Optional[str] = None) -> str:
+        state = await self.conversation_store.get(conversation_key(user_id, thread_ts), user_id)
+        cache_key = classification_cache_key(user_input, state.recent_turns)
+        category = classification_cache.get(cache_key)
+
+        if category is None:
+            category = await self.classifier.classify_message(user_input, state)
+            classification_cache.set(cache_key, category)
+        logger.debug(f"Classification: {category}, cache stats: {classification_cache.stats()}")
+
+        state.add_turn(user_input, settings.CLASSIFICATION_CACHE_CONTEXT_TURNS)
+        return category
+
+    async def process_run(self, run, state: ConversationState, chat_history: List[str]) -> dict:
+        thread_id = state.thread_id
         while True:
-            run = self.assistant_manager.wait_on_run(self.thread_id, run.id)
+            run = await self.assistant_manager.wait_on_run(thread_id, run.id)
             
             if run.status == "completed":
                 logger.debug(f"Run completed: {run.status}")
-                assistant_response = await self.assistant_manager.get_assistant_response(self.thread_id, run.id)
+                assistant_response = await self.assistant_manager.get_assistant_response(thread_id, run.id)
                 return {
-                    'thread_id': self.thread_id,
+                    'thread_id': thread_id,
                     'run_id': run.id,
                     'assistant_response': assistant_response
                 }
             elif run.status == "requires_action":
                 if run.required_action.submit_tool_outputs:
                     tool_calls = run.required_action.submit_tool_outputs.tool_calls
-                    tool_outputs = await self.handle_tool_calls(tool_calls, user_input)
+                    tool_outputs = await self.handle_tool_calls(tool_calls, state)
                     if tool_outputs:
                         try:
-                            run = await self.assistant_manager.submit_tool_outputs(self.thread_id, run.id, tool_outputs)
+                            run = await self.assistant_manager.submit_tool_outputs(thread_id, run.id, tool_outputs)
                         except Exception as e:
                             logger.error(f"Error submitting tool outputs: {e}")
                         else:
@@ -77,25 +125,81 @@ class Dispatcher:
             else:
                 logger.error(f"Unexpected run status: {run.status}")
                 return {
-                    'thread_id': self.thread_id,
+                    'thread_id': thread_id,
                     'run_id': run.id,
                     'error': f"Unexpected run status: {run.status}"
                 }
 
-    async def handle_tool_calls(self, tool_calls, user_input: str):
-        tool_outputs = []
-        for tool_call in tool_calls:
-            function_name = tool_call.function.name
+    async def stream_run(self, assistant_id: str, state: ConversationState) -> dict:
+        run = await self.assistant_manager.stream_run(
+            state.thread_id,
+            assistant_id,
+            lambda tool_calls: self.handle_tool_calls(tool_calls, state)
+        )
+        logger.debug(f"Streamed run completed: {run.status}")
+        assistant_response = await self.assistant_manager.get_assistant_response(state.thread_id, run.id)
+        return {
+            'thread_id': state.thread_id,
+            'run_id': run.id,
+            'assistant_response': assistant_response
+        }
+
+    async def handle_tool_calls(self, tool_calls, state: ConversationState):
+        """Run all tool calls of a requires_action step concurrently.
+
+        A failed or timed-out call produces an error output for that call only,
+        so the run can still continue with the results that did succeed.
+        """
+        try:
+            integration = self.get_integration(state)
+        except Exception as e:
+            logger.error(f"Error creating integration for {state.current_category}: {e}")
+            return [{"tool_call_id": tool_call.id, "output": f"Error: {e}"} for tool_call in tool_calls]
+
+        semaphore = self.get_tool_semaphore(state.user_id)
+        results = await asyncio.gather(
+            *(self.run_tool_call(tool_call, state, integration, semaphore) for tool_call in tool_calls)
+        )
+        return [
+            {"tool_call_id": tool_call.id, "output": result}
+            for tool_call, result in zip(tool_calls, results)
+        ]
+
+    async def run_tool_call(self, tool_call, state: ConversationState, integration: Any, semaphore: asyncio.Semaphore) -> str:
+        function_name = tool_call.function.name
+        try:
             function_args = json.loads(tool_call.function.arguments)
-            result = await self.call_function(function_name, function_args)
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid arguments for {function_name}: {e}")
+            return f"Error: invalid arguments for {function_name}: {e}"
+
+        async with semaphore:
+            try:
+                result = await asyncio.wait_for(
+                    self.call_function(function_name, function_args, state, integration),
+                    timeout=settings.TOOL_CALL_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                logger.error(f"Tool call {function_name} timed out after {settings.TOOL_CALL_TIMEOUT}s")
+                return f"Error: {function_name} timed out after {settings.TOOL_CALL_TIMEOUT:g} seconds"
+            except Exception as e:
+                logger.error(f"Error executing {function_name}: {e}", exc_info=True)
+                return f"Error executing {function_name}: {e}"
+        return result if isinstance(result, str) else json.dumps(result, default=str)
 
-            tool_output = {
-                "tool_call_id": tool_call.id,
-                "output": result
-            }
-            tool_outputs.append(tool_output)
+    def get_tool_semaphore(self, user_id: Optional[str]) -> asyncio.Semaphore:
+        """Limit how many tool calls one user can have in flight across all their conversations"""
+        semaphore = self.tool_semaphores.get(user_id)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.TOOL_CALL_CONCURRENCY)
+            self.tool_semaphores[user_id] = semaphore
+        return semaphore
 
-        return tool_outputs
+    def get_integration(self, state: ConversationState) -> Any:
+        return AssistantFactory.get_api_integration(
+            AssistantConfig.get_assistant_name(state.current_category),
+            state.user_id
+        )
 
     def get_integration_type(self, function_name: str) -> str:
         for category, functions in AssistantConfig.CATEGORY_FUNCTIONS.items():
@@ -109,26 +213,27 @@ class Dispatcher:
                 return category
         return AssistantCategory.GENERAL
 
-    async def call_function(self, function_name: str, function_params: dict) -> str:
-        if self.user_id:
-            function_params['user_id'] = self.user_id
+    async def call_function(self, function_name: str, function_params: dict, state: ConversationState,
+                            integration: Any = None) -> str:
+        if state.user_id:
+            function_params['user_id'] = state.user_id
         else:
-            logger.warning("No user_id available in dispatcher")
+            logger.warning(f"No user_id available for conversation {state.key}")
+        # Lets shared integrations keep per-conversation state, e.g. travel search results
+        function_params['conversation_key'] = state.key
         
-        integration = AssistantFactory.get_api_integration(
-            AssistantConfig.get_assistant_name(self.current_category),
-            self.user_id
-        )
+        if integration is None:
+            integration = self.get_integration(state)
         
         if integration:
             return await integration.execute(function_name, function_params)
         else:
-            logger.error(f"No integration found for assistant: {AssistantConfig.get_assistant_name(self.current_category)}")
+            logger.error(f"No integration found for assistant: {AssistantConfig.get_assistant_name(state.current_category)}")
             return f"Unknown function: {function_name}"
-    async def get_chat_history(self) -> List[str]:
-        if not self.thread_id:
+    async def get_chat_history(self, thread_id: Optional[str]) -> List[str]:
+        if not thread_id:
             return []
-        messages = await self.assistant_manager.list_messages(self.thread_id, limit=10, order="desc")
+        messages = await self.assistant_manager.list_messages(thread_id, limit=10, order="desc")
         return [f"{msg.role}: {msg.content[0].text.value}" for msg in reversed(messages.data)]
 
     async def create_assistant(self, name: str) -> str:
@@ -0,0 +1,111 @@
+from app.services.document_retrieval.embedding_manager import EmbeddingManager
+from app.config.assistant_config import AssistantCategory, AssistantConfig
+from typing import List, Optional, Tuple
+from app.config.settings import settings
+from utils.logger import logger
+import numpy as np
+import asyncio
+
+class EmbeddingIntentClassifier:
+    """Classifies messages locally against cached category embeddings.
+
+    Each category is represented by its description and example utterances.
+    A message is scored against all of them with a single matrix product, and
+    each category keeps its best-matching row. The result is only trusted
+    when the top category beats the runner-up by margin_threshold.
+
+    Only the message itself is embedded, so a short follow-up inside a thread
+    ("yes, book the second one") is not trusted when it points away from the
+    thread's current category; the LLM classifier sees the recent turns.
+    """
+    # Prototype embeddings are built once per container and shared by all instances
+    _prototypes: Optional[np.ndarray] = None
+    _categories: List[str] = []
+    _segment_starts: Optional[np.ndarray] = None
+    _build_task: Optional[asyncio.Future] = None
+
+    def __init__(self, embedding_manager: Optional[EmbeddingManager] = None, margin_threshold: Optional[float] = None,
+                 followup_max_words: Optional[int] = None):
+        self.embedding_manager = embedding_manager or EmbeddingManager(settings.CLASSIFIER_EMBEDDING_MODEL)
+        self.margin_threshold = settings.CLASSIFIER_MARGIN_THRESHOLD if margin_threshold is None else margin_threshold
+        self.followup_max_words = settings.CLASSIFIER_FOLLOWUP_MAX_WORDS if followup_max_words is None else followup_max_words
+
+    @staticmethod
+    def _prototype_texts() -> List[Tuple[str, List[str]]]:
+        texts = []
+        for category, description in AssistantConfig.CATEGORY_DESCRIPTIONS.items():
+            if category == AssistantCategory.CLASSIFIER:
+                continue
+            texts.append((category.value, [description] + list(AssistantConfig.CATEGORY_EXAMPLES.get(category, []))))
+        return texts
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    async def _build_prototypes(self):
+        prototype_texts = self._prototype_texts()
+        flat_texts = [text for _, texts in prototype_texts for text in texts]
+        embeddings = await self.embedding_manager.generate_embeddings_async(flat_texts)
+        if len(embeddings) != len(flat_texts):
+            raise ValueError("Failed to embed classifier prototypes")
+
+        # Rows are grouped by category so np.maximum.reduceat can take a per-category max
+        segment_starts, offset = [], 0
+        for _, texts in prototype_texts:
+            segment_starts.append(offset)
+            offset += len(texts)
+
+        cls = type(self)
+        cls._prototypes = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        cls._categories = [category for category, _ in prototype_texts]
+        cls._segment_starts = np.asarray(segment_starts)
+        logger.debug(f"Built {len(flat_texts)} classifier prototypes for {len(cls._categories)} categories")
+
+    async def ensure_prototypes(self):
+        cls = type(self)
+        if cls._prototypes is not None:
+            return
+        # Concurrent first requests share one embedding call
+        if cls._build_task is None or cls._build_task.done():
+            cls._build_task = asyncio.ensure_future(self._build_prototypes())
+        try:
+            await asyncio.shield(cls._build_task)
+        except Exception:
+            cls._build_task = None
+            raise
+
+    def score(self, embedding: List[float]) -> List[Tuple[str, float]]:
+        query = self._normalize(np.asarray(embedding, dtype=np.float32))
+        similarities = self._prototypes @ query
+        category_scores = np.maximum.reduceat(similarities, self._segment_starts)
+        order = np.argsort(category_scores)[::-1]
+        return [(self._categories[i], float(category_scores[i])) for i in order]
+
+    async def classify(self, user_input: str, current_category: Optional[str] = None) -> Optional[str]:
+        """
+        Return the category, or None when the caller should fall back to the LLM.
+
+        :param current_category: Category the conversation is already in, if any.
+        """
+        try:
+            await self.ensure_prototypes()
+            embeddings = await self.embedding_manager.generate_embeddings_async([user_input])
+        except Exception as e:
+            logger.error(f"Local classification unavailable: {e}")
+            return None
+        if not embeddings:
+            return None
+
+        ranked = self.score(embeddings[0])
+        (top_category, top_score), (_, runner_up_score) = ranked[0], ranked[1]
+        margin = top_score - runner_up_score
+        logger.debug(f"Local classification: {top_category} (score={top_score:.3f}, margin={margin:.3f})")
+        if margin < self.margin_threshold:
+            return None
+        if (current_category and current_category != AssistantCategory.GENERAL.value and top_category != current_category
+                and len(user_input.split()) <= self.followup_max_words):
+            logger.debug(f"Short follow-up points away from {current_category}, deferring to the LLM for context")
+            return None
+        return top_category
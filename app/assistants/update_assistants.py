@@ -1,37 +1,76 @@
+from app.assistants.assistant_manifest import load_manifest, save_manifest, get_manifest_path
 from app.assistants.assistant_manager import AssistantManager
 from app.assistants.assistant_factory import AssistantFactory
-from app.config.assistant_config import AssistantCategory
-from app.assistants.dispatcher import Dispatcher
+from app.config.assistant_config import AssistantConfig
+from app.config.config_manager import ConfigManager
+from typing import Dict, Any, List, Optional
 from utils.logger import logger
+import argparse
+import asyncio
 
-async def update_assistants(config_manager):
-    logger.debug("Updating assistants...")
-    assistant_manager = AssistantManager(config_manager)
-    dispatcher = Dispatcher()
-    assistant_factory = AssistantFactory()
-    
-    assistants = await assistant_manager.list_assistants()
-    
-    for assistant_name in config_manager.get_assistant_names().values():
-        assistant_id = assistants.get(assistant_name)
-        tools, model = assistant_factory.get_tools_for_assistant(assistant_name)
-        instructions = assistant_factory.get_assistant_instructions(assistant_name)
-        if assistant_id:
+async def sync_assistants(assistant_manager: AssistantManager, assistant_names: Optional[List[str]] = None,
+                          manifest_path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Create or update assistants whose tools, instructions or model changed.
+
+    Each assistant stores a hash of its configuration in its metadata, so an
+    unchanged assistant costs no API calls beyond the initial list. The
+    resulting name -> ID manifest is written for the runtime to load.
+    """
+    logger.debug("Syncing assistants...")
+    remote = {assistant.name: assistant for assistant in await assistant_manager.list_assistant_objects()}
+    for assistant in remote.values():
+        assistant_manager.registry.set_assistant(assistant.id, assistant)
+    # A partial sync keeps the entries of assistants it didn't touch
+    manifest = dict(load_manifest(manifest_path)) if assistant_names else {}
+    assistant_names = assistant_names or AssistantConfig.get_all_assistant_names()
+
+    for assistant_name in assistant_names:
+        spec = AssistantFactory.get_assistant_spec(assistant_name)
+        config_hash = AssistantFactory.compute_config_hash(spec)
+        existing = remote.get(assistant_name)
+
+        if existing is None:
+            logger.debug(f"{assistant_name} not found, creating a new one")
+            assistant = await assistant_manager.create_assistant(
+                name=assistant_name,
+                instructions=spec["instructions"],
+                tools=spec["tools"],
+                model=spec["model"],
+                metadata={"config_hash": config_hash}
+            )
+            assistant_id = assistant.id
+        elif (existing.metadata or {}).get("config_hash") != config_hash:
             await assistant_manager.update_assistant(
-                assistant_id=assistant_id,
-                instructions=instructions,
-                tools=tools
+                assistant_id=existing.id,
+                instructions=spec["instructions"],
+                tools=spec["tools"],
+                model=spec["model"],
+                metadata={**(existing.metadata or {}), "config_hash": config_hash}
             )
+            assistant_id = existing.id
             logger.debug(f"Updated {assistant_name} with new tools and instructions")
         else:
-            logger.debug(f"{assistant_name} not found, creating a new one")
-            new_assistant = await assistant_manager.create_assistant(
-                name=assistant_name,
-                instructions=instructions,
-                tools=tools,
-                model=model
-            )
-            if assistant_name == config_manager.get_assistant_names()[AssistantCategory.CLASSIFIER]:
-                dispatcher.classifier_assistant_id = new_assistant.id
-        
-        logger.debug("Assistants update completed")
\ No newline at end of file
+            assistant_id = existing.id
+            logger.debug(f"{assistant_name} is up to date")
+
+        manifest[assistant_name] = {"id": assistant_id, "config_hash": config_hash}
+
+    save_manifest(manifest, manifest_path)
+    assistant_manager.registry.seed({name: entry["id"] for name, entry in manifest.items()})
+    logger.debug("Assistants sync completed")
+    return manifest
+
+async def update_assistants(config_manager: ConfigManager) -> Dict[str, Dict[str, Any]]:
+    return await sync_assistants(AssistantManager(config_manager))
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync OpenAI assistants with the local configuration")
+    parser.add_argument("--manifest", default=None, help=f"Manifest output path (default: {get_manifest_path()})")
+    parser.add_argument("--assistant", action="append", dest="assistants", help="Only sync the named assistant")
+    args = parser.parse_args()
+
+    config_manager = ConfigManager()
+    asyncio.run(sync_assistants(AssistantManager(config_manager), args.assistants, args.manifest))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+from app.config.assistant_config import AssistantCategory
+import random
+
+class AcknowledgementConfig:
+    # Instant replies sent while the request is processed, keyed by predicted category
+    TEMPLATES = {
+        AssistantCategory.CALENDAR.value: [
+            "Checking your calendar now...",
+            "On it, pulling up your schedule.",
+            "Let me take a look at your calendar.",
+        ],
+        AssistantCategory.EMAIL.value: [
+            "On it, working on that email.",
+            "Got it, getting that email ready.",
+            "Sure thing, handling that email now.",
+        ],
+        AssistantCategory.TRAVEL.value: [
+            "Searching travel options for you...",
+            "On it, looking into your trip.",
+            "Let me find some options for you.",
+        ],
+    }
+
+    DEFAULT_TEMPLATES = [
+        "Got it, working on that now.",
+        "On it, one moment.",
+        "Sure, give me a second.",
+    ]
+
+    @classmethod
+    def get_acknowledgement(cls, category: str) -> str:
+        return random.choice(cls.TEMPLATES.get(category, cls.DEFAULT_TEMPLATES))
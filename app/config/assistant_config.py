@@ -32,6 +32,11 @@ class AssistantConfig:
         for category, config in CONFIGS.items()
     }
 
+    CATEGORY_EXAMPLES = {
+        category: config.EXAMPLES
+        for category, config in CONFIGS.items()
+    }
+
     CATEGORY_FUNCTIONS = {
         category: config.FUNCTIONS
         for category, config in CONFIGS.items()
@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 
 class BaseConfig(ABC):
+    # Example user messages for the local intent classifier (optional)
+    EXAMPLES: list = []
+
     @property
     @abstractmethod
     def SYSTEM_MESSAGE(self) -> str:
@@ -14,13 +14,29 @@ class CalendarConfig(BaseConfig):
     CATEGORY = "calendar"
     ASSISTANT_NAME = "CalendarAssistant"
     CATEGORY_DESCRIPTION = "Messages about appointments, meetings, or time-specific events that don't involve sending emails."
-    FUNCTIONS = ["check_available_slots", "create_event", "update_event", "delete_event"]
+    FUNCTIONS = ["check_available_slots", "create_event", "update_event", "delete_event",
+                 "create_events_bulk", "update_events_bulk", "delete_events_bulk", "find_group_availability"]
+    EXAMPLES = [
+        "What's on my calendar today?",
+        "Check my calendar for tomorrow",
+        "When is my next meeting?",
+        "Schedule a meeting with Sarah on Friday at 2pm",
+        "Find a free hour next week for a call",
+        "Move my 3pm meeting to 4pm",
+        "Cancel my dentist appointment",
+        "Am I free Thursday afternoon?",
+        "Find a time next week when Sarah, Tom and I can all meet",
+    ]
 
     FUNCTION_PARAMS = {
         "check_available_slots": ["start_date", "end_date", "duration", "timezone"],
         "create_event": ["summary", "start_time", "end_time", "description", "location", "timezone"],
         "update_event": ["event_id", "summary", "start_time", "end_time"],
         "delete_event": ["event_id"],
+        "create_events_bulk": ["events"],
+        "update_events_bulk": ["updates"],
+        "delete_events_bulk": ["event_ids"],
+        "find_group_availability": ["attendees", "required_attendees", "start_date", "end_date", "duration", "timezone"],
     }
 
     def get_messages(self, history_context: str, user_input: str, function_name: str) -> list:
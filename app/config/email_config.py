@@ -14,6 +14,14 @@ class EmailConfig(BaseConfig):
     ASSISTANT_NAME = "GmailAssistant"
     CATEGORY_DESCRIPTION = "Messages about sending, responding to, or managing emails."
     FUNCTIONS = ["send_email", "create_draft"]
+    EXAMPLES = [
+        "Send an email to john@example.com about the quarterly report",
+        "Draft an email to the team saying the meeting is moved",
+        "Email my landlord that rent will be late",
+        "Write a reply thanking Alex for the introduction",
+        "Create a draft to investors with the monthly update",
+        "Send a follow-up email to the client",
+    ]
 
     FUNCTION_PARAMS = {
         "send_email": ["to", "subject", "body", "attachments"],
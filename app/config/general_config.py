@@ -6,6 +6,13 @@ class GeneralConfig(BaseConfig):
     ASSISTANT_NAME = "GeneralAssistant"
     CATEGORY_DESCRIPTION = "General-purpose tasks and queries."
     FUNCTIONS = []
+    EXAMPLES = [
+        "Hello",
+        "What can you do?",
+        "Tell me a joke",
+        "Explain how compound interest works",
+        "Thanks!",
+    ]
 
     def get_messages(self, history_context: str, user_input: str, function_name: str) -> list:
         return [
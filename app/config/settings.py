@@ -18,4 +18,64 @@ class Settings:
     GOOGLE_REDIRECT_URI = os.getenv('GOOGLE_REDIRECT_URI')
     KMS_KEY_ID = os.getenv('KMS_KEY_ID')
     GOOGLE_API_VERSION = os.getenv('GOOGLE_API_VERSION', 'v3')
+    ASSISTANT_MANIFEST_PATH = os.getenv('ASSISTANT_MANIFEST_PATH')
+    OPENAI_MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', '100'))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('OPENAI_MAX_KEEPALIVE_CONNECTIONS', '20'))
+    OPENAI_KEEPALIVE_EXPIRY = float(os.getenv('OPENAI_KEEPALIVE_EXPIRY', '60'))
+    OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '60'))
+    OPENAI_CONNECT_TIMEOUT = float(os.getenv('OPENAI_CONNECT_TIMEOUT', '5'))
+    RUN_POLL_INITIAL_INTERVAL = float(os.getenv('RUN_POLL_INITIAL_INTERVAL', '0.1'))
+    RUN_POLL_MAX_INTERVAL = float(os.getenv('RUN_POLL_MAX_INTERVAL', '1.0'))
+    RUN_TIMEOUT = float(os.getenv('RUN_TIMEOUT', '120'))
+    ASSISTANT_STREAMING = os.getenv('ASSISTANT_STREAMING', 'false').lower() == 'true'
+    ASSISTANT_REGISTRY_TTL = float(os.getenv('ASSISTANT_REGISTRY_TTL', '900'))
+    LOCAL_CLASSIFIER_ENABLED = os.getenv('LOCAL_CLASSIFIER_ENABLED', 'true').lower() == 'true'
+    CLASSIFIER_EMBEDDING_MODEL = os.getenv('CLASSIFIER_EMBEDDING_MODEL', 'text-embedding-3-small')
+    CLASSIFIER_MARGIN_THRESHOLD = float(os.getenv('CLASSIFIER_MARGIN_THRESHOLD', '0.05'))
+    CLASSIFIER_FOLLOWUP_MAX_WORDS = int(os.getenv('CLASSIFIER_FOLLOWUP_MAX_WORDS', '8'))
+    CLASSIFICATION_CACHE_SIZE = int(os.getenv('CLASSIFICATION_CACHE_SIZE', '1024'))
+    CLASSIFICATION_CACHE_TTL = float(os.getenv('CLASSIFICATION_CACHE_TTL', '3600'))
+    CLASSIFICATION_CACHE_CONTEXT_TURNS = int(os.getenv('CLASSIFICATION_CACHE_CONTEXT_TURNS', '2'))
+    ACK_TEMPLATES_ENABLED = os.getenv('ACK_TEMPLATES_ENABLED', 'true').lower() == 'true'
+    SLACK_LLM_FORMATTING = os.getenv('SLACK_LLM_FORMATTING', 'false').lower() == 'true'
+    CONVERSATION_STORE_BACKEND = os.getenv('CONVERSATION_STORE_BACKEND', 'sqlite')
+    CONVERSATION_DB_PATH = os.getenv('CONVERSATION_DB_PATH', '/tmp/conversations.db')
+    CONVERSATION_TABLE_NAME = os.getenv('CONVERSATION_TABLE_NAME', 'conversation_state')
+    CONVERSATION_CACHE_SIZE = int(os.getenv('CONVERSATION_CACHE_SIZE', '1024'))
+    CONVERSATION_TTL = float(os.getenv('CONVERSATION_TTL', '604800'))
+    TOOL_CALL_TIMEOUT = float(os.getenv('TOOL_CALL_TIMEOUT', '30'))
+    TOOL_CALL_CONCURRENCY = int(os.getenv('TOOL_CALL_CONCURRENCY', '4'))
+    INTEGRATION_POOL_SIZE = int(os.getenv('INTEGRATION_POOL_SIZE', '256'))
+    INTEGRATION_POOL_TTL = float(os.getenv('INTEGRATION_POOL_TTL', '3600'))
+    CREDENTIAL_CACHE_SIZE = int(os.getenv('CREDENTIAL_CACHE_SIZE', '512'))
+    CREDENTIAL_CACHE_TTL = float(os.getenv('CREDENTIAL_CACHE_TTL', '3600'))
+    GOOGLE_SERVICE_CACHE_SIZE = int(os.getenv('GOOGLE_SERVICE_CACHE_SIZE', '256'))
+    TOKEN_REFRESH_MARGIN = float(os.getenv('TOKEN_REFRESH_MARGIN', '300'))
+    TOKEN_REFRESH_INTERVAL = float(os.getenv('TOKEN_REFRESH_INTERVAL', '60'))
+    TOKEN_REFRESH_ACTIVE_WINDOW = float(os.getenv('TOKEN_REFRESH_ACTIVE_WINDOW', '1800'))
+    CALENDAR_CACHE_SIZE = int(os.getenv('CALENDAR_CACHE_SIZE', '256'))
+    CALENDAR_SYNC_MIN_INTERVAL = float(os.getenv('CALENDAR_SYNC_MIN_INTERVAL', '15'))
+    CALENDAR_CACHE_MAX_DAYS = int(os.getenv('CALENDAR_CACHE_MAX_DAYS', '366'))
+    CALENDAR_LIST_MAX_RESULTS = int(os.getenv('CALENDAR_LIST_MAX_RESULTS', '250'))
+    WORKING_HOURS_START = int(os.getenv('WORKING_HOURS_START', '9'))
+    WORKING_HOURS_END = int(os.getenv('WORKING_HOURS_END', '17'))
+    MEETING_BUFFER_MINUTES = int(os.getenv('MEETING_BUFFER_MINUTES', '0'))
+    SLOT_GRANULARITY_MINUTES = int(os.getenv('SLOT_GRANULARITY_MINUTES', '5'))
+    SERPAPI_TIMEOUT = float(os.getenv('SERPAPI_TIMEOUT', '20'))
+    SERPAPI_CONNECT_TIMEOUT = float(os.getenv('SERPAPI_CONNECT_TIMEOUT', '5'))
+    SERPAPI_MAX_CONNECTIONS = int(os.getenv('SERPAPI_MAX_CONNECTIONS', '20'))
+    SERPAPI_KEEPALIVE_EXPIRY = float(os.getenv('SERPAPI_KEEPALIVE_EXPIRY', '60'))
+    SERPAPI_CONCURRENCY = int(os.getenv('SERPAPI_CONCURRENCY', '5'))
+    FLIGHT_RESULTS_LIMIT = int(os.getenv('FLIGHT_RESULTS_LIMIT', '5'))
+    HOTEL_RESULTS_LIMIT = int(os.getenv('HOTEL_RESULTS_LIMIT', '5'))
+    TRAVEL_RESULTS_CACHE_SIZE = int(os.getenv('TRAVEL_RESULTS_CACHE_SIZE', '1024'))
+    TRAVEL_RESULTS_TTL = float(os.getenv('TRAVEL_RESULTS_TTL', '3600'))
+    FLEXIBLE_SEARCH_MAX_QUERIES = int(os.getenv('FLEXIBLE_SEARCH_MAX_QUERIES', '30'))
+    SERPAPI_MAX_RETRIES = int(os.getenv('SERPAPI_MAX_RETRIES', '3'))
+    SERPAPI_RETRY_BASE_DELAY = float(os.getenv('SERPAPI_RETRY_BASE_DELAY', '0.5'))
+    SERPAPI_RETRY_MAX_DELAY = float(os.getenv('SERPAPI_RETRY_MAX_DELAY', '8'))
+    SERPAPI_CACHE_DB_PATH = os.getenv('SERPAPI_CACHE_DB_PATH', '/tmp/serpapi_cache.db')
+    SERPAPI_CACHE_SIZE = int(os.getenv('SERPAPI_CACHE_SIZE', '256'))
+    FLIGHT_CACHE_TTL = float(os.getenv('FLIGHT_CACHE_TTL', '900'))
+    SYNC_ASSISTANTS_ON_COLD_START = os.getenv('SYNC_ASSISTANTS_ON_COLD_START', 'false').lower() == 'true'
 settings = Settings()
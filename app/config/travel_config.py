@@ -18,7 +18,19 @@ class TravelConfig(BaseConfig):
     CATEGORY = "travel"
     ASSISTANT_NAME = "TravelAssistant"
     CATEGORY_DESCRIPTION = "Messages about trips, vacations, flights, hotels, or any travel-related queries."
-    FUNCTIONS = ["search_flights", "search_hotels"]
+    FUNCTIONS = ["search_flights", "search_flights_flexible", "search_hotels",
+                 "refine_flight_results", "refine_hotel_results", "get_travel_option_details"]
+    EXAMPLES = [
+        "Find me a flight from New York to Los Angeles on November 15th",
+        "Book a flight to London next week",
+        "Cheapest nonstop flights to Lisbon in March",
+        "Cheapest flight to LIS sometime next week",
+        "Find a hotel in Paris for this weekend",
+        "What are good hotels near Shibuya?",
+        "Show me cheaper hotels from that search",
+        "Plan a trip to Tokyo",
+        "What should I do in Barcelona?",
+    ]
 
     def get_messages(self, history_context: str, user_input: str, function_name: str) -> list:
         return [
@@ -1,13 +1,21 @@
 from google.auth.transport.requests import Request
+from google.auth.exceptions import RefreshError
 from google.oauth2.credentials import Credentials
 from googleapiclient.errors import HttpError
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.http import HttpRequest, build_http
+from googleapiclient import discovery_cache
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import Flow
 from app.config.settings import settings
-from typing import List, Dict, Optional
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+from utils.cache import TTLCache
 from utils.logger import logger
 from dotenv import load_dotenv
 from datetime import datetime
+import threading
 import boto3
 import json
 import os
@@ -16,6 +24,55 @@ import os
 
 load_dotenv()
 
+ENVELOPE_ENCRYPTION = 'aes-256-gcm'
+
+# Parsed discovery documents, shared by every service built in the container
+_discovery_documents: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_discovery_lock = threading.Lock()
+
+def get_discovery_document(api_name: str, api_version: str) -> Dict[str, Any]:
+    """Load the discovery document bundled with googleapiclient once per container"""
+    key = (api_name, api_version)
+    document = _discovery_documents.get(key)
+    if document is None:
+        with _discovery_lock:
+            document = _discovery_documents.get(key)
+            if document is None:
+                content = discovery_cache.get_static_doc(api_name, api_version)
+                if content is None:
+                    raise ValueError(f"No bundled discovery document for {api_name} {api_version}")
+                # build_from_document fills in derived method parameters on first use; later
+                # builds find them already present, so one dict can back every service
+                document = json.loads(content)
+                _discovery_documents[key] = document
+    return document
+
+class ThreadLocalRequestBuilder:
+    """Give each thread its own authorized connection.
+
+    httplib2 is not thread-safe, and tool calls for the same user run in parallel
+    executor threads against one shared service object.
+    """
+    def __init__(self, credentials: Credentials):
+        self.credentials = credentials
+        self._local = threading.local()
+
+    def __call__(self, http, *args, **kwargs) -> HttpRequest:
+        local_http = getattr(self._local, 'http', None)
+        if local_http is None:
+            local_http = AuthorizedHttp(self.credentials, http=build_http())
+            self._local.http = local_http
+        return HttpRequest(local_http, *args, **kwargs)
+
+def build_service(api_name: str, api_version: str, credentials: Credentials):
+    """Build a service from the shared discovery document without fetching or re-parsing it"""
+    request_builder = ThreadLocalRequestBuilder(credentials)
+    return build_from_document(
+        get_discovery_document(api_name, api_version),
+        http=AuthorizedHttp(credentials, http=build_http()),
+        requestBuilder=request_builder
+    )
+
 class GoogleAuthManager:
     def __init__(self):
         self.kms_client = boto3.client('kms')
@@ -23,7 +80,22 @@ class GoogleAuthManager:
         self.dynamodb = boto3.resource('dynamodb')
         self.table = self.dynamodb.Table('user_manifests')
         self.scopes: List[str] = []
-        self.services: Dict[str, Dict[str, any]] = {}  # nested dict for user-specific services
+        # Services keyed by (user_id, api_name, api_version), and the credentials behind them
+        self.services = TTLCache(maxsize=settings.GOOGLE_SERVICE_CACHE_SIZE)
+        self.credentials = TTLCache(maxsize=settings.GOOGLE_SERVICE_CACHE_SIZE)
+        self.credential_cache = TTLCache(maxsize=settings.CREDENTIAL_CACHE_SIZE)
+        # Decrypted data keys by their encrypted blob; there is one key per container that wrote items
+        self._data_keys = TTLCache(maxsize=128)
+        self._data_key: Optional[Tuple[bytes, bytes]] = None
+        self._data_key_lock = threading.Lock()
+        self.write_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='credential-writer')
+        # Users seen recently get their tokens refreshed ahead of expiry by the scheduler thread
+        self.active_users = TTLCache(maxsize=settings.CREDENTIAL_CACHE_SIZE, ttl=settings.TOKEN_REFRESH_ACTIVE_WINDOW)
+        self.refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='token-refresh')
+        self._refreshes: Dict[str, Future] = {}
+        self._refresh_lock = threading.Lock()
+        self._scheduler: Optional[threading.Thread] = None
+        self._stop_scheduler = threading.Event()
 
     def add_scope(self, scope: str):
         if scope not in self.scopes:
@@ -44,8 +116,60 @@ class GoogleAuthManager:
         flow.redirect_uri = settings.GOOGLE_REDIRECT_URI
         return flow
 
+    def _get_data_key(self) -> Tuple[bytes, bytes]:
+        """Plaintext and KMS-encrypted data key, generated once per container"""
+        with self._data_key_lock:
+            if self._data_key is None:
+                response = self.kms_client.generate_data_key(KeyId=self.kms_key_id, KeySpec='AES_256')
+                self._data_key = (response['Plaintext'], response['CiphertextBlob'])
+                self._data_keys.set(response['CiphertextBlob'], response['Plaintext'])
+            return self._data_key
+
+    def _decrypt_data_key(self, encrypted_key: bytes) -> bytes:
+        """Decrypt a data key written by any container; KMS is only called for keys not seen before"""
+        data_key = self._data_keys.get(encrypted_key)
+        if data_key is None:
+            data_key = self.kms_client.decrypt(CiphertextBlob=encrypted_key, KeyId=self.kms_key_id)['Plaintext']
+            self._data_keys.set(encrypted_key, data_key)
+        return data_key
+
+    def _encrypt_manifest(self, user_id: str, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        data_key, encrypted_key = self._get_data_key()
+        nonce = os.urandom(12)
+        # The user ID is bound as associated data so an item can't be replayed under another user
+        ciphertext = AESGCM(data_key).encrypt(nonce, json.dumps(manifest).encode(), user_id.encode())
+        return {
+            'manifest_data': nonce + ciphertext,
+            'data_key': encrypted_key,
+            'encryption': ENVELOPE_ENCRYPTION
+        }
+
+    def _decrypt_manifest(self, user_id: str, item: Dict[str, Any]) -> Dict[str, Any]:
+        if item.get('encryption') == ENVELOPE_ENCRYPTION:
+            data_key = self._decrypt_data_key(bytes(item['data_key']))
+            blob = bytes(item['manifest_data'])
+            decrypted_data = AESGCM(data_key).decrypt(blob[:12], blob[12:], user_id.encode())
+        else:
+            # Items saved before envelope encryption were encrypted with the KMS key directly
+            decrypted_data = self.kms_client.decrypt(
+                CiphertextBlob=bytes(item['manifest_data']),
+                KeyId=self.kms_key_id
+            )['Plaintext']
+
+        if isinstance(decrypted_data, bytes):
+            decrypted_data = decrypted_data.decode('utf-8')
+        return json.loads(decrypted_data)
+
+    def _cache_credentials(self, user_id: str, credentials: Credentials):
+        """Keep decrypted credentials in memory until their access token expires"""
+        ttl = settings.CREDENTIAL_CACHE_TTL
+        if credentials.expiry:
+            ttl = min(ttl, (credentials.expiry - datetime.utcnow()).total_seconds())
+        if ttl > 0:
+            self.credential_cache.set(user_id, credentials, ttl=ttl)
+
     def save_credentials(self, user_id: str, credentials: Credentials) -> bool:
-        """Save user credentials to DynamoDB with encryption"""
+        """Save user credentials to DynamoDB with envelope encryption"""
         try:
             manifest = {
                 'token': credentials.token,
@@ -53,84 +177,193 @@ class GoogleAuthManager:
                 'token_uri': credentials.token_uri,
                 'client_id': credentials.client_id,
                 'client_secret': credentials.client_secret,
-                'scopes': credentials.scopes
+                'scopes': credentials.scopes,
+                'expiry': credentials.expiry.isoformat() if credentials.expiry else None
             }
             
-            encrypted_data = self.kms_client.encrypt(
-                KeyId=self.kms_key_id,
-                Plaintext=json.dumps(manifest).encode()
-            )['CiphertextBlob']
-            
             item = {
                 'user_id': user_id,
-                'manifest_data': encrypted_data,
-                'updated_at': datetime.utcnow().isoformat()
+                'updated_at': datetime.utcnow().isoformat(),
+                **self._encrypt_manifest(user_id, manifest)
             }
             self.table.put_item(Item=item)
+            self._cache_credentials(user_id, credentials)
             logger.info(f"Saved encrypted credentials for user {user_id}")
             return True
         except Exception as e:
             logger.error(f"Error saving credentials: {e}")
             return False
 
+    def save_credentials_async(self, user_id: str, credentials: Credentials) -> Future:
+        """Cache refreshed credentials now and write them back to DynamoDB in the background"""
+        self._cache_credentials(user_id, credentials)
+        return self.write_executor.submit(self.save_credentials, user_id, credentials)
+
     def get_credentials(self, user_id: str) -> Optional[Credentials]:
-        """Get user credentials from DynamoDB with decryption"""
+        """Get user credentials from the in-memory cache, falling back to DynamoDB.
+
+        Tokens close to expiry are refreshed in the background; the caller only
+        waits for a refresh when the token has already expired.
+        """
+        self.active_users.set(user_id, True)
+        credentials = self.credential_cache.get(user_id)
+        if credentials is not None:
+            if credentials.valid:
+                if self._expires_soon(credentials):
+                    self.refresh_credentials(user_id, credentials)
+                return credentials
+            if credentials.refresh_token:
+                return self._wait_for_refresh(user_id, credentials)
+
         try:
             response = self.table.get_item(Key={'user_id': user_id})
             if 'Item' not in response:
                 return None
 
-            decrypted_data = self.kms_client.decrypt(
-                CiphertextBlob=bytes(response['Item']['manifest_data']),
-                KeyId=self.kms_key_id
-            )['Plaintext']
-            
-            if isinstance(decrypted_data, bytes):
-                decrypted_data = decrypted_data.decode('utf-8')
-                
-            manifest = json.loads(decrypted_data)
+            manifest = self._decrypt_manifest(user_id, response['Item'])
             credentials = Credentials(
                 token=manifest['token'],
                 refresh_token=manifest['refresh_token'],
                 token_uri=manifest['token_uri'],
                 client_id=manifest['client_id'],
                 client_secret=manifest['client_secret'],
-                scopes=manifest['scopes']
+                scopes=manifest['scopes'],
+                expiry=datetime.fromisoformat(manifest['expiry']) if manifest.get('expiry') else None
             )
 
             # Refresh if needed
             if not credentials.valid:
                 if credentials.expired and credentials.refresh_token:
-                    credentials.refresh(Request())
-                    self.save_credentials(user_id, credentials)
-                else:
-                    return None
+                    return self._wait_for_refresh(user_id, credentials)
+                return None
 
+            self._cache_credentials(user_id, credentials)
+            if self._expires_soon(credentials):
+                self.refresh_credentials(user_id, credentials)
             return credentials
         except Exception as e:
             logger.error(f"Error getting credentials: {str(e)}")
             return None
 
+    def _expires_soon(self, credentials: Credentials) -> bool:
+        if not credentials.expiry or not credentials.refresh_token:
+            return False
+        return (credentials.expiry - datetime.utcnow()).total_seconds() < settings.TOKEN_REFRESH_MARGIN
+
+    def refresh_credentials(self, user_id: str, credentials: Credentials) -> Future:
+        """Start a background refresh, or join the one already in flight for this user"""
+        with self._refresh_lock:
+            future = self._refreshes.get(user_id)
+            if future is None:
+                future = self.refresh_executor.submit(self._refresh, user_id, credentials)
+                self._refreshes[user_id] = future
+            return future
+
+    def _refresh(self, user_id: str, credentials: Credentials) -> bool:
+        try:
+            # Services hold this same object, so they pick up the new token immediately
+            credentials.refresh(Request())
+            self.save_credentials_async(user_id, credentials)
+            logger.debug(f"Refreshed credentials for user {user_id}, expiring at {credentials.expiry}")
+            return True
+        except RefreshError as e:
+            logger.error(f"Refresh token rejected for user {user_id}: {e}")
+            self.invalidate_user(user_id)
+            return False
+        except Exception as e:
+            logger.error(f"Error refreshing credentials for user {user_id}: {e}")
+            return False
+        finally:
+            with self._refresh_lock:
+                self._refreshes.pop(user_id, None)
+
+    def _wait_for_refresh(self, user_id: str, credentials: Credentials) -> Optional[Credentials]:
+        refreshed = self.refresh_credentials(user_id, credentials).result()
+        return credentials if refreshed else None
+
+    def refresh_expiring_credentials(self) -> int:
+        """Start refreshes for recently active users whose tokens expire within the margin"""
+        started = 0
+        for user_id in self.active_users.keys():
+            if user_id not in self.active_users:
+                continue
+            credentials = self.credential_cache.get(user_id) or self.credentials.get(user_id)
+            if credentials is not None and self._expires_soon(credentials):
+                self.refresh_credentials(user_id, credentials)
+                started += 1
+        return started
+
+    def start_refresh_scheduler(self):
+        """Start the daemon thread that refreshes tokens ahead of expiry"""
+        if self._scheduler is not None and self._scheduler.is_alive():
+            return
+        self._stop_scheduler.clear()
+        self._scheduler = threading.Thread(target=self._refresh_loop, name='token-refresh-scheduler', daemon=True)
+        self._scheduler.start()
+
+    def stop_refresh_scheduler(self):
+        self._stop_scheduler.set()
+
+    def _refresh_loop(self):
+        while not self._stop_scheduler.wait(settings.TOKEN_REFRESH_INTERVAL):
+            try:
+                started = self.refresh_expiring_credentials()
+                if started:
+                    logger.debug(f"Started {started} proactive token refreshes")
+            except Exception as e:
+                logger.error(f"Error in token refresh scheduler: {e}")
+
     def get_service(self, user_id: str, api_name: str, api_version: str):
         """Get a Google service client for a specific user"""
-        service_key = f"{api_name}_{api_version}"
-        user_services = self.services.get(user_id, {})
+        service_key = (user_id, api_name, api_version)
+        if user_id in self.credentials and self.credentials_expired(user_id):
+            logger.info(f"Credentials for user {user_id} expired, rebuilding services")
+            self.invalidate_user(user_id)
 
-        if service_key not in user_services:
+        service = self.services.get(service_key)
+        if service is None:
             credentials = self.get_credentials(user_id)
             if not credentials:
                 raise Exception(f"No valid credentials for user {user_id}")
 
             try:
-                service = build(api_name, api_version, credentials=credentials)
-                if user_id not in self.services:
-                    self.services[user_id] = {}
-                self.services[user_id][service_key] = service
+                service = build_service(api_name, api_version, credentials)
             except HttpError as error:
                 logger.error(f"Error building {api_name} service: {error}")
                 raise
+            self.services.set(service_key, service)
+            self.credentials.set(user_id, credentials)
+            logger.debug(f"Built {api_name} {api_version} service for user {user_id}, cache stats: {self.services.stats()}")
+
+        return service
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit/miss counters of the per-user service and credential caches"""
+        return {
+            "services": self.services.stats(),
+            "credentials": self.credential_cache.stats()
+        }
+
+    def get_credentials_expiry(self, user_id: str) -> Optional[datetime]:
+        """Access token expiry of the credentials behind the user's cached services"""
+        credentials = self.credentials.get(user_id)
+        return credentials.expiry if credentials else None
+
+    def credentials_expired(self, user_id: str) -> bool:
+        """True when the user's cached services can no longer authenticate and must be rebuilt"""
+        credentials = self.credentials.get(user_id)
+        if credentials is None:
+            return True
+        # Expired access tokens are refreshed transparently as long as there is a refresh token
+        return credentials.expired and not credentials.refresh_token
 
-        return self.services[user_id][service_key]
+    def invalidate_user(self, user_id: str):
+        """Drop cached services and credentials, e.g. after re-authorization or a failed refresh"""
+        for service_key in self.services.keys():
+            if service_key[0] == user_id:
+                self.services.pop(service_key)
+        self.credentials.pop(user_id)
+        self.credential_cache.pop(user_id)
 
 # Create a global instance
 google_auth_manager = GoogleAuthManager()
@@ -141,6 +374,7 @@ def initialize_google_auth():
     google_auth_manager.add_scope('https://www.googleapis.com/auth/gmail.compose')
     google_auth_manager.add_scope('https://www.googleapis.com/auth/gmail.modify')
     google_auth_manager.add_scope('https://www.googleapis.com/auth/gmail.send')
+    google_auth_manager.start_refresh_scheduler()
     logger.info("Google authentication scopes initialized")
 
 def get_google_service(user_id: str, api_name: str, api_version: str = None):
@@ -1,64 +1,124 @@
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+from typing import List, Dict, Any, Optional
 from app.config.settings import settings
-from typing import List, Dict, Any
 from utils.logger import logger
-from openai import OpenAI
-
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+import importlib.util
+import asyncio
+import httpx
+
+_sync_client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _http2_available() -> bool:
+    # httpx only speaks HTTP/2 when the optional h2 package is installed
+    return importlib.util.find_spec("h2") is not None
+
+def _connection_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY
+    )
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT)
+
+def get_openai_client() -> OpenAI:
+    """Process-wide synchronous client sharing one connection pool"""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = OpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            http_client=DefaultHttpxClient(limits=_connection_limits(), timeout=_timeout(), http2=_http2_available())
+        )
+    return _sync_client
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """Process-wide async client sharing one keep-alive connection pool.
+
+    Pooled connections belong to the event loop that opened them, so a new
+    client is built if called from a different loop (e.g. a new asyncio.run).
+    """
+    global _async_client, _async_client_loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if _async_client is None or (loop is not None and loop is not _async_client_loop):
+        logger.debug(f"Creating shared AsyncOpenAI client (http2={_http2_available()})")
+        _async_client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            http_client=DefaultAsyncHttpxClient(limits=_connection_limits(), timeout=_timeout(), http2=_http2_available())
+        )
+        _async_client_loop = loop
+    return _async_client
 
 class OpenAIClient:
     def __init__(self):
         self.model = "gpt-4o-2024-08-06"
 
-    def _create_chat_completion(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
-        response = client.chat.completions.create(model=self.model, messages=messages)
+    @property
+    def client(self) -> AsyncOpenAI:
+        return get_async_openai_client()
+
+    async def _create_chat_completion(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        response = await self.client.chat.completions.create(model=self.model, messages=messages)
         return {
             "role": response.choices[0].message.role,
             "message": response.choices[0].message.content
         }
 
-    def generate_text(self, prompt: str, max_tokens: int = 150) -> str:
+    async def generate_text(self, prompt: str, max_tokens: int = 150) -> str:
         messages = [
             {"role": "system", "content": "You are a helpful assistant."},
             {"role": "user", "content": prompt}
         ]
-        return self._create_chat_completion(messages)["message"]
+        response = await self._create_chat_completion(messages)
+        return response["message"]
 
-    def summarize_text(self, text: str) -> str:
+    async def summarize_text(self, text: str) -> str:
         messages = [
             {"role": "system", "content": "You are a helpful assistant that summarizes text."},
             {"role": "user", "content": f"Please summarize the following text:\n\n{text}"}
         ]
-        return self._create_chat_completion(messages)["message"]
+        response = await self._create_chat_completion(messages)
+        return response["message"]
 
-    def extract_keywords(self, text: str) -> List[str]:
+    async def extract_keywords(self, text: str) -> List[str]:
         messages = [
             {"role": "system", "content": "You are a helpful assistant that extracts keywords from text."},
             {"role": "user", "content": f"Please extract the main keywords from the following text:\n\n{text}"}
         ]
-        return self._create_chat_completion(messages)["message"].strip().lower().split(", ")
+        response = await self._create_chat_completion(messages)
+        return response["message"].strip().lower().split(", ")
 
-    def classify_text(self, text: str, categories: List[str]) -> str:
+    async def classify_text(self, text: str, categories: List[str]) -> str:
         messages = [
             {"role": "system", "content": "You are a helpful assistant that classifies text."},
             {"role": "user", "content": f"Please classify the following text into one of these categories. Your output will be a single word: {', '.join(categories)}\n\nText: {text}"}
         ]
-        return self._create_chat_completion(messages)["message"].strip().lower()
+        response = await self._create_chat_completion(messages)
+        return response["message"].strip().lower()
 
-    def analyze_sentiment(self, text: str) -> str:
+    async def analyze_sentiment(self, text: str) -> str:
         messages = [
             {"role": "system", "content": "You are a helpful assistant that analyzes sentiment in text."},
             {"role": "user", "content": f"Please analyze the sentiment of the following text:\n\n{text}"}
         ]
-        return self._create_chat_completion(messages)["message"]
+        response = await self._create_chat_completion(messages)
+        return response["message"]
 
-    def search_documents(self, query: str, documents: List[str]) -> List[str]:
+    async def search_documents(self, query: str, documents: List[str]) -> List[str]:
         messages = [
             {"role": "system", "content": "You are a helpful assistant that searches for relevant documents."},
             {"role": "user", "content": f"Given the following documents, please find the most relevant ones for the query: '{query}'\n\nDocuments:\n" + "\n".join(documents)}
         ]
-        return self._create_chat_completion(messages)["message"].split(", ")
+        response = await self._create_chat_completion(messages)
+        return response["message"].split(", ")
 
-    def classify_with_context(self, current_message: str, chat_history: List[str], categories: List[str]) -> str:
+    async def classify_with_context(self, current_message: str, chat_history: List[str], categories: List[str]) -> str:
         context = "\n".join(chat_history[-5:])
         messages = [
             {"role": "system", "content": "You are a helpful assistant that classifies messages based on context. Pay close attention to the difference between travel requests and flight selections."},
@@ -77,9 +137,10 @@ class OpenAIClient:
             - If in doubt between 'travel' and 'flight_selection', choose 'travel'.
             """}
         ]
-        return self._create_chat_completion(messages)["message"].strip().lower()
+        response = await self._create_chat_completion(messages)
+        return response["message"].strip().lower()
     
-    def extract_travel_request(self, unstructured_text: str, chat_history: List[str]) -> str:
+    async def extract_travel_request(self, unstructured_text: str, chat_history: List[str]) -> str:
         context = "\n".join(chat_history[-10:])
         messages = [
             {"role": "system", "content": "You are a helpful assistant that extracts structured travel request data from unstructured text. Always respond with a valid JSON object without any Markdown formatting."},
@@ -91,18 +152,19 @@ class OpenAIClient:
             Travel request: {unstructured_text}
             """}
         ]
-        response = self._create_chat_completion(messages)
+        response = await self._create_chat_completion(messages)
         logger.debug(f"OpenAI response for travel request extraction: {response}")
         return response["message"]
 
-    def generate_short_response(self, message: str) -> str:
+    async def generate_short_response(self, message: str) -> str:
         messages = [
             {"role": "system", "content": "You are a brief, friendly assistant providing quick acknowledgments. Keep responses to one short sentence, indicating you're processing the request without elaborating."},
             {"role": "user", "content": f"Give a very brief, positive acknowledgment for this request, hinting at a seamless transition to a more detailed response: {message}"}
         ]
-        return self._create_chat_completion(messages)["message"]
+        response = await self._create_chat_completion(messages)
+        return response["message"]
 
-    def identify_event(self, user_message: str, events: List[Dict[str, Any]]) -> str:
+    async def identify_event(self, user_message: str, events: List[Dict[str, Any]]) -> str:
         events_context = "\n".join([f"ID: {event['id']}, Title: {event['summary']}, Start: {event['start']}, End: {event['end']}" for event in events])
         messages = [
             {"role": "system", "content": "You are a helpful assistant that identifies which event a user is referring to based on their message and a list of events."},
@@ -116,5 +178,5 @@ class OpenAIClient:
             If you can't determine which event the user is referring to, respond with 'UNCLEAR'.
             """}
         ]
-        response = self._create_chat_completion(messages)
+        response = await self._create_chat_completion(messages)
         return response["message"].strip()
\ No newline at end of file
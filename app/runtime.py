@@ -0,0 +1,62 @@
+from app.assistants.update_assistants import update_assistants
+from slack_bolt.adapter.aws_lambda import SlackRequestHandler
+from app.google_client import initialize_google_auth
+from app.config.config_manager import ConfigManager
+from app.slack_bot import create_slack_bot
+from app.config.settings import settings
+from utils.logger import logger
+import asyncio
+
+class SlackRuntime:
+    """Container-lifetime state for the Lambda handler.
+
+    The Slack app, assistant registry and event loop are built once on cold
+    start and reused by every warm invocation in the same container.
+    """
+    def __init__(self):
+        self.loop = None
+        self.config_manager = None
+        self.slack_app = None
+        self.handler = None
+        self.initialized = False
+
+    def initialize(self):
+        if self.initialized:
+            return
+
+        logger.debug("Cold start: initializing Slack runtime")
+        initialize_google_auth()
+
+        # Verify KMS key is available
+        if not settings.KMS_KEY_ID:
+            raise ValueError("KMS_KEY_ID setting is required")
+
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.config_manager = ConfigManager()
+
+        if settings.SYNC_ASSISTANTS_ON_COLD_START:
+            self._run(update_assistants(self.config_manager))
+
+        self.slack_app = create_slack_bot(self.config_manager)
+        self.handler = SlackRequestHandler(self.slack_app)
+        self.initialized = True
+        logger.debug(f"Slack runtime initialized, app type: {type(self.slack_app)}")
+
+    def sync_assistants(self):
+        """Push assistant tools and instructions to OpenAI (redeploy-time hook)."""
+        self.initialize()
+        logger.info("Syncing assistants")
+        self._run(update_assistants(self.config_manager))
+        return {"statusCode": 200, "body": "Assistants synced"}
+
+    def handle(self, event, context):
+        self.initialize()
+        asyncio.set_event_loop(self.loop)
+        return self.handler.handle(event, context)
+
+    def _run(self, coro):
+        return self.loop.run_until_complete(coro)
+
+# Created at import time so it lives as long as the container
+runtime = SlackRuntime()
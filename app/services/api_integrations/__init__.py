@@ -5,10 +5,18 @@ class APIIntegration(ABC):
     async def execute(self, function_name: str, params: dict) -> str:
         pass
 
+    def is_expired(self) -> bool:
+        """Whether a pooled instance must be rebuilt, e.g. because its credentials expired"""
+        return False
+
+    # Tools and instructions don't depend on the user, so they are classmethods
+    # that can be read without building credentials or API clients
+    @classmethod
     @abstractmethod
-    def get_tools(self) -> list:
+    def get_tools(cls) -> list:
         pass
 
+    @classmethod
     @abstractmethod
-    def get_instructions(self) -> str:
+    def get_instructions(cls) -> str:
         pass
\ No newline at end of file
@@ -1,8 +1,9 @@
 from app.services.calendar.calendar_manager import CalendarManager
 from app.services.api_integrations import APIIntegration
+from app.google_client import google_auth_manager
 from app.openai_helper import OpenAIClient
 from app.config.settings import settings
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List
 from utils.logger import logger
 import asyncio
 
@@ -18,9 +19,15 @@ class CalendarIntegration(APIIntegration):
         self.default_timezone = settings.DEFAULT_TIMEZONE
         self.openai_client = OpenAIClient()
 
+    def is_expired(self) -> bool:
+        return google_auth_manager.credentials_expired(self.user_id)
+
     async def execute(self, function_name: str, params: dict) -> str:
         logger.debug(f"CalendarIntegration executing function for user {self.user_id}: {function_name} with params: {params}")
         
+        # The dispatcher adds user_id and conversation_key to every call; the calendar manager is already bound to the user
+        params = {k: v for k, v in params.items() if k not in ('user_id', 'conversation_key')}
+
         if function_name == "check_available_slots":
             return await self._check_available_slots(params)
         elif function_name == "create_event":
@@ -33,6 +40,14 @@ class CalendarIntegration(APIIntegration):
             return await self._list_events(params)
         elif function_name == "identify_event":
             return await self._identify_event(params['user_message'], params['start_date'], params['end_date'])
+        elif function_name == "create_events_bulk":
+            return await self._create_events_bulk(params)
+        elif function_name == "update_events_bulk":
+            return await self._update_events_bulk(params)
+        elif function_name == "delete_events_bulk":
+            return await self._delete_events_bulk(params)
+        elif function_name == "find_group_availability":
+            return await self._find_group_availability(params)
         else:
             logger.warning(f"Unknown function in CalendarIntegration: {function_name}")
             return f"Unknown function: {function_name}"
@@ -88,7 +103,8 @@ class CalendarIntegration(APIIntegration):
             return f"Missing required parameters for updating an event: {', '.join(missing_params)}"
         
         try:
-            return self.calendar_manager.update_event(**params)
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, lambda: self.calendar_manager.update_event(**params))
         except Exception as e:
             logger.error(f"Error in updating an event: {str(e)}", exc_info=True)
             return f"An error occurred while updating an event: {str(e)}"
@@ -100,11 +116,83 @@ class CalendarIntegration(APIIntegration):
             return f"Missing required parameters for deleting an event: {', '.join(missing_params)}"
         
         try:
-            return self.calendar_manager.delete_event(**params)
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, lambda: self.calendar_manager.delete_event(**params))
         except Exception as e:
             logger.error(f"Error in deleting an event: {str(e)}", exc_info=True)
             return f"An error occurred while deleting an event: {str(e)}"
 
+    async def _create_events_bulk(self, params: dict) -> str:
+        events = params.get("events")
+        if not events:
+            return "Missing required parameters for creating events: events"
+
+        create_params = ["summary", "start_time", "end_time", "description", "location", "timezone"]
+        prepared = []
+        for event in events:
+            missing_params = [param for param in ["summary", "start_time", "end_time"] if not event.get(param)]
+            if missing_params:
+                return f"Missing required parameters for creating an event: {', '.join(missing_params)}"
+            event = {k: v for k, v in event.items() if k in create_params}
+            if event.get('timezone') in (None, 'NULL'):
+                event['timezone'] = self.default_timezone
+            prepared.append(event)
+
+        try:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, lambda: self.calendar_manager.create_events(prepared))
+        except Exception as e:
+            logger.error(f"Error in creating events: {str(e)}", exc_info=True)
+            return f"An error occurred while creating events: {str(e)}"
+
+    async def _update_events_bulk(self, params: dict) -> str:
+        updates = params.get("updates")
+        if not updates:
+            return "Missing required parameters for updating events: updates"
+        if any(not update.get("event_id") for update in updates):
+            return "Missing required parameters for updating an event: event_id"
+
+        update_params = ["event_id", "summary", "start_time", "end_time", "description", "location"]
+        prepared = [{k: v for k, v in update.items() if k in update_params} for update in updates]
+
+        try:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, lambda: self.calendar_manager.update_events(prepared))
+        except Exception as e:
+            logger.error(f"Error in updating events: {str(e)}", exc_info=True)
+            return f"An error occurred while updating events: {str(e)}"
+
+    async def _delete_events_bulk(self, params: dict) -> str:
+        event_ids = params.get("event_ids")
+        if not event_ids:
+            return "Missing required parameters for deleting events: event_ids"
+
+        try:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, lambda: self.calendar_manager.delete_events(event_ids))
+        except Exception as e:
+            logger.error(f"Error in deleting events: {str(e)}", exc_info=True)
+            return f"An error occurred while deleting events: {str(e)}"
+
+    async def _find_group_availability(self, params: dict) -> str:
+        required_params = ["attendees", "start_date", "end_date", "duration"]
+        missing_params = [param for param in required_params if not params.get(param)]
+        if missing_params:
+            return f"Missing required parameters for finding group availability: {', '.join(missing_params)}"
+
+        if params.get('timezone') in (None, 'NULL'):
+            params['timezone'] = self.default_timezone
+
+        group_params = ["attendees", "start_date", "end_date", "duration", "timezone", "required_attendees"]
+        params = {k: v for k, v in params.items() if k in group_params}
+
+        try:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, lambda: self.calendar_manager.find_group_availability(**params))
+        except Exception as e:
+            logger.error(f"Error in finding group availability: {str(e)}", exc_info=True)
+            return f"An error occurred while finding group availability: {str(e)}"
+
     async def _list_events(self, params: dict) -> str:
         required_params = ["start_date", "end_date"]
         if not all(param in params for param in required_params):
@@ -116,36 +204,47 @@ class CalendarIntegration(APIIntegration):
             params['timezone'] = self.default_timezone
             logger.info(f"Using default timezone: {self.default_timezone}")
         
+        # 0 or a missing value means the configured default
+        max_results = params.pop('max_results', None) or settings.CALENDAR_LIST_MAX_RESULTS
+        list_params = ["start_date", "end_date", "timezone"]
+        params = {k: v for k, v in params.items() if k in list_params}
+
         try:
             # Run the synchronous method in a thread to avoid blocking
             loop = asyncio.get_event_loop()
-            events = await loop.run_in_executor(None, lambda: self.calendar_manager.list_events(**params))
-            
-            # Format the events into a readable string
-            result = "Events:\n\n"
-            for event in events:
-                result += f"ID: {event['id']}\n"
-                result += f"Title: {event['summary']}\n"
-                result += f"Start: {event['start']}\n"
-                result += f"End: {event['end']}\n"
-                if event['description']:
-                    result += f"Description: {event['description']}\n"
-                if event['location']:
-                    result += f"Location: {event['location']}\n"
-                result += "\n"
-            
-            return result.strip()
+            # One extra event tells us whether the list was cut off
+            events = self.calendar_manager.iter_events(**params, max_results=max_results + 1)
+            return await loop.run_in_executor(None, lambda: self._format_events(events, max_results))
         except Exception as e:
             logger.error(f"Error in listing events: {str(e)}", exc_info=True)
             return f"An error occurred while listing events: {str(e)}"
 
+    def _format_events(self, events: Iterator[Dict[str, Any]], max_results: int) -> str:
+        """Format events into a readable string as they are read"""
+        blocks = []
+        for event in events:
+            if len(blocks) == max_results:
+                blocks.append(f"Showing the first {max_results} events. Narrow the date range to see the rest.")
+                break
+            lines = [f"ID: {event['id']}", f"Title: {event['summary']}", f"Start: {event['start']}", f"End: {event['end']}"]
+            if event['description']:
+                lines.append(f"Description: {event['description']}")
+            if event['location']:
+                lines.append(f"Location: {event['location']}")
+            blocks.append('\n'.join(lines))
+
+        if not blocks:
+            return "No events found in the given date range."
+        return "Events:\n\n" + '\n\n'.join(blocks)
+
     async def _identify_event(self, user_message: str, start_date: str, end_date: str) -> str:
         try:
-            # Get events for the specified date range
-            events = await self._list_events({"start_date": start_date, "end_date": end_date})
+            # Get events for the specified date range; served from the synced event cache
+            loop = asyncio.get_event_loop()
+            events = await loop.run_in_executor(None, lambda: self.calendar_manager.list_events(start_date, end_date))
             
             # Use OpenAI to identify the event
-            event_id = self.openai_client.identify_event(user_message, events)
+            event_id = await self.openai_client.identify_event(user_message, events)
             
             if event_id == 'UNCLEAR':
                 return "I'm sorry, I couldn't determine which event you're referring to. Could you please provide more details?"
@@ -162,7 +261,8 @@ class CalendarIntegration(APIIntegration):
             logger.error(f"Error in identifying event: {str(e)}", exc_info=True)
             return f"An error occurred while identifying the event: {str(e)}"
 
-    def get_tools(self) -> List[Dict[str, Any]]:
+    @classmethod
+    def get_tools(cls) -> List[Dict[str, Any]]:
         return [
             {
                 "type": "function",
@@ -249,9 +349,10 @@ class CalendarIntegration(APIIntegration):
                         "properties": {
                             "start_date": {"type": "string", "description": "The start date of the range to check (YYYY-MM-DD)"},
                             "end_date": {"type": "string", "description": "The end date of the range to check (YYYY-MM-DD)"},
-                            "timezone": {"type": "string", "description": "The timezone for the search (optional, default is NULL)"}
+                            "timezone": {"type": "string", "description": "The timezone for the search (optional, default is NULL)"},
+                            "max_results": {"type": "integer", "description": "The maximum number of events to list (0 for the default limit)"}
                         },
-                        "required": ["start_date", "end_date", "timezone"],
+                        "required": ["start_date", "end_date", "timezone", "max_results"],
                         "additionalProperties": False
                     },
                     "strict": True
@@ -274,10 +375,122 @@ class CalendarIntegration(APIIntegration):
                     },
                     "strict": True
                 }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "create_events_bulk",
+                    "description": "Create several events in the calendar with a single request.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "events": {
+                                "type": "array",
+                                "description": "The events to create",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "summary": {"type": "string", "description": "The title of the event"},
+                                        "start_time": {"type": "string", "description": "The start time of the event (YYYY-MM-DDTHH:MM:SS)"},
+                                        "end_time": {"type": "string", "description": "The end time of the event (YYYY-MM-DDTHH:MM:SS)"},
+                                        "description": {"type": "string", "description": "The description of the event (optional)"},
+                                        "location": {"type": "string", "description": "The location of the event (optional)"},
+                                        "timezone": {"type": "string", "description": "The timezone for the event (optional, default is NULL)"}
+                                    },
+                                    "required": ["summary", "start_time", "end_time", "description", "location", "timezone"],
+                                    "additionalProperties": False
+                                }
+                            }
+                        },
+                        "required": ["events"],
+                        "additionalProperties": False
+                    },
+                    "strict": True
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "update_events_bulk",
+                    "description": "Update several existing events in the calendar with a single request. Only non-empty fields are changed.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "updates": {
+                                "type": "array",
+                                "description": "The events to update",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "event_id": {"type": "string", "description": "The ID of the event to update"},
+                                        "summary": {"type": "string", "description": "The updated title of the event (optional)"},
+                                        "start_time": {"type": "string", "description": "The updated start time of the event (YYYY-MM-DDTHH:MM:SS) (optional)"},
+                                        "end_time": {"type": "string", "description": "The updated end time of the event (YYYY-MM-DDTHH:MM:SS) (optional)"}
+                                    },
+                                    "required": ["event_id", "summary", "start_time", "end_time"],
+                                    "additionalProperties": False
+                                }
+                            }
+                        },
+                        "required": ["updates"],
+                        "additionalProperties": False
+                    },
+                    "strict": True
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "delete_events_bulk",
+                    "description": "Delete several events from the calendar with a single request.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "event_ids": {
+                                "type": "array",
+                                "description": "The IDs of the events to delete",
+                                "items": {"type": "string"}
+                            }
+                        },
+                        "required": ["event_ids"],
+                        "additionalProperties": False
+                    },
+                    "strict": True
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "find_group_availability",
+                    "description": "Find and rank meeting times that suit a group of attendees, based on their free/busy information.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "attendees": {
+                                "type": "array",
+                                "description": "Email addresses or calendar IDs of the attendees, not including the user",
+                                "items": {"type": "string"}
+                            },
+                            "required_attendees": {
+                                "type": "array",
+                                "description": "Attendees who must be able to attend (empty if everyone is optional)",
+                                "items": {"type": "string"}
+                            },
+                            "start_date": {"type": "string", "description": "The start date of the range to check (YYYY-MM-DD)"},
+                            "end_date": {"type": "string", "description": "The end date of the range to check (YYYY-MM-DD)"},
+                            "duration": {"type": "integer", "description": "The duration of the meeting in minutes"},
+                            "timezone": {"type": "string", "description": "The timezone for the search (optional, default is NULL)"}
+                        },
+                        "required": ["attendees", "required_attendees", "start_date", "end_date", "duration", "timezone"],
+                        "additionalProperties": False
+                    },
+                    "strict": True
+                }
             }
         ]
 
-    def get_instructions(self) -> str:
+    @classmethod
+    def get_instructions(cls) -> str:
         return """You are a Calendar Assistant. Use the provided functions to complete the user's requests.
         - Checking available time slots in the calendar.
         - Creating new events in the calendar.
@@ -285,9 +498,15 @@ class CalendarIntegration(APIIntegration):
         - Deleting events from the calendar.
         - Listing events within a given date range.
         - Identifying specific events based on user descriptions.
+        - Creating, updating or deleting several events at once.
+        - Finding meeting times that work for a group of attendees.
 
         When a user asks about updating or deleting an event, first use the identify_event function to determine which event they're referring to. Always confirm with the user before making any changes to preexisting events.
 
+        When a request involves more than one event (for example rescheduling several meetings), use the bulk functions instead of calling the single-event functions repeatedly.
+
+        When the user wants to meet with other people, use find_group_availability with their email addresses. Times are ranked by how many attendees are free; mention who can't make the top suggestions.
+
         When listing events, provide the event IDs along with other details to allow for easy updating or deleting of specific events.
 
         Provide clear and concise responses, and offer additional assistance if needed.
@@ -1,5 +1,6 @@
 from app.services.gmail.gmail_manager import GmailManager
 from app.services.api_integrations import APIIntegration
+from app.google_client import google_auth_manager
 from typing import Dict, Any, List
 from utils.logger import logger
 
@@ -13,11 +14,14 @@ class GmailIntegration(APIIntegration):
         logger.info(f"Creating GmailManager for user_id: {user_id}")
         self.gmail_manager = GmailManager(user_id)
 
+    def is_expired(self) -> bool:
+        return google_auth_manager.credentials_expired(self.user_id)
+
     async def execute(self, function_name: str, params: dict) -> str:
         logger.debug(f"GmailIntegration executing function for user {self.user_id}: {function_name}")
         
-        # Remove user_id from params before passing to gmail_manager
-        params = {k: v for k, v in params.items() if k != 'user_id'}
+        # Remove user_id and conversation_key from params before passing to gmail_manager
+        params = {k: v for k, v in params.items() if k not in ('user_id', 'conversation_key')}
         
         if function_name == "send_email":
             return await self._send_email(params)
@@ -37,7 +41,8 @@ class GmailIntegration(APIIntegration):
         attachments = params.get("attachments", [])
         return await self.gmail_manager.create_draft(params["to"], params["subject"], params["body"], attachments)
 
-    def get_tools(self) -> List[Dict[str, Any]]:
+    @classmethod
+    def get_tools(cls) -> List[Dict[str, Any]]:
         return [
             {
                 "type": "function",
@@ -79,7 +84,8 @@ class GmailIntegration(APIIntegration):
             }
         ]
 
-    def get_instructions(self) -> str:
+    @classmethod
+    def get_instructions(cls) -> str:
         return """You are a Gmail Assistant. Your responsibility is to compose and send emails or create drafts based on user requests.
         When a user asks to send an email, use the 'send_email' function.
         When a user asks to create a draft, use the 'create_draft' function.
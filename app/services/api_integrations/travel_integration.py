@@ -1,5 +1,6 @@
 from app.services.travel.search_flight import FlightSearch
 from app.services.travel.search_hotel import HotelSearch
+from app.services.travel.result_store import TravelResults, travel_result_store
 from app.services.api_integrations import APIIntegration
 from typing import Dict, Any, List
 from utils.logger import logger
@@ -11,21 +12,33 @@ class TravelIntegration(APIIntegration):
 
     async def execute(self, function_name: str, params: dict) -> str:
         logger.debug(f"TravelIntegration executing function: {function_name} with params: {params}")
-        
+
+        # This integration is shared by every user, so results are kept per conversation
+        conversation_key = params.pop("conversation_key", None) or params.get("user_id") or "anonymous"
+        results = travel_result_store.get(conversation_key)
+
         if function_name == "search_flights":
             required_params = ["origin", "destination", "departure_date"]
             if not all(param in params for param in required_params):
                 missing_params = [param for param in required_params if param not in params]
                 logger.error(f"Missing required parameters for flight search: {missing_params}")
                 return f"Unable to search for flights. Missing information: {', '.join(missing_params)}"
-            return await self._search_flights(params)
+            return await self._search_flights(params, results)
         elif function_name == "search_hotels":
-            return await self._search_hotels(params)
+            return await self._search_hotels(params, results)
+        elif function_name == "search_flights_flexible":
+            return await self._search_flights_flexible(params, results)
+        elif function_name == "refine_flight_results":
+            return self.flight_search.refine_results(results, params, page=params.get("page") or 1)
+        elif function_name == "refine_hotel_results":
+            return self._refine_hotel_results(params, results)
+        elif function_name == "get_travel_option_details":
+            return await self._get_travel_option_details(params, results)
         else:
             logger.warning(f"Unknown function in TravelIntegration: {function_name}")
             return f"Unknown function: {function_name}"
 
-    async def _search_flights(self, params: dict) -> str:
+    async def _search_flights(self, params: dict, results: TravelResults) -> str:
         if not params:
             return "No parameters provided for flight search"
 
@@ -35,24 +48,70 @@ class TravelIntegration(APIIntegration):
             return f"Missing required parameters for flight search: {', '.join(missing_params)}"
         
         try:
-            return self.flight_search.search_flights(params)
+            return await self.flight_search.search_flights(params, results)
         except Exception as e:
             logger.error(f"Error in flight search: {str(e)}", exc_info=True)
             return f"An error occurred during flight search: {str(e)}"
 
-    async def _search_hotels(self, params: dict) -> str:
-        required_params = ["location", "check_in_date", "check_out_date"]
-        if not all(param in params for param in required_params):
-            missing_params = [param for param in required_params if param not in params]
+    async def _search_flights_flexible(self, params: dict, results: TravelResults) -> str:
+        required_params = ["destination", "earliest_departure", "latest_departure"]
+        missing_params = [param for param in required_params if not params.get(param)]
+        if missing_params:
+            return f"Missing required parameters for flexible flight search: {', '.join(missing_params)}"
+
+        window_params = ["earliest_departure", "latest_departure", "min_trip_days", "max_trip_days"]
+        travel_request = {k: v for k, v in params.items() if k not in window_params and v not in (None, "")}
+        try:
+            return await self.flight_search.search_flights_flexible(
+                travel_request,
+                params["earliest_departure"],
+                params["latest_departure"],
+                min_trip_days=params.get("min_trip_days") or None,
+                max_trip_days=params.get("max_trip_days") or None,
+                results=results
+            )
+        except Exception as e:
+            logger.error(f"Error in flexible flight search: {str(e)}", exc_info=True)
+            return f"An error occurred during flexible flight search: {str(e)}"
+
+    async def _search_hotels(self, params: dict, results: TravelResults) -> str:
+        # Must match the search_hotels tool schema and the keys HotelSearch._build_params reads
+        required_params = ["destination", "check_in", "check_out"]
+        if not all(params.get(param) for param in required_params):
+            missing_params = [param for param in required_params if not params.get(param)]
             return f"Missing required parameters for hotel search: {', '.join(missing_params)}"
         
         try:
-            return self.hotel_search.search_hotels(**params)
+            return await self.hotel_search.search_hotels(params, results)
         except Exception as e:
             logger.error(f"Error in hotel search: {str(e)}", exc_info=True)
             return f"An error occurred during hotel search: {str(e)}"
 
-    def get_tools(self) -> List[Dict[str, Any]]:
+    def _refine_hotel_results(self, params: dict, results: TravelResults) -> str:
+        # 0 means no filter for every numeric option
+        return self.hotel_search.refine_results(
+            results,
+            max_price=params.get("max_price") or None,
+            min_rating=params.get("min_rating") or None,
+            min_class=params.get("min_class") or None,
+            sort_by=params.get("sort_by") or "relevance",
+            page=params.get("page") or 1
+        )
+
+    async def _get_travel_option_details(self, params: dict, results: TravelResults) -> str:
+        kind, option = params.get("kind"), params.get("option")
+        if kind not in ("flight", "hotel") or not isinstance(option, int):
+            return "Specify kind ('flight' or 'hotel') and the option number shown in the results"
+        try:
+            if kind == "flight":
+                return self.flight_search.flight_details(results, option)
+            return await self.hotel_search.hotel_details(results, option)
+        except Exception as e:
+            logger.error(f"Error getting travel option details: {str(e)}", exc_info=True)
+            return f"An error occurred while getting details: {str(e)}"
+
+    @classmethod
+    def get_tools(cls) -> List[Dict[str, Any]]:
         return [
             {
                 "type": "function",
@@ -72,9 +131,41 @@ class TravelIntegration(APIIntegration):
                             "children": {"type": "string", "description": "Number of child passengers"},
                             "infants_in_seat": {"type": "string", "description": "Number of infants in seat"},
                             "infants_on_lap": {"type": "string", "description": "Number of infants on lap"},
-                            "stops": {"type": "string", "description": "Number of stops (e.g., '0' for non-stop, '1' for one stop)"},
+                            "max_stops": {"type": "integer", "description": "Maximum number of stops (0 for non-stop only, -1 for any)"},
+                            "max_price": {"type": "integer", "description": "Maximum price (0 for no limit)"},
+                            "max_duration": {"type": "integer", "description": "Maximum total travel time in minutes (0 for no limit)"},
+                            "depart_after": {"type": "string", "description": "Earliest departure time in HH:MM (empty for any)"},
+                            "depart_before": {"type": "string", "description": "Latest departure time in HH:MM (empty for any)"},
+                            "airlines": {"type": "array", "items": {"type": "string"}, "description": "Only show flights on these airlines (empty for any)"},
+                            "sort_by": {"type": "string", "enum": ["price", "duration", "stops", "departure"], "description": "How to order the results"}
                         },
-                        "required": ["origin", "destination", "departure_date", "return_date", "currency", "travel_class", "adults", "children", "infants_in_seat", "infants_on_lap", "stops"],
+                        "required": ["origin", "destination", "departure_date", "return_date", "currency", "travel_class", "adults", "children", "infants_in_seat", "infants_on_lap",
+                                     "max_stops", "max_price", "max_duration", "depart_after", "depart_before", "airlines", "sort_by"],
+                        "additionalProperties": False
+                    },
+                    "strict": True
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "search_flights_flexible",
+                    "description": "Find the cheapest flights when the travel dates are flexible. Searches every departure date in a window (and every trip length in a range for round trips) and returns a price calendar.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "origin": {"type": "string", "description": "The 3-letter airport code for the departure location"},
+                            "destination": {"type": "string", "description": "The 3-letter airport code for the arrival location"},
+                            "earliest_departure": {"type": "string", "description": "The earliest departure date in YYYY-MM-DD format"},
+                            "latest_departure": {"type": "string", "description": "The latest departure date in YYYY-MM-DD format"},
+                            "min_trip_days": {"type": "integer", "description": "Shortest trip length in days for a round trip (0 for one-way)"},
+                            "max_trip_days": {"type": "integer", "description": "Longest trip length in days for a round trip (0 for one-way)"},
+                            "currency": {"type": "string", "description": "Currency code (e.g., USD, EUR)"},
+                            "travel_class": {"type": "string", "description": "Travel class (e.g., '1' for Economy, '2' for Premium Economy, '3' for Business, '4' for First Class)"},
+                            "adults": {"type": "string", "description": "Number of adult passengers"},
+                            "max_stops": {"type": "integer", "description": "Maximum number of stops (0 for non-stop only, -1 for any)"}
+                        },
+                        "required": ["origin", "destination", "earliest_departure", "latest_departure", "min_trip_days", "max_trip_days", "currency", "travel_class", "adults", "max_stops"],
                         "additionalProperties": False
                     },
                     "strict": True
@@ -101,15 +192,80 @@ class TravelIntegration(APIIntegration):
                     },
                     "strict": True
                 }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "refine_flight_results",
+                    "description": "Filter, sort or page through the flights from the last flight search in this conversation, without searching again.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "max_stops": {"type": "integer", "description": "Maximum number of stops (0 for non-stop only, -1 for any)"},
+                            "max_price": {"type": "integer", "description": "Maximum price (0 for no limit)"},
+                            "max_duration": {"type": "integer", "description": "Maximum total travel time in minutes (0 for no limit)"},
+                            "depart_after": {"type": "string", "description": "Earliest departure time in HH:MM (empty for any)"},
+                            "depart_before": {"type": "string", "description": "Latest departure time in HH:MM (empty for any)"},
+                            "airlines": {"type": "array", "items": {"type": "string"}, "description": "Only show flights on these airlines (empty for any)"},
+                            "sort_by": {"type": "string", "enum": ["price", "duration", "stops", "departure"], "description": "How to order the results"},
+                            "page": {"type": "integer", "description": "Page of results to show, starting at 1"}
+                        },
+                        "required": ["max_stops", "max_price", "max_duration", "depart_after", "depart_before", "airlines", "sort_by", "page"],
+                        "additionalProperties": False
+                    },
+                    "strict": True
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "refine_hotel_results",
+                    "description": "Filter, sort or page through the hotels from the last hotel search in this conversation, without searching again.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "max_price": {"type": "integer", "description": "Maximum price per night (0 for no limit)"},
+                            "min_rating": {"type": "number", "description": "Minimum guest rating out of 5 (0 for any)"},
+                            "min_class": {"type": "integer", "description": "Minimum hotel star class (0 for any)"},
+                            "sort_by": {"type": "string", "enum": ["relevance", "price", "rating", "reviews"], "description": "How to order the results"},
+                            "page": {"type": "integer", "description": "Page of results to show, starting at 1"}
+                        },
+                        "required": ["max_price", "min_rating", "min_class", "sort_by", "page"],
+                        "additionalProperties": False
+                    },
+                    "strict": True
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "get_travel_option_details",
+                    "description": "Get details of a numbered flight or hotel option from the results already shown in this conversation.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "kind": {"type": "string", "enum": ["flight", "hotel"], "description": "Whether the option is a flight or a hotel"},
+                            "option": {"type": "integer", "description": "The option number shown in the results"}
+                        },
+                        "required": ["kind", "option"],
+                        "additionalProperties": False
+                    },
+                    "strict": True
+                }
             }
         ]
 
-    def get_instructions(self) -> str:
+    @classmethod
+    def get_instructions(cls) -> str:
         return """You are a friendly Travel Assistant chatbot. Your job is to help users plan trips, find flights and hotels, and give travel tips. Keep your responses short, fun, and easy to read.
 
         When users ask about flights or hotels, use these functions:
         - 'search_flights' for flight info
+        - 'search_flights_flexible' when the dates are flexible ("sometime next week", "cheapest weekend in May"), instead of calling search_flights once per date
         - 'search_hotels' for hotel info
+        - 'refine_flight_results' and 'refine_hotel_results' for follow-ups on results you already have ("only nonstops after 5pm", "show me cheaper ones", "next page"); these don't search again
+        - 'get_travel_option_details' when the user asks about a specific option number ("details on option 3")
+        Results are numbered as options; keep using the same numbers when you refer to them.
 
         For travel recommendations:
         1. Suggest 3 must-see attractions
@@ -1,19 +1,27 @@
+from app.services.calendar.event_cache import get_event_store
 from app.google_client import get_google_service
 from googleapiclient.errors import HttpError
-from typing import Dict, Any, List, Tuple
-from datetime import datetime, timedelta
+from typing import Dict, Any, Iterator, List, Tuple
+from utils.free_slots import find_free_slots, group_slots_by_day, parse_intervals, rank_meeting_times
+from datetime import datetime, date, timedelta
+from itertools import islice
 from app.config.settings import settings
 from utils.logger import logger
 from dotenv import load_dotenv
-from datetime import time
 load_dotenv()
 import pytz
 
+# Google's batch endpoint accepts at most 50 requests per call
+BATCH_LIMIT = 50
+# freebusy.query accepts at most 50 calendars per request
+FREEBUSY_ITEM_LIMIT = 50
+
 class CalendarManager:
     def __init__(self, user_id: str):
         logger.debug(f"Initializing CalendarManager for user_id: {user_id}")
         self.user_id = user_id  # Store user_id for logging purposes
         self.service = get_google_service(user_id, 'calendar', 'v3')
+        self.event_store = get_event_store(user_id)
         self.default_timezone = settings.DEFAULT_TIMEZONE
         logger.debug(f"CalendarManager initialized with default timezone: {self.default_timezone}")
 
@@ -26,70 +34,37 @@ class CalendarManager:
             start_datetime = tz.localize(datetime.strptime(start_date, '%Y-%m-%d'))
             end_datetime = tz.localize(datetime.strptime(end_date, '%Y-%m-%d')) + timedelta(days=1)
 
-            freebusy_query = {
-                "timeMin": start_datetime.isoformat(),
-                "timeMax": end_datetime.isoformat(),
-                "timeZone": timezone,
-                "items": [{"id": 'primary'}]
-            }
-            logger.debug(f"[User: {self.user_id}] Executing freebusy query: {freebusy_query}")
-            freebusy = self.service.freebusy().query(body=freebusy_query).execute()
-            busy_times = freebusy.get('calendars', {}).get('primary', {}).get('busy', [])
+            # Busy times come from the synced event cache instead of a freebusy query per call
+            busy_times = self.event_store.get_busy_times(self.service, start_datetime, end_datetime)
             logger.debug(f"[User: {self.user_id}] Found {len(busy_times)} busy time slots")
 
-            available_blocks = self._find_available_blocks(start_datetime, end_datetime, busy_times, (9, 17), timedelta(minutes=duration), 5, tz)
+            available_blocks = self._find_available_blocks(
+                start_datetime, end_datetime, busy_times,
+                (settings.WORKING_HOURS_START, settings.WORKING_HOURS_END),
+                timedelta(minutes=duration),
+                settings.SLOT_GRANULARITY_MINUTES,
+                tz,
+                buffer=timedelta(minutes=settings.MEETING_BUFFER_MINUTES)
+            )
             return self._format_availability(available_blocks, timezone)
 
         except Exception as e:
             logger.error(f'[User: {self.user_id}] Unexpected error in check_available_slots: {e}')
             return f"An unexpected error occurred: {e}"
 
-    def _find_available_blocks(self, start: datetime, end: datetime, busy_times: List[Dict[str, Any]], working_hours: Tuple[int, int], duration: timedelta, interval: int, tz: pytz.tzinfo) -> List[Tuple[datetime, List[Tuple[datetime, datetime]]]]:
+    def _find_available_blocks(self, start: datetime, end: datetime, busy_times: List[Dict[str, Any]], working_hours: Tuple[int, int], duration: timedelta, interval: int, tz: pytz.tzinfo, buffer: timedelta = timedelta(0)) -> List[Tuple[date, List[Tuple[datetime, datetime]]]]:
         logger.debug(f"Finding available blocks: start={start}, end={end}, duration={duration}, interval={interval}, timezone={tz}")
-        available_blocks = []
-
-        current_date = start.date()
-        end_date = end.date()
-
-        while current_date <= end_date:
-            day_start = tz.localize(datetime.combine(current_date, time(working_hours[0], 0)))
-            day_end = tz.localize(datetime.combine(current_date, time(working_hours[1], 0)))
-
-            if day_start < start:
-                day_start = start
-            if day_end > end:
-                day_end = end
-
-            day_busy_times = [
-                (datetime.fromisoformat(busy['start']).astimezone(tz),
-                 datetime.fromisoformat(busy['end']).astimezone(tz))
-                for busy in busy_times
-                if datetime.fromisoformat(busy['start']).astimezone(tz).date() == current_date
-            ]
-
-            if not day_busy_times:
-                available_blocks.append((day_start, [(day_start, day_end)]))
-            else:
-                day_blocks = []
-                current_time = day_start
-
-                for busy_start, busy_end in sorted(day_busy_times):
-                    if current_time + duration <= busy_start:
-                        day_blocks.append((current_time, busy_start))
-                    current_time = max(current_time, busy_end)
-
-                if current_time + duration <= day_end:
-                    day_blocks.append((current_time, day_end))
-
-                if day_blocks:
-                    available_blocks.append((day_start, day_blocks))
-
-            current_date += timedelta(days=1)
-
+        slots = find_free_slots(
+            start, end, parse_intervals(busy_times, tz), duration, tz,
+            working_hours=working_hours,
+            buffer=buffer,
+            granularity=timedelta(minutes=interval) if interval else None
+        )
+        available_blocks = group_slots_by_day(slots, tz)
         logger.debug(f"Available blocks after processing: {available_blocks}")
         return available_blocks
 
-    def _format_availability(self, available_blocks: List[Tuple[datetime, List[Tuple[datetime, datetime]]]], timezone: str) -> str:
+    def _format_availability(self, available_blocks: List[Tuple[date, List[Tuple[datetime, datetime]]]], timezone: str) -> str:
         if not available_blocks:
             return "No available slots found in the given date range."
 
@@ -105,9 +80,100 @@ class CalendarManager:
 
         return result.strip()
 
-    def create_event(self, summary: str, start_time: str, end_time: str, description: str = '', location: str = '', timezone: str = None) -> str:
+    def query_freebusy(self, calendar_ids: List[str], start: datetime, end: datetime, timezone: str) -> Tuple[Dict[str, List[Dict[str, str]]], Dict[str, str]]:
+        """
+        Fetch busy periods for many calendars.
+
+        Calendars are split into freebusy queries of FREEBUSY_ITEM_LIMIT items and all
+        queries are sent in one batch request, so Google answers them in parallel.
+
+        :return: Busy periods per calendar ID, and an error reason per calendar that could not be read
+        """
+        calendar_ids = list(dict.fromkeys(calendar_ids))
+        queries = [
+            self.service.freebusy().query(body={
+                "timeMin": start.isoformat(),
+                "timeMax": end.isoformat(),
+                "timeZone": timezone,
+                "items": [{"id": calendar_id} for calendar_id in calendar_ids[i:i + FREEBUSY_ITEM_LIMIT]]
+            })
+            for i in range(0, len(calendar_ids), FREEBUSY_ITEM_LIMIT)
+        ]
+
+        busy: Dict[str, List[Dict[str, str]]] = {}
+        errors: Dict[str, str] = {}
+        for index, (response, exception) in enumerate(self.execute_batch(queries, mark_stale=False)):
+            chunk = calendar_ids[index * FREEBUSY_ITEM_LIMIT:(index + 1) * FREEBUSY_ITEM_LIMIT]
+            if exception is not None:
+                logger.error(f"[User: {self.user_id}] Freebusy query failed: {exception}")
+                errors.update({calendar_id: str(exception) for calendar_id in chunk})
+                continue
+            calendars = response.get('calendars', {})
+            for calendar_id in chunk:
+                calendar = calendars.get(calendar_id, {})
+                if calendar.get('errors'):
+                    errors[calendar_id] = calendar['errors'][0].get('reason', 'unknown')
+                else:
+                    busy[calendar_id] = calendar.get('busy', [])
+        return busy, errors
+
+    def find_group_availability(self, attendees: List[str], start_date: str, end_date: str, duration: int,
+                                timezone: str = None, required_attendees: List[str] = None, limit: int = 10) -> str:
+        logger.debug(f"[User: {self.user_id}] Finding group availability for {len(attendees)} attendees: start_date={start_date}, end_date={end_date}, duration={duration}")
         timezone = timezone or self.default_timezone
-        event = {
+        tz = pytz.timezone(timezone)
+
+        try:
+            start_datetime = tz.localize(datetime.strptime(start_date, '%Y-%m-%d'))
+            end_datetime = tz.localize(datetime.strptime(end_date, '%Y-%m-%d')) + timedelta(days=1)
+
+            # The user's own calendar is always part of the group and must be free
+            calendar_ids = ['primary'] + [attendee for attendee in attendees if attendee != 'primary']
+            busy, errors = self.query_freebusy(calendar_ids, start_datetime, end_datetime, timezone)
+            if 'primary' not in busy:
+                return f"Could not read your calendar: {errors.get('primary', 'unknown error')}"
+
+            required = {'primary'} | {attendee for attendee in (required_attendees or []) if attendee in busy}
+            ranked = rank_meeting_times(
+                start_datetime, end_datetime,
+                {calendar_id: parse_intervals(periods, tz) for calendar_id, periods in busy.items()},
+                timedelta(minutes=duration), tz,
+                working_hours=(settings.WORKING_HOURS_START, settings.WORKING_HOURS_END),
+                buffer=timedelta(minutes=settings.MEETING_BUFFER_MINUTES),
+                granularity=timedelta(minutes=settings.SLOT_GRANULARITY_MINUTES),
+                required=required,
+                limit=limit
+            )
+            return self._format_group_availability(ranked, len(busy), errors, timezone)
+
+        except Exception as e:
+            logger.error(f'[User: {self.user_id}] Unexpected error in find_group_availability: {e}')
+            return f"An unexpected error occurred: {e}"
+
+    def _format_group_availability(self, ranked: List[Dict[str, Any]], attendee_count: int, errors: Dict[str, str], timezone: str) -> str:
+        lines = []
+        if not ranked:
+            lines.append("No time in the given date range works for the required attendees.")
+        else:
+            lines.append(f"Best meeting times for {attendee_count} calendars (timezone: {timezone}):")
+            lines.append("")
+            for rank, slot in enumerate(ranked, 1):
+                start, end = slot["start"], slot["end"]
+                if len(slot["available"]) == attendee_count:
+                    who = "everyone available"
+                else:
+                    unavailable = ', '.join(slot["unavailable"])
+                    who = f"{len(slot['available'])} of {attendee_count} available (busy: {unavailable})"
+                lines.append(f"{rank}. {start.strftime('%A, %B %d, %Y')}: {start.strftime('%I:%M %p')} - {end.strftime('%I:%M %p')}, {who}")
+
+        if errors:
+            lines.append("")
+            lines.append("Could not check: " + ', '.join(f"{calendar_id} ({reason})" for calendar_id, reason in errors.items()))
+        return '\n'.join(lines)
+
+    def _build_event(self, summary: str, start_time: str, end_time: str, description: str = '', location: str = '', timezone: str = None) -> Dict[str, Any]:
+        timezone = timezone or self.default_timezone
+        return {
             'summary': summary,
             'location': location,
             'description': description,
@@ -124,8 +190,27 @@ class CalendarManager:
             },
         }
 
+    def _build_event_patch(self, summary: str = None, start_time: str = None, end_time: str = None, description: str = None, location: str = None) -> Dict[str, Any]:
+        """Only the fields being changed; patch leaves everything else on the event untouched"""
+        patch = {}
+        if summary:
+            patch['summary'] = summary
+        if start_time:
+            patch['start'] = {'dateTime': start_time}
+        if end_time:
+            patch['end'] = {'dateTime': end_time}
+        if description:
+            patch['description'] = description
+        if location:
+            patch['location'] = location
+        return patch
+
+    def create_event(self, summary: str, start_time: str, end_time: str, description: str = '', location: str = '', timezone: str = None) -> str:
+        event = self._build_event(summary, start_time, end_time, description, location, timezone)
+
         try:
             event = self.service.events().insert(calendarId='primary', body=event).execute()
+            self.event_store.mark_stale()
             return f'Event created: {event.get("htmlLink")}'
         except HttpError as error:
             logger.error(f'An error occurred: {error}')
@@ -133,20 +218,9 @@ class CalendarManager:
 
     def update_event(self, event_id: str, summary: str = None, start_time: str = None, end_time: str = None, description: str = None, location: str = None) -> str:
         try:
-            event = self.service.events().get(calendarId='primary', eventId=event_id).execute()
-            
-            if summary:
-                event['summary'] = summary
-            if start_time:
-                event['start']['dateTime'] = start_time
-            if end_time:
-                event['end']['dateTime'] = end_time
-            if description:
-                event['description'] = description
-            if location:
-                event['location'] = location
-
-            updated_event = self.service.events().update(calendarId='primary', eventId=event_id, body=event).execute()
+            patch = self._build_event_patch(summary, start_time, end_time, description, location)
+            updated_event = self.service.events().patch(calendarId='primary', eventId=event_id, body=patch).execute()
+            self.event_store.mark_stale()
             return f'Event updated: {updated_event.get("htmlLink")}'
         except HttpError as error:
             logger.error(f'An error occurred: {error}')
@@ -155,41 +229,124 @@ class CalendarManager:
     def delete_event(self, event_id: str) -> str:
         try:
             self.service.events().delete(calendarId='primary', eventId=event_id).execute()
+            self.event_store.mark_stale()
             return 'Event deleted successfully.'
         except HttpError as error:
             logger.error(f'An error occurred: {error}')
             return f"An error occurred while deleting the event: {error}"
 
-    def list_events(self, start_date: str, end_date: str, timezone: str = None) -> List[Dict[str, Any]]:
-        logger.debug(f"Listing events: start_date={start_date}, end_date={end_date}, timezone={timezone}")
+    def execute_batch(self, requests: List[Any], mark_stale: bool = True) -> List[Tuple[Any, Exception]]:
+        """
+        Execute requests through Google's HTTP batch endpoint.
+
+        :param requests: Unexecuted API requests, e.g. service.events().insert(...)
+        :param mark_stale: Whether the requests change events, so the event cache needs a delta fetch
+        :return: (response, exception) per request, in the order given
+        """
+        results: List[Tuple[Any, Exception]] = [(None, None)] * len(requests)
+
+        def callback(request_id, response, exception):
+            results[int(request_id)] = (response, exception)
+
+        for chunk_start in range(0, len(requests), BATCH_LIMIT):
+            chunk_end = min(chunk_start + BATCH_LIMIT, len(requests))
+            batch = self.service.new_batch_http_request(callback=callback)
+            for index in range(chunk_start, chunk_end):
+                batch.add(requests[index], request_id=str(index))
+            logger.debug(f"[User: {self.user_id}] Executing batch of {chunk_end - chunk_start} calendar requests")
+            batch.execute()
+        if mark_stale:
+            self.event_store.mark_stale()
+        return results
+
+    def _format_batch_results(self, action: str, labels: List[str], results: List[Tuple[Any, Exception]], describe) -> str:
+        succeeded = [f"- {describe(label, response)}" for label, (response, exception) in zip(labels, results) if exception is None]
+        failed = [f"- {label}: {exception}" for label, (_, exception) in zip(labels, results) if exception is not None]
+        for line in failed:
+            logger.error(f"[User: {self.user_id}] Batch {action} failed {line[2:]}")
+
+        lines = [f"{action.capitalize()} {len(succeeded)} of {len(results)} events."]
+        lines.extend(succeeded)
+        if failed:
+            lines.append("Failed:")
+            lines.extend(failed)
+        return "\n".join(lines)
+
+    def create_events(self, events: List[Dict[str, Any]]) -> str:
+        """
+        Create several events in one batch request.
+
+        :param events: Dicts with the create_event parameters
+        """
+        requests = [
+            self.service.events().insert(calendarId='primary', body=self._build_event(**event))
+            for event in events
+        ]
+        results = self.execute_batch(requests)
+        return self._format_batch_results(
+            "created", [event['summary'] for event in events], results,
+            lambda label, response: f"{label}: {response.get('htmlLink')}"
+        )
+
+    def update_events(self, updates: List[Dict[str, Any]]) -> str:
+        """
+        Patch several events in one batch request.
+
+        :param updates: Dicts with event_id plus the update_event fields to change
+        """
+        requests = [
+            self.service.events().patch(
+                calendarId='primary',
+                eventId=update['event_id'],
+                body=self._build_event_patch(**{k: v for k, v in update.items() if k != 'event_id'})
+            )
+            for update in updates
+        ]
+        results = self.execute_batch(requests)
+        return self._format_batch_results(
+            "updated", [update['event_id'] for update in updates], results,
+            lambda label, response: f"{response.get('summary', label)}: {response.get('htmlLink')}"
+        )
+
+    def delete_events(self, event_ids: List[str]) -> str:
+        """
+        Delete several events in one batch request.
+
+        :param event_ids: IDs of the events to delete
+        """
+        requests = [self.service.events().delete(calendarId='primary', eventId=event_id) for event_id in event_ids]
+        results = self.execute_batch(requests)
+        return self._format_batch_results(
+            "deleted", event_ids, results,
+            lambda label, response: label
+        )
+
+    def iter_events(self, start_date: str, end_date: str, timezone: str = None, max_results: int = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield events in the date range in start order, following every result page.
+
+        :param max_results: Stop after this many events (no limit if None)
+        """
+        logger.debug(f"Listing events: start_date={start_date}, end_date={end_date}, timezone={timezone}, max_results={max_results}")
         timezone = timezone or self.default_timezone
         tz = pytz.timezone(timezone)
-        
-        try:
-            start_datetime = tz.localize(datetime.strptime(start_date, '%Y-%m-%d'))
-            end_datetime = tz.localize(datetime.strptime(end_date, '%Y-%m-%d')) + timedelta(days=1)
+        start_datetime = tz.localize(datetime.strptime(start_date, '%Y-%m-%d'))
+        end_datetime = tz.localize(datetime.strptime(end_date, '%Y-%m-%d')) + timedelta(days=1)
 
-            events_result = self.service.events().list(
-                calendarId='primary',
-                timeMin=start_datetime.isoformat(),
-                timeMax=end_datetime.isoformat(),
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            events = events_result.get('items', [])
-
-            return [
-                {
-                    'id': event['id'],
-                    'summary': event['summary'],
-                    'start': event['start'].get('dateTime', event['start'].get('date')),
-                    'end': event['end'].get('dateTime', event['end'].get('date')),
-                    'description': event.get('description', ''),
-                    'location': event.get('location', '')
-                }
-                for event in events
-            ]
+        events = self.event_store.iter_events(self.service, start_datetime, end_datetime)
+        for event in islice(events, max_results):
+            yield {
+                'id': event['id'],
+                'summary': event.get('summary', '(No title)'),
+                'start': event['start'].get('dateTime', event['start'].get('date')),
+                'end': event['end'].get('dateTime', event['end'].get('date')),
+                'description': event.get('description', ''),
+                'location': event.get('location', '')
+            }
 
+    def list_events(self, start_date: str, end_date: str, timezone: str = None, max_results: int = None) -> List[Dict[str, Any]]:
+        try:
+            return list(self.iter_events(start_date, end_date, timezone, max_results))
         except Exception as e:
             logger.error(f'Unexpected error in list_events: {e}')
             raise
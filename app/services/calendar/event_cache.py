@@ -0,0 +1,179 @@
+from googleapiclient.errors import HttpError
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta
+from app.config.settings import settings
+from utils.cache import TTLCache
+from utils.logger import logger
+import threading
+import time
+import pytz
+
+EVENT_FIELDS = (
+    "nextPageToken,nextSyncToken,"
+    "items(id,status,summary,description,location,start,end,transparency,htmlLink,attendees(self,responseStatus))"
+)
+# Ranges too wide for the cache are streamed page by page and never need sync tokens
+STREAM_FIELDS = "nextPageToken,items(id,status,summary,description,location,start,end)"
+STREAM_PAGE_SIZE = 250
+
+def parse_event_time(value: Dict[str, str], tz: pytz.BaseTzInfo) -> datetime:
+    """Timed events carry an offset; all-day events are midnight in the caller's timezone"""
+    if 'dateTime' in value:
+        return datetime.fromisoformat(value['dateTime']).astimezone(tz)
+    return tz.localize(datetime.strptime(value['date'], '%Y-%m-%d'))
+
+def is_busy(event: Dict[str, Any]) -> bool:
+    """Mirror freebusy: transparent events and events the user declined don't block time"""
+    if event.get('transparency') == 'transparent':
+        return False
+    for attendee in event.get('attendees', []):
+        if attendee.get('self') and attendee.get('responseStatus') == 'declined':
+            return False
+    return True
+
+class CalendarEventStore:
+    """Local copy of one user's calendar, kept current with syncToken incremental sync.
+
+    A full sync loads every event in a window. Reads inside that window only
+    fetch the changes since the last sync token. Reads outside it widen the
+    window with a new full sync.
+    """
+    def __init__(self, user_id: str, calendar_id: str = 'primary'):
+        self.user_id = user_id
+        self.calendar_id = calendar_id
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self.sync_token: Optional[str] = None
+        self.window: Optional[Tuple[datetime, datetime]] = None
+        self.synced_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def mark_stale(self):
+        """Force a delta fetch on the next read, e.g. after the bot changed an event"""
+        self.synced_at = None
+
+    def get_events(self, service, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Events overlapping [start, end), sorted by start time"""
+        with self._lock:
+            self._sync(service, start, end)
+            tz = start.tzinfo
+            events = []
+            for event in self.events.values():
+                event_start = parse_event_time(event['start'], tz)
+                event_end = parse_event_time(event['end'], tz)
+                if event_start < end and event_end > start:
+                    events.append((event_start, event))
+            events.sort(key=lambda item: item[0])
+            return [event for _, event in events]
+
+    def iter_events(self, service, start: datetime, end: datetime) -> Iterator[Dict[str, Any]]:
+        """
+        Events overlapping [start, end) in start order.
+
+        Ranges the cache can hold come from the local copy. Wider ranges are
+        streamed one page at a time, so memory stays bounded by the page size.
+        """
+        if end - start <= timedelta(days=settings.CALENDAR_CACHE_MAX_DAYS):
+            yield from self.get_events(service, start, end)
+            return
+        logger.debug(f"[User: {self.user_id}] Streaming calendar events for {start} - {end}")
+        for response in self._list_pages(service, fields=STREAM_FIELDS, timeMin=start.isoformat(), timeMax=end.isoformat(),
+                                         orderBy='startTime', maxResults=STREAM_PAGE_SIZE):
+            for event in response.get('items', []):
+                if event.get('status') != 'cancelled':
+                    yield event
+
+    def get_busy_times(self, service, start: datetime, end: datetime) -> List[Dict[str, str]]:
+        """Busy periods in the same shape as a freebusy response"""
+        tz = start.tzinfo
+        return [
+            {
+                'start': parse_event_time(event['start'], tz).isoformat(),
+                'end': parse_event_time(event['end'], tz).isoformat()
+            }
+            for event in self.get_events(service, start, end)
+            if is_busy(event)
+        ]
+
+    def _covers(self, start: datetime, end: datetime) -> bool:
+        return self.window is not None and self.window[0] <= start and end <= self.window[1]
+
+    def _sync(self, service, start: datetime, end: datetime):
+        if not self._covers(start, end) or self.sync_token is None:
+            self._full_sync(service, *self._next_window(start, end))
+            return
+        if self.synced_at is not None and time.monotonic() - self.synced_at < settings.CALENDAR_SYNC_MIN_INTERVAL:
+            return
+        try:
+            self._incremental_sync(service)
+        except HttpError as error:
+            if error.resp.status != 410:
+                raise
+            # The sync token expired or was invalidated by Google; start over
+            logger.info(f"[User: {self.user_id}] Sync token expired, running a full calendar sync")
+            self._full_sync(service, *self.window)
+
+    def _next_window(self, start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+        if self.window is None:
+            return start, end
+        window_start, window_end = min(start, self.window[0]), max(end, self.window[1])
+        # Don't let one far-off lookup make every later full sync huge
+        if window_end - window_start > timedelta(days=settings.CALENDAR_CACHE_MAX_DAYS):
+            return start, end
+        return window_start, window_end
+
+    def _list_pages(self, service, fields: str = EVENT_FIELDS, **params):
+        page_token = None
+        while True:
+            response = service.events().list(
+                calendarId=self.calendar_id,
+                singleEvents=True,
+                fields=fields,
+                pageToken=page_token,
+                **params
+            ).execute()
+            yield response
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+
+    def _full_sync(self, service, window_start: datetime, window_end: datetime):
+        events, sync_token = {}, None
+        for response in self._list_pages(service, timeMin=window_start.isoformat(), timeMax=window_end.isoformat()):
+            for event in response.get('items', []):
+                if event.get('status') != 'cancelled':
+                    events[event['id']] = event
+            sync_token = response.get('nextSyncToken', sync_token)
+
+        self.events = events
+        self.sync_token = sync_token
+        self.window = (window_start, window_end)
+        self.synced_at = time.monotonic()
+        logger.debug(f"[User: {self.user_id}] Full calendar sync loaded {len(events)} events for {window_start} - {window_end}")
+
+    def _incremental_sync(self, service):
+        changed = 0
+        sync_token = self.sync_token
+        for response in self._list_pages(service, syncToken=self.sync_token):
+            for event in response.get('items', []):
+                changed += 1
+                if event.get('status') == 'cancelled':
+                    self.events.pop(event['id'], None)
+                else:
+                    self.events[event['id']] = event
+            sync_token = response.get('nextSyncToken', sync_token)
+
+        self.sync_token = sync_token
+        self.synced_at = time.monotonic()
+        logger.debug(f"[User: {self.user_id}] Incremental calendar sync applied {changed} changes")
+
+# One store per user, shared by every CalendarManager built for them in the container
+event_stores = TTLCache(maxsize=settings.CALENDAR_CACHE_SIZE)
+_event_stores_lock = threading.Lock()
+
+def get_event_store(user_id: str) -> CalendarEventStore:
+    with _event_stores_lock:
+        store = event_stores.get(user_id)
+        if store is None:
+            store = CalendarEventStore(user_id)
+            event_stores.set(user_id, store)
+        return store
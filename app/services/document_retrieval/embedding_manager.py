@@ -1,24 +1,37 @@
-import os
+from app.openai_helper import get_openai_client, get_async_openai_client
 from typing import List
-from openai import OpenAI
+from utils.logger import logger
 
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+EMBEDDING_MODEL = "text-embedding-ada-002"
 
 class EmbeddingManager:
-    def __init__(self):
-        # Initialize any necessary attributes here
-        pass
+    def __init__(self, model: str = EMBEDDING_MODEL):
+        self.model = model
 
     def generate_embedding(self, text: str) -> List[float]:
         """
         Generate an embedding for the given text using OpenAI's API.
         """
         try:
-            response = client.embeddings.create(
-                model="text-embedding-ada-002",
+            response = get_openai_client().embeddings.create(
+                model=self.model,
                 input=text
             )
             return response.data[0].embedding
         except Exception as e:
             print(f"Error in generate_embedding: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    async def generate_embeddings_async(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several texts in a single request without blocking the event loop.
+        """
+        try:
+            response = await get_async_openai_client().embeddings.create(
+                model=self.model,
+                input=texts
+            )
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        except Exception as e:
+            logger.error(f"Error in generate_embeddings_async: {e}", exc_info=True)
+            return []
@@ -5,7 +5,7 @@ class PromptGenerator:
     def __init__(self):
         self.openai_client = OpenAIClient()
 
-    def generate_prompt(self, family_member: str, relationship: str, last_contact: str, interests: List[str], recent_events: List[str]) -> str:
+    async def generate_prompt(self, family_member: str, relationship: str, last_contact: str, interests: List[str], recent_events: List[str]) -> str:
         """
         Generate a prompt for communicating with a family member.
         
@@ -25,10 +25,10 @@ class PromptGenerator:
         Keep the message between 50-100 words.
         """
 
-        prompt = self.openai_client.generate_text(context, max_tokens=150)
+        prompt = await self.openai_client.generate_text(context, max_tokens=150)
         return prompt
 
-    def generate_birthday_prompt(self, family_member: str, relationship: str, age: int, interests: List[str]) -> str:
+    async def generate_birthday_prompt(self, family_member: str, relationship: str, age: int, interests: List[str]) -> str:
         """
         Generate a birthday message prompt for a family member.
         
@@ -45,10 +45,10 @@ class PromptGenerator:
         Keep the message between 50-100 words.
         """
 
-        prompt = self.openai_client.generate_text(context, max_tokens=150)
+        prompt = await self.openai_client.generate_text(context, max_tokens=150)
         return prompt
 
-    def generate_holiday_prompt(self, family_member: str, relationship: str, holiday: str, traditions: List[str]) -> str:
+    async def generate_holiday_prompt(self, family_member: str, relationship: str, holiday: str, traditions: List[str]) -> str:
         """
         Generate a holiday message prompt for a family member.
         
@@ -65,10 +65,10 @@ class PromptGenerator:
         Keep the message between 50-100 words.
         """
 
-        prompt = self.openai_client.generate_text(context, max_tokens=150)
+        prompt = await self.openai_client.generate_text(context, max_tokens=150)
         return prompt
 
-    def generate_check_in_prompt(self, family_member: str, relationship: str, last_contact: str, known_challenges: List[str]) -> str:
+    async def generate_check_in_prompt(self, family_member: str, relationship: str, last_contact: str, known_challenges: List[str]) -> str:
         """
         Generate a check-in message prompt for a family member who might be going through challenges.
         
@@ -86,5 +86,5 @@ class PromptGenerator:
         Keep the message between 50-100 words.
         """
 
-        prompt = self.openai_client.generate_text(context, max_tokens=150)
+        prompt = await self.openai_client.generate_text(context, max_tokens=150)
         return prompt
\ No newline at end of file
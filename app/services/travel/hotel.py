@@ -0,0 +1,62 @@
+from typing import Dict, Any, Iterable, List, Optional
+
+class Hotel:
+    """A SerpAPI hotel result, reduced to the fields used for filtering, ranking and display"""
+    __slots__ = ("name", "price", "price_text", "rating", "reviews", "hotel_class", "address", "description", "property_token")
+
+    def __init__(self, name: str, price: Optional[int], price_text: str, rating: Optional[float], reviews: Optional[int],
+                 hotel_class: Optional[int], address: str, description: str, property_token: Optional[str]):
+        self.name = name
+        self.price = price
+        self.price_text = price_text
+        self.rating = rating
+        self.reviews = reviews
+        self.hotel_class = hotel_class
+        self.address = address
+        self.description = description
+        self.property_token = property_token
+
+    @classmethod
+    def from_serpapi(cls, hotel: Dict[str, Any]) -> 'Hotel':
+        rate = hotel.get("rate_per_night") or {}
+        price = rate.get("extracted_lowest", hotel.get("extracted_price"))
+        return cls(
+            name=hotel.get("name", "N/A"),
+            price=int(price) if isinstance(price, (int, float)) else None,
+            price_text=rate.get("lowest") or hotel.get("price") or "N/A",
+            rating=hotel.get("overall_rating", hotel.get("rating")),
+            reviews=hotel.get("reviews"),
+            hotel_class=hotel.get("extracted_hotel_class"),
+            address=hotel.get("address", "N/A"),
+            description=hotel.get("description", "N/A"),
+            property_token=hotel.get("property_token")
+        )
+
+def parse_hotels(data: Dict[str, Any]) -> List[Hotel]:
+    """Parse the hotel list of a google_hotels response"""
+    return [Hotel.from_serpapi(hotel) for hotel in data.get("properties") or data.get("hotels_results", [])]
+
+def filter_hotels(hotels: Iterable[Hotel], max_price: Optional[int] = None, min_rating: Optional[float] = None,
+                  min_class: Optional[int] = None) -> List[Hotel]:
+    """Filter already-fetched hotels; hotels missing a value are dropped by the filter on that value"""
+    result = []
+    for hotel in hotels:
+        if max_price is not None and (hotel.price is None or hotel.price > max_price):
+            continue
+        if min_rating is not None and (hotel.rating is None or hotel.rating < min_rating):
+            continue
+        if min_class is not None and (hotel.hotel_class is None or hotel.hotel_class < min_class):
+            continue
+        result.append(hotel)
+    return result
+
+SORT_KEYS = {
+    "price": lambda h: (h.price is None, h.price or 0, -(h.rating or 0)),
+    "rating": lambda h: (-(h.rating or 0), -(h.reviews or 0)),
+    "reviews": lambda h: (-(h.reviews or 0), -(h.rating or 0)),
+}
+
+def rank_hotels(hotels: Iterable[Hotel], sort_by: str = "relevance", limit: Optional[int] = None) -> List[Hotel]:
+    """Sort by price, rating or reviews; anything else keeps SerpAPI's relevance order"""
+    ranked = sorted(hotels, key=SORT_KEYS[sort_by]) if sort_by in SORT_KEYS else list(hotels)
+    return ranked if limit is None else ranked[:limit]
@@ -0,0 +1,91 @@
+from typing import Dict, Any, Optional
+from app.config.settings import settings
+from utils.logger import logger
+import asyncio
+import random
+import httpx
+
+SERPAPI_URL = "https://serpapi.com/search"
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def get_travel_http_client() -> httpx.AsyncClient:
+    """Async client shared by the travel services, keeping SerpAPI connections alive between searches.
+
+    Pooled connections belong to the event loop that opened them, so a new
+    client is built if called from a different loop.
+    """
+    global _client, _client_loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if _client is None or (loop is not None and loop is not _client_loop):
+        logger.debug("Creating shared travel HTTP client")
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.SERPAPI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SERPAPI_MAX_CONNECTIONS,
+                keepalive_expiry=settings.SERPAPI_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(settings.SERPAPI_TIMEOUT, connect=settings.SERPAPI_CONNECT_TIMEOUT)
+        )
+        _client_loop = loop
+    return _client
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Limits concurrent SerpAPI requests across every search on the running loop"""
+    global _semaphore, _semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _semaphore is None or loop is not _semaphore_loop:
+        _semaphore = asyncio.Semaphore(settings.SERPAPI_CONCURRENCY)
+        _semaphore_loop = loop
+    return _semaphore
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Full-jitter exponential backoff, honouring a numeric Retry-After header"""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), settings.SERPAPI_RETRY_MAX_DELAY)
+    return random.uniform(0, min(settings.SERPAPI_RETRY_MAX_DELAY, settings.SERPAPI_RETRY_BASE_DELAY * 2 ** attempt))
+
+async def serpapi_get(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    GET the SerpAPI search endpoint, retrying rate limits, server errors and dropped connections.
+
+    :param params: Query parameters, including the api_key.
+    :return: The decoded JSON response, including SerpAPI's {"error": ...} body on client errors.
+    :raises httpx.HTTPError: If the request still fails after SERPAPI_MAX_RETRIES retries,
+        or a client error has no JSON body.
+    """
+    client = get_travel_http_client()
+    semaphore = _get_semaphore()
+    for attempt in range(settings.SERPAPI_MAX_RETRIES + 1):
+        last_attempt = attempt == settings.SERPAPI_MAX_RETRIES
+        try:
+            async with semaphore:
+                response = await client.get(SERPAPI_URL, params=params)
+        except httpx.TransportError as e:
+            if last_attempt:
+                raise
+            delay = _retry_delay(attempt)
+            logger.warning(f"SerpAPI request failed ({e!r}), retrying in {delay:.2f}s")
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                if response.is_client_error:
+                    # Invalid keys, bad params and exhausted quotas are explained in the body
+                    try:
+                        return response.json()
+                    except ValueError:
+                        pass
+                response.raise_for_status()
+                return response.json()
+            delay = _retry_delay(attempt, response)
+            logger.warning(f"SerpAPI returned {response.status_code}, retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
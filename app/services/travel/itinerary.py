@@ -0,0 +1,132 @@
+from datetime import datetime, time
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from utils.logger import logger
+
+SERPAPI_TIME_FORMAT = '%Y-%m-%d %H:%M'
+
+class FlightSegment:
+    """One leg of an itinerary"""
+    __slots__ = ("airline", "flight_number", "departure_airport", "departure_code", "departure_time",
+                 "arrival_airport", "arrival_code", "arrival_time", "duration")
+
+    def __init__(self, airline: str, flight_number: str, departure_airport: str, departure_code: str, departure_time: datetime,
+                 arrival_airport: str, arrival_code: str, arrival_time: datetime, duration: int):
+        self.airline = airline
+        self.flight_number = flight_number
+        self.departure_airport = departure_airport
+        self.departure_code = departure_code
+        self.departure_time = departure_time
+        self.arrival_airport = arrival_airport
+        self.arrival_code = arrival_code
+        self.arrival_time = arrival_time
+        self.duration = duration
+
+    @classmethod
+    def from_serpapi(cls, flight: Dict[str, Any]) -> 'FlightSegment':
+        departure, arrival = flight["departure_airport"], flight["arrival_airport"]
+        return cls(
+            airline=flight.get("airline", "Unknown Airline"),
+            flight_number=flight.get("flight_number", ""),
+            departure_airport=departure.get("name", ""),
+            departure_code=departure.get("id", ""),
+            departure_time=datetime.strptime(departure["time"], SERPAPI_TIME_FORMAT),
+            arrival_airport=arrival.get("name", ""),
+            arrival_code=arrival.get("id", ""),
+            arrival_time=datetime.strptime(arrival["time"], SERPAPI_TIME_FORMAT),
+            duration=flight.get("duration", 0)
+        )
+
+class Itinerary:
+    """A priced SerpAPI flight option, reduced to the fields used for filtering, ranking and display"""
+    __slots__ = ("price", "segments", "stops", "duration", "airlines", "return_date")
+
+    def __init__(self, price: int, segments: Tuple[FlightSegment, ...], duration: int, return_date: Optional[str] = None):
+        self.price = price
+        self.segments = segments
+        self.stops = len(segments) - 1
+        self.duration = duration
+        self.airlines = frozenset(segment.airline for segment in segments)
+        self.return_date = return_date
+
+    @classmethod
+    def from_serpapi(cls, flight_group: Dict[str, Any], return_date: Optional[str] = None) -> Optional['Itinerary']:
+        """Parse one entry of best_flights or other_flights; entries without a price or flights are skipped"""
+        flights = flight_group.get("flights")
+        if flight_group.get("price") is None or not flights:
+            return None
+        try:
+            segments = tuple(FlightSegment.from_serpapi(flight) for flight in flights)
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Skipping malformed flight result: {e}")
+            return None
+        duration = flight_group.get("total_duration") or sum(segment.duration for segment in segments)
+        return cls(flight_group["price"], segments, duration, return_date)
+
+    @property
+    def airline(self) -> str:
+        return self.segments[0].airline
+
+    @property
+    def departure_time(self) -> datetime:
+        return self.segments[0].departure_time
+
+    @property
+    def key(self) -> Tuple:
+        """Identifies the same flights across result lists and searches"""
+        return (self.return_date,) + tuple((s.flight_number, s.departure_time) for s in self.segments)
+
+def parse_itineraries(data: Dict[str, Any], return_date: Optional[str] = None) -> List[Itinerary]:
+    """
+    Parse best_flights and other_flights from a SerpAPI response, keeping the cheapest copy of each itinerary.
+    """
+    itineraries: Dict[Tuple, Itinerary] = {}
+    for flight_group in data.get("best_flights", []) + data.get("other_flights", []):
+        itinerary = Itinerary.from_serpapi(flight_group, return_date)
+        if itinerary is None:
+            continue
+        existing = itineraries.get(itinerary.key)
+        if existing is None or itinerary.price < existing.price:
+            itineraries[itinerary.key] = itinerary
+    return list(itineraries.values())
+
+def filter_itineraries(itineraries: Iterable[Itinerary], max_price: Optional[int] = None, max_stops: Optional[int] = None,
+                       max_duration: Optional[int] = None, depart_after: Optional[time] = None, depart_before: Optional[time] = None,
+                       airlines: Optional[Iterable[str]] = None) -> List[Itinerary]:
+    """
+    Filter already-fetched itineraries.
+
+    :param max_duration: Longest total travel time in minutes.
+    :param depart_after: Earliest local departure time of the first leg.
+    :param depart_before: Latest local departure time of the first leg.
+    :param airlines: Keep itineraries flown by any of these airlines (case-insensitive substring match).
+    """
+    airlines = [airline.lower() for airline in airlines or []]
+    result = []
+    for itinerary in itineraries:
+        departure = itinerary.departure_time.time()
+        if max_price is not None and itinerary.price > max_price:
+            continue
+        if max_stops is not None and itinerary.stops > max_stops:
+            continue
+        if max_duration is not None and itinerary.duration > max_duration:
+            continue
+        if depart_after is not None and departure < depart_after:
+            continue
+        if depart_before is not None and departure > depart_before:
+            continue
+        if airlines and not any(wanted in flown.lower() for wanted in airlines for flown in itinerary.airlines):
+            continue
+        result.append(itinerary)
+    return result
+
+SORT_KEYS = {
+    "price": lambda i: (i.price, i.duration),
+    "duration": lambda i: (i.duration, i.price),
+    "stops": lambda i: (i.stops, i.price),
+    "departure": lambda i: (i.departure_time, i.price),
+}
+
+def rank_itineraries(itineraries: Iterable[Itinerary], sort_by: str = "price", limit: Optional[int] = None) -> List[Itinerary]:
+    """Sort by price, duration, stops or departure and return the top results"""
+    ranked = sorted(itineraries, key=SORT_KEYS.get(sort_by, SORT_KEYS["price"]))
+    return ranked if limit is None else ranked[:limit]
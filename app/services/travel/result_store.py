@@ -0,0 +1,56 @@
+from typing import Dict, Any, List, Optional
+from app.services.travel.itinerary import Itinerary, rank_itineraries
+from app.services.travel.hotel import Hotel
+from app.config.settings import settings
+from utils.cache import TTLCache
+
+class TravelResults:
+    """Parsed results of the latest flight and hotel searches in one conversation.
+
+    Options keep the number they were shown with, so "option 3" means the same
+    result however the list is later filtered or sorted.
+    """
+    def __init__(self):
+        self.flights: List[Itinerary] = []
+        self.hotels: List[Hotel] = []
+        self.hotel_search: Dict[str, Any] = {}
+        self.hotel_details: Dict[str, str] = {}
+
+    def set_flights(self, itineraries: List[Itinerary]):
+        self.flights = rank_itineraries(itineraries, "price")
+
+    def set_hotels(self, hotels: List[Hotel], search: Dict[str, Any]):
+        self.hotels = hotels
+        self.hotel_search = search
+        self.hotel_details = {}
+
+    def flight_option(self, itinerary: Itinerary) -> int:
+        return self.flights.index(itinerary) + 1
+
+    def hotel_option(self, hotel: Hotel) -> int:
+        return self.hotels.index(hotel) + 1
+
+    def get_flight(self, option: int) -> Optional[Itinerary]:
+        return self.flights[option - 1] if 1 <= option <= len(self.flights) else None
+
+    def get_hotel(self, option: int) -> Optional[Hotel]:
+        return self.hotels[option - 1] if 1 <= option <= len(self.hotels) else None
+
+class TravelResultStore:
+    """Travel results per conversation, kept in memory for follow-up questions"""
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self._results = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, conversation_key: str) -> TravelResults:
+        results = self._results.get(conversation_key)
+        if results is None:
+            results = TravelResults()
+        # Every use restarts the TTL, so results live as long as the conversation is active
+        self._results.set(conversation_key, results)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return self._results.stats()
+
+# Shared by the pooled TravelIntegration across all conversations in the container
+travel_result_store = TravelResultStore(maxsize=settings.TRAVEL_RESULTS_CACHE_SIZE, ttl=settings.TRAVEL_RESULTS_TTL)
@@ -0,0 +1,111 @@
+from typing import Dict, Any, Awaitable, Callable, Optional
+from app.config.settings import settings
+from utils.cache import TTLCache
+from utils.logger import logger
+import threading
+import asyncio
+import sqlite3
+import json
+import time
+
+# Never part of a cache key or stored alongside the results
+EXCLUDED_PARAMS = {"api_key"}
+
+def search_cache_key(params: Dict[str, Any]) -> str:
+    """Normalize SerpAPI params so equivalent searches share an entry"""
+    normalized = {k: str(v).strip() for k, v in params.items() if k not in EXCLUDED_PARAMS and v not in (None, "")}
+    return json.dumps(normalized, sort_keys=True)
+
+class SearchCache:
+    """SerpAPI responses cached in memory and in SQLite, with identical concurrent searches coalesced.
+
+    The SQLite file lives in /tmp on Lambda, so results survive warm invocations
+    and are shared by every integration in the container.
+    """
+    def __init__(self, db_file: Optional[str], ttl: float, maxsize: int = 256):
+        self.ttl = ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._db_lock = threading.Lock()
+        self.conn = None
+        if db_file:
+            try:
+                self.conn = sqlite3.connect(db_file, check_same_thread=False)
+                self.conn.execute(
+                    "CREATE TABLE IF NOT EXISTS search_cache (key TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self.conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Error opening search cache at {db_file}, keeping results in memory only: {e}")
+                self.conn = None
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.conn is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self.conn.execute("SELECT data, expires_at FROM search_cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading search cache: {e}")
+            return None
+        if not row or row[1] <= time.time():
+            return None
+        data = json.loads(row[0])
+        self._cache.set(key, data, ttl=row[1] - time.time())
+        return data
+
+    def set(self, key: str, data: Dict[str, Any]):
+        self._cache.set(key, data)
+        if self.conn is None:
+            return
+        try:
+            with self._db_lock:
+                now = time.time()
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, data, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(data), now + self.ttl)
+                )
+                self.conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+                self.conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error writing search cache: {e}")
+
+    async def get_or_fetch(self, params: Dict[str, Any], fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Return the cached response for params, or run fetch once for all concurrent callers.
+
+        Responses carrying an "error" are returned but not cached.
+        """
+        key = search_cache_key(params)
+        data = self._cache.get(key)
+        if data is None and self.conn is not None:
+            data = await asyncio.to_thread(self._load, key)
+        if data is not None:
+            logger.debug(f"Search cache hit for {key}")
+            return data
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.debug(f"Joining in-flight search for {key}")
+        # A caller being cancelled must not cancel the search for everyone else
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        data = await fetch()
+        if "error" not in data:
+            await asyncio.to_thread(self.set, key, data)
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+# Shared by every FlightSearch in the container
+flight_search_cache = SearchCache(
+    settings.SERPAPI_CACHE_DB_PATH,
+    ttl=settings.FLIGHT_CACHE_TTL,
+    maxsize=settings.SERPAPI_CACHE_SIZE
+)
@@ -1,10 +1,16 @@
 from utils.travel_format import normalize_airport_codes, process_travel_dates, set_default_origin
+from utils.dates_format import parse_date
+from app.services.travel.search_cache import flight_search_cache
+from app.services.travel.http_client import serpapi_get
+from app.services.travel.itinerary import Itinerary, filter_itineraries, parse_itineraries, rank_itineraries
+from app.services.travel.result_store import TravelResults
 from app.config.settings import settings
 from utils.logger import logger
-from datetime import datetime
-from typing import Dict, Any
+from datetime import datetime, time, timedelta
+from typing import Dict, Any, List, Optional, Tuple
 import traceback
-import requests
+import asyncio
+import httpx
 
 class FlightSearch:
     def __init__(self):
@@ -26,7 +32,12 @@ class FlightSearch:
         }
         self.default_origin = settings.DEFAULT_ORIGIN
 
-    def search_flights(self, travel_request: Dict[str, Any]) -> str:
+    async def search_flights(self, travel_request: Dict[str, Any], results: Optional[TravelResults] = None) -> str:
+        """
+        Search one route and date, then filter and sort the results locally.
+
+        :param results: Conversation result store that keeps every itinerary for follow-up questions.
+        """
         logger.debug(f"Searching flights with travel request: {travel_request}")
         try:
             if not travel_request:
@@ -37,28 +48,189 @@ class FlightSearch:
             
             params = self._build_params(processed_request)
             logger.debug(f"API request params: {params}")
-            response = requests.get("https://serpapi.com/search", params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = await flight_search_cache.get_or_fetch(params, lambda: serpapi_get(params))
 
             #logger.debug(f"API response data: {data}")
 
             if "error" in data:
                 return f"Failed to retrieve flight data: {data['error']}"
 
-            best_flights = data.get("best_flights", [])
-            logger.debug(f"Best flights data: {best_flights}")
-            if not best_flights:
-                return "No best flights found"
-
-            formatted_results = self._format_flight_results(best_flights)
+            # Refinements are applied to the fetched results, so they never change the cache key
+            itineraries = parse_itineraries(data)
+            if not itineraries:
+                return "No flights found"
+            if results is not None:
+                results.set_flights(itineraries)
+            formatted_results = self._refine(itineraries, travel_request, results)
             logger.debug(f"Flight search results: {formatted_results}")
             return formatted_results
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Error searching for flights: {str(e)}")
             logger.error(f"Traceback: {traceback.format_exc()}")
             return f"Failed to retrieve flight data: {str(e)}"
 
+    async def search_flights_flexible(self, travel_request: Dict[str, Any], earliest_departure: str, latest_departure: str,
+                                      min_trip_days: Optional[int] = None, max_trip_days: Optional[int] = None, limit: int = 5,
+                                      results: Optional[TravelResults] = None) -> str:
+        """
+        Search every departure date (and trip length) in a window concurrently and rank them by price.
+
+        :param travel_request: Route and passenger options, as for search_flights.
+        :param earliest_departure: First departure date to try.
+        :param latest_departure: Last departure date to try.
+        :param min_trip_days: Shortest trip for round trips; leave both trip lengths empty for one-way.
+        :param max_trip_days: Longest trip for round trips.
+        :param limit: Number of cheapest itineraries to describe in detail.
+        :param results: Conversation result store that keeps every itinerary for follow-up questions.
+        """
+        logger.debug(f"Flexible flight search: {travel_request}, {earliest_departure} - {latest_departure}, trip days {min_trip_days}-{max_trip_days}")
+        request = {k: v for k, v in travel_request.items() if k not in ("departure_date", "return_date")}
+        processed_request = set_default_origin(normalize_airport_codes(request), self.default_origin)
+
+        date_pairs = self._flexible_dates(earliest_departure, latest_departure, min_trip_days, max_trip_days)
+        if not date_pairs:
+            return "No valid travel dates found in the requested window"
+        skipped = len(date_pairs) - settings.FLEXIBLE_SEARCH_MAX_QUERIES
+        date_pairs = date_pairs[:settings.FLEXIBLE_SEARCH_MAX_QUERIES]
+
+        # The shared HTTP client caps how many of these reach SerpAPI at once
+        responses = await asyncio.gather(
+            *(self._search_dates(processed_request, departure, return_date) for departure, return_date in date_pairs),
+            return_exceptions=True
+        )
+
+        filters, _ = self._local_filters(travel_request)
+        itineraries: Dict[Tuple, Itinerary] = {}
+        price_calendar: List[Tuple[int, str, Optional[str]]] = []
+        failures = 0
+        for (departure, return_date), data in zip(date_pairs, responses):
+            if isinstance(data, Exception) or "error" in data:
+                logger.error(f"Flexible flight search failed for {departure}/{return_date}: {data if isinstance(data, Exception) else data['error']}")
+                failures += 1
+                continue
+            parsed = parse_itineraries(data, return_date)
+            # The same flights can show up in several searches; keep the cheapest fare
+            for itinerary in parsed:
+                existing = itineraries.get(itinerary.key)
+                if existing is None or itinerary.price < existing.price:
+                    itineraries[itinerary.key] = itinerary
+            found = filter_itineraries(parsed, **filters)
+            if found:
+                price_calendar.append((min(itinerary.price for itinerary in found), departure, return_date))
+
+        if not price_calendar:
+            if failures == len(date_pairs):
+                return "Failed to retrieve flight data for the requested dates"
+            return "No flights found in the requested window"
+
+        price_calendar.sort()
+        lines = ["Price calendar (cheapest first):"]
+        for price, departure, return_date in price_calendar:
+            dates = self._format_date(departure) + (f" - {self._format_date(return_date)}" if return_date else "")
+            lines.append(f"- {dates}: ${price}")
+        if failures:
+            lines.append(f"({failures} date combination(s) could not be searched)")
+        if skipped > 0:
+            lines.append(f"({skipped} more date combination(s) were not searched; narrow the window to see them)")
+
+        # Every itinerary is stored, so follow-ups can loosen the filters without searching again
+        cheapest_itineraries = rank_itineraries(filter_itineraries(itineraries.values(), **filters), "price", limit)
+        numbers = None
+        if results is not None:
+            results.set_flights(list(itineraries.values()))
+            numbers = [results.flight_option(itinerary) for itinerary in cheapest_itineraries]
+        return "\n".join(lines) + "\n\nCheapest itineraries:\n" + self._format_flight_results(cheapest_itineraries, numbers)
+
+    def refine_results(self, results: TravelResults, options: Dict[str, Any], page: int = 1) -> str:
+        """Filter, sort and page through the flights already stored for the conversation"""
+        if not results.flights:
+            return "There are no flight results to refine yet. Search for flights first."
+        return self._refine(results.flights, options, results, page)
+
+    def _refine(self, itineraries: List[Itinerary], options: Dict[str, Any], results: Optional[TravelResults], page: int = 1) -> str:
+        filters, sort_by = self._local_filters(options)
+        matching = filter_itineraries(itineraries, **filters)
+        if not matching:
+            return f"None of the {len(itineraries)} flights found match those filters"
+
+        page_size = settings.FLIGHT_RESULTS_LIMIT
+        pages = -(-len(matching) // page_size)
+        page = min(max(page, 1), pages)
+        shown = rank_itineraries(matching, sort_by)[(page - 1) * page_size:page * page_size]
+        numbers = [results.flight_option(itinerary) for itinerary in shown] if results is not None else None
+        formatted_results = self._format_flight_results(shown, numbers)
+        if pages > 1:
+            formatted_results += f"\n\n(Page {page} of {pages}, {len(matching)} matching flights)"
+        return formatted_results
+
+    def flight_details(self, results: TravelResults, option: int) -> str:
+        itinerary = results.get_flight(option)
+        if itinerary is None:
+            return f"There is no flight option {option}. There are {len(results.flights)} flight results."
+        details = self._format_flight_results([itinerary], [option])
+        total_hours, total_minutes = divmod(itinerary.duration, 60)
+        flight_numbers = ", ".join(segment.flight_number for segment in itinerary.segments if segment.flight_number)
+        details += f"\n  - Total travel time: {total_hours}h {total_minutes}m"
+        if flight_numbers:
+            details += f"\n  - Flights: {flight_numbers}"
+        if itinerary.return_date:
+            details += f"\n  - Return date: {itinerary.return_date}"
+        return details
+
+    async def _search_dates(self, processed_request: Dict[str, Any], departure: str, return_date: Optional[str]) -> Dict[str, Any]:
+        params = self._build_params({**processed_request, "departure_date": departure, "return_date": return_date})
+        return await flight_search_cache.get_or_fetch(params, lambda: serpapi_get(params))
+
+    def _flexible_dates(self, earliest_departure: str, latest_departure: str,
+                        min_trip_days: Optional[int], max_trip_days: Optional[int]) -> List[Tuple[str, Optional[str]]]:
+        earliest, latest = parse_date(earliest_departure), parse_date(latest_departure) or parse_date(earliest_departure)
+        if not earliest or not latest:
+            return []
+        start, end = datetime.strptime(earliest, '%Y-%m-%d'), datetime.strptime(latest, '%Y-%m-%d')
+        if min_trip_days or max_trip_days:
+            lengths = range(min_trip_days or max_trip_days, (max_trip_days or min_trip_days) + 1)
+        else:
+            lengths = [None]
+
+        date_pairs = []
+        day = start
+        while day <= end:
+            for length in lengths:
+                return_date = (day + timedelta(days=length)).strftime('%Y-%m-%d') if length else None
+                date_pairs.append((day.strftime('%Y-%m-%d'), return_date))
+            day += timedelta(days=1)
+        return date_pairs
+
+    def _format_date(self, value: str) -> str:
+        return datetime.strptime(value, '%Y-%m-%d').strftime('%a, %b %d')
+
+    def _local_filters(self, travel_request: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        """Read the refinement options of the search_flights tool; empty, zero or negative values mean no filter"""
+        def number(name: str) -> Optional[int]:
+            try:
+                value = int(travel_request.get(name))
+            except (TypeError, ValueError):
+                return None
+            return value if value >= 0 else None
+
+        def clock(name: str) -> Optional[time]:
+            try:
+                return datetime.strptime(travel_request.get(name) or "", "%H:%M").time()
+            except ValueError:
+                return None
+
+        airlines = travel_request.get("airlines") or []
+        if isinstance(airlines, str):
+            airlines = [airline.strip() for airline in airlines.split(",") if airline.strip()]
+        filters = {
+            "max_price": number("max_price") or None,
+            "max_stops": number("max_stops"),
+            "max_duration": number("max_duration") or None,
+            "depart_after": clock("depart_after"),
+            "depart_before": clock("depart_before"),
+            "airlines": airlines
+        }
+        return filters, travel_request.get("sort_by") or "price"
 
     def _process_travel_request(self, travel_request: Dict[str, Any]) -> Dict[str, Any]:
         processed_request = travel_request
@@ -97,48 +269,33 @@ class FlightSearch:
     def _get_optional_params(self) -> list:
         return [
             "gl", "hl", "currency", "travel_class", "show_hidden", "adults", "children",
-            "infants_in_seat", "infants_on_lap", "stops", "exclude_airlines", "include_airlines",
-            "bags", "max_price", "outbound_times", "return_times", "emissions", "layover_duration",
-            "exclude_conns", "max_duration"
+            "infants_in_seat", "infants_on_lap", "exclude_airlines", "include_airlines",
+            "bags", "outbound_times", "return_times", "emissions", "layover_duration",
+            "exclude_conns"
         ]
 
-    def _format_flight_results(self, best_flights: list) -> str:
+    def _format_flight_results(self, itineraries: List[Itinerary], numbers: Optional[List[int]] = None) -> str:
         formatted_output = []
-        for idx, flight_group in enumerate(best_flights, 1):
-            logger.debug(f"Processing flight group {idx}: {flight_group}")
+        for idx, itinerary in zip(numbers or range(1, len(itineraries) + 1), itineraries):
             flight_details = []
-            flights = flight_group.get("flights", [])
-            
-            if not flights:
-                logger.warning(f"No flights found in flight group {idx}")
-                continue
-            
-            first_flight = flights[0]
-            airline = first_flight.get("airline", "Unknown Airline")
-            price = flight_group.get("price", "N/A")
-            stops = len(flights) - 1
-            
-            for flight in flights:
-                logger.debug(f"Processing flight: {flight}")
-                duration_hours, duration_minutes = divmod(flight.get("duration", 0), 60)
-                departure_time = datetime.strptime(flight['departure_airport']['time'], '%Y-%m-%d %H:%M')
-                arrival_time = datetime.strptime(flight['arrival_airport']['time'], '%Y-%m-%d %H:%M')
-                formatted_departure = departure_time.strftime('%B %d at %H:%M')
-                formatted_arrival = arrival_time.strftime('%B %d at %H:%M')
+            for segment in itinerary.segments:
+                duration_hours, duration_minutes = divmod(segment.duration, 60)
+                formatted_departure = segment.departure_time.strftime('%B %d at %H:%M')
+                formatted_arrival = segment.arrival_time.strftime('%B %d at %H:%M')
                 flight_details.append(
-                    f"  - Departure: {flight['departure_airport']['name']} ({flight['departure_airport']['id']}) on {formatted_departure}\n"
-                    f"  - Arrival: {flight['arrival_airport']['name']} ({flight['arrival_airport']['id']}) on {formatted_arrival}\n"
+                    f"  - Departure: {segment.departure_airport} ({segment.departure_code}) on {formatted_departure}\n"
+                    f"  - Arrival: {segment.arrival_airport} ({segment.arrival_code}) on {formatted_arrival}\n"
                     f"  - Duration: {duration_hours}h {duration_minutes}m"
                 )
-            
+
             formatted_output.append(
-                f"{idx}. {airline} - ${price} - {stops} stop(s):\n" +
+                f"{idx}. {itinerary.airline} - ${itinerary.price} - {itinerary.stops} stop(s):\n" +
                 "\n".join(flight_details)
             )
-        
+
         if not formatted_output:
             return "No flight results could be formatted."
-        
+
         return "\n\n".join(formatted_output)
 
 def create_flight_search() -> FlightSearch:
@@ -1,9 +1,12 @@
 from utils.travel_format import process_travel_dates
+from app.services.travel.http_client import serpapi_get
+from app.services.travel.hotel import Hotel, filter_hotels, parse_hotels, rank_hotels
+from app.services.travel.result_store import TravelResults
 from app.config.settings import settings 
 from utils.logger import logger
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import traceback
-import requests
+import httpx
 
 class HotelSearch:
     def __init__(self):
@@ -22,28 +25,34 @@ class HotelSearch:
             "output": "json"
         }
 
-    def search_hotels(self, travel_request: Dict[str, Any]) -> str:
+    async def search_hotels(self, travel_request: Dict[str, Any], results: Optional[TravelResults] = None) -> str:
+        """
+        Search hotels and show the first page of results.
+
+        :param results: Conversation result store that keeps every hotel and its property_token for follow-up questions.
+        """
         logger.debug(f"Searching hotels with travel request: {travel_request}")
         try:
             # Process and normalize the travel request
             processed_request = self._process_travel_request(travel_request)
             
             params = self._build_params(processed_request)
-            response = requests.get("https://serpapi.com/search", params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = await serpapi_get(params)
 
             if "error" in data:
                 return f"Failed to retrieve hotel data: {data['error']}"
 
-            hotels_results = data.get("hotels_results", [])
-            if not hotels_results:
+            hotels = parse_hotels(data)
+            if not hotels:
                 return "No hotels found"
 
-            formatted_results = self._format_hotel_results(hotels_results)
+            if results is not None:
+                # Property details are priced for the same stay, so keep the search dates with the results
+                results.set_hotels(hotels, {k: params[k] for k in ("check_in_date", "check_out_date", "currency", "adults", "children") if k in params})
+            formatted_results = self._format_page(hotels, results)
             logger.debug(f"Hotel search results: {formatted_results}")
             return formatted_results
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Error searching for hotels: {str(e)}")
             logger.error(f"Traceback: {traceback.format_exc()}")
             return f"Failed to retrieve hotel data: {str(e)}"
@@ -78,54 +87,95 @@ class HotelSearch:
             "next_page_token", "property_token", "no_cache", "async"
         ]
 
-    def _format_hotel_results(self, hotels_results: list) -> str:
+    def refine_results(self, results: TravelResults, max_price: Optional[int] = None, min_rating: Optional[float] = None,
+                       min_class: Optional[int] = None, sort_by: str = "relevance", page: int = 1) -> str:
+        """Filter, sort and page through the hotels already stored for the conversation"""
+        if not results.hotels:
+            return "There are no hotel results to refine yet. Search for hotels first."
+        matching = filter_hotels(results.hotels, max_price=max_price, min_rating=min_rating, min_class=min_class)
+        if not matching:
+            return f"None of the {len(results.hotels)} hotels found match those filters"
+        return self._format_page(rank_hotels(matching, sort_by), results, page)
+
+    def _format_page(self, hotels: List[Hotel], results: Optional[TravelResults], page: int = 1) -> str:
+        page_size = settings.HOTEL_RESULTS_LIMIT
+        pages = -(-len(hotels) // page_size)
+        page = min(max(page, 1), pages)
+        shown = hotels[(page - 1) * page_size:page * page_size]
+        numbers = [results.hotel_option(hotel) for hotel in shown] if results is not None else None
+        formatted_results = self._format_hotel_results(shown, numbers)
+        if pages > 1:
+            formatted_results += f"\n\n(Page {page} of {pages}, {len(hotels)} hotels)"
+        return formatted_results
+
+    def _format_hotel_results(self, hotels: List[Hotel], numbers: Optional[List[int]] = None) -> str:
         formatted_output = []
-        for idx, hotel in enumerate(hotels_results, 1):
+        for idx, hotel in zip(numbers or range(1, len(hotels) + 1), hotels):
             formatted_output.append(
-                f"{idx}. {hotel.get('name', 'N/A')}\n"
-                f"  - Price: {hotel.get('price', 'N/A')}\n"
-                f"  - Rating: {hotel.get('rating', 'N/A')}/5 ({hotel.get('reviews', 'N/A')} reviews)\n"
-                f"  - Address: {hotel.get('address', 'N/A')}\n"
-                f"  - Description: {hotel.get('description', 'N/A')}"
+                f"{idx}. {hotel.name}\n"
+                f"  - Price: {hotel.price_text}\n"
+                f"  - Rating: {hotel.rating or 'N/A'}/5 ({hotel.reviews or 'N/A'} reviews)\n"
+                f"  - Address: {hotel.address}\n"
+                f"  - Description: {hotel.description}"
             )
         return "\n\n".join(formatted_output)
 
-    def get_hotel_details(self, property_token: str) -> str:
+    async def hotel_details(self, results: TravelResults, option: int) -> str:
+        """Details for a stored hotel option, fetched once per conversation"""
+        hotel = results.get_hotel(option)
+        if hotel is None:
+            return f"There is no hotel option {option}. There are {len(results.hotels)} hotel results."
+        if not hotel.property_token:
+            return self._format_hotel_results([hotel], [option])
+        if hotel.property_token not in results.hotel_details:
+            details = await self.get_hotel_details(hotel.property_token, **results.hotel_search)
+            if details.startswith("Failed"):
+                return details
+            results.hotel_details[hotel.property_token] = details
+        return results.hotel_details[hotel.property_token]
+
+    async def get_hotel_details(self, property_token: str, **search_params) -> str:
+        """
+        :param search_params: check_in_date, check_out_date and guests of the search the token came from.
+        """
         logger.debug(f"Getting hotel details for property_token: {property_token}")
         try:
             params = {
+                **search_params,
                 "engine": "google_hotels",
                 "property_token": property_token,
                 "api_key": self.serpapi_api_key,
                 "output": "json"
             }
-            response = requests.get("https://serpapi.com/search", params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = await serpapi_get(params)
 
             if "error" in data:
                 return f"Failed to retrieve hotel details: {data['error']}"
 
-            hotel_data = data.get("hotel_results", {})
+            # Property searches return the hotel at the top level of the response
+            hotel_data = data.get("hotel_results") or data
             formatted_details = self._format_hotel_details(hotel_data)
             logger.debug(f"Hotel details: {formatted_details}")
             return formatted_details
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Error getting hotel details: {str(e)}")
             logger.error(f"Traceback: {traceback.format_exc()}")
             return f"Failed to retrieve hotel details: {str(e)}"
 
     def _format_hotel_details(self, hotel_data: Dict[str, Any]) -> str:
         amenities = ", ".join(hotel_data.get("amenities", []))
-        nearby_places = ", ".join(hotel_data.get("nearby_places", []))
+        nearby_places = ", ".join(
+            place.get("name", "") if isinstance(place, dict) else str(place) for place in hotel_data.get("nearby_places", [])
+        )
+        rate = hotel_data.get("rate_per_night") or {}
 
         return (
             f"Name: {hotel_data.get('name', 'N/A')}\n"
             f"Address: {hotel_data.get('address', 'N/A')}\n"
             f"Phone: {hotel_data.get('phone', 'N/A')}\n"
-            f"Rating: {hotel_data.get('rating', 'N/A')}/5 ({hotel_data.get('reviews', 'N/A')} reviews)\n"
-            f"Price: {hotel_data.get('price', 'N/A')}\n"
-            f"Website: {hotel_data.get('website', 'N/A')}\n"
+            f"Rating: {hotel_data.get('overall_rating', hotel_data.get('rating', 'N/A'))}/5 ({hotel_data.get('reviews', 'N/A')} reviews)\n"
+            f"Price: {rate.get('lowest') or hotel_data.get('price', 'N/A')}\n"
+            f"Website: {hotel_data.get('link') or hotel_data.get('website', 'N/A')}\n"
             f"Check-in: {hotel_data.get('check_in_time', 'N/A')}\n"
             f"Check-out: {hotel_data.get('check_out_time', 'N/A')}\n"
             f"Description: {hotel_data.get('description', 'N/A')}\n"
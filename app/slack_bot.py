@@ -1,3 +1,4 @@
+from app.config.acknowledgement_config import AcknowledgementConfig
 from app.assistants.assistant_manager import AssistantManager
 from utils.slack_formatter import SlackMessageFormatter
 from app.config.config_manager import ConfigManager
@@ -7,6 +8,7 @@ from slack_bolt.async_app import AsyncApp
 from app.config.settings import settings
 from utils.logger import logger
 import traceback
+import asyncio
 from slack_bolt.adapter.aws_lambda import SlackRequestHandler
 
 def create_slack_bot(config_manager: ConfigManager):
@@ -38,21 +40,26 @@ async def process_message_event(event, say, dispatcher):
     text = event.get("text", "")
     user = event.get("user")
     channel = event.get("channel")
+    thread_ts = event.get("thread_ts")
 
-    logger.debug(f"Processing message event - Text: {text}, User: {user}, Channel: {channel}")
+    logger.debug(f"Processing message event - Text: {text}, User: {user}, Channel: {channel}, Thread: {thread_ts}")
 
     if not text or not user:
         logger.warning("Invalid message event: missing text or user")
         return
 
     try:
-        openai_client = OpenAIClient()
-        short_response = openai_client.generate_short_response(text)
-        await say(text=short_response, channel=channel)
+        # Classification feeds both the acknowledgement template and the dispatch,
+        # so the acknowledgement no longer delays the real answer
+        classification = asyncio.ensure_future(dispatcher.classify_message(text.lower(), user, thread_ts))
+        acknowledgement = asyncio.ensure_future(send_acknowledgement(say, text, channel, classification))
 
         logger.debug("Dispatching message")
-        dispatch_result = await dispatcher.dispatch(text.lower(), user)  # Added user parameter here
+        dispatch_result = await dispatcher.dispatch(text.lower(), user, classification=classification, thread_ts=thread_ts)
         logger.debug(f"Dispatch result: {dispatch_result}")
+
+        # Keep the acknowledgement ahead of the answer in the channel
+        await acknowledgement
         
         if 'error' in dispatch_result:
             logger.error(f"Error in dispatch result: {dispatch_result['error']}")
@@ -94,6 +101,21 @@ async def process_message_event(event, say, dispatcher):
         logger.error(f"Traceback: {traceback.format_exc()}")
         await say(text=f"I'm sorry, but I encountered an error while processing your request: {str(e)}\nPlease try again later.", channel=channel)
 
+async def send_acknowledgement(say, text, channel, classification):
+    try:
+        if settings.ACK_TEMPLATES_ENABLED:
+            try:
+                category = await classification
+            except Exception:
+                category = None
+            short_response = AcknowledgementConfig.get_acknowledgement(category)
+        else:
+            openai_client = OpenAIClient()
+            short_response = await openai_client.generate_short_response(text)
+        await say(text=short_response, channel=channel)
+    except Exception as e:
+        logger.error(f"Error sending acknowledgement: {e}")
+
 async def send_slack_response(say, assistant_response, tool_responses, channel):
     logger.debug(f"Sending Slack response - Channel: {channel}, Response: {assistant_response}")
     
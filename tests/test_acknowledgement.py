@@ -0,0 +1,66 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+from app.config.acknowledgement_config import AcknowledgementConfig
+from app.slack_bot import process_message_event
+
+class FakeDispatcher:
+    def __init__(self):
+        self.classified = 0
+        self.dispatch_started = asyncio.Event()
+
+    async def classify_message(self, text, user, thread_ts=None):
+        self.classified += 1
+        await asyncio.sleep(0.01)
+        return "calendar"
+
+    async def dispatch(self, text, user, classification=None, thread_ts=None):
+        self.dispatch_started.set()
+        self.category = await classification
+        return {"thread_id": "thread_1", "run_id": "run_1", "assistant_response": "You are free at 3pm."}
+
+class TestAcknowledgement(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.dispatcher = FakeDispatcher()
+        self.said = []
+        self.responses = []
+
+        async def fake_send_slack_response(say, assistant_response, tool_responses, channel):
+            self.responses.append(assistant_response)
+
+        for target, value in (("app.slack_bot.settings.ACK_TEMPLATES_ENABLED", True),
+                              ("app.slack_bot.send_slack_response", fake_send_slack_response)):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def process(self, say):
+        event = {"text": "Am I free tomorrow?", "user": "U1", "channel": "C1"}
+        await asyncio.wait_for(process_message_event(event, say, self.dispatcher), timeout=1)
+
+    async def test_ack_runs_alongside_dispatch_and_shares_classification(self):
+        async def say(text, channel):
+            # Only completes if dispatch is already under way
+            await self.dispatcher.dispatch_started.wait()
+            self.said.append(text)
+
+        await self.process(say)
+
+        self.assertEqual(self.dispatcher.classified, 1)
+        self.assertEqual(self.dispatcher.category, "calendar")
+        self.assertEqual(len(self.said), 1)
+        self.assertIn(self.said[0], AcknowledgementConfig.TEMPLATES["calendar"])
+        self.assertEqual(self.responses, ["You are free at 3pm."])
+
+    async def test_ack_failure_keeps_the_answer(self):
+        async def say(text, channel):
+            raise RuntimeError("Slack unavailable")
+
+        with patch("app.slack_bot.logger") as logger:
+            await self.process(say)
+
+        self.assertEqual(self.responses, ["You are free at 3pm."])
+        self.assertIn("Error sending acknowledgement", logger.error.call_args_list[0].args[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from unittest.mock import patch
+from app.assistants.assistant_factory import AssistantFactory, integration_pool
+
+class FakeIntegration:
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.expired = False
+
+    def is_expired(self):
+        return self.expired
+
+class TestIntegrationPool(unittest.TestCase):
+    def setUp(self):
+        integration_pool.clear()
+        patcher = patch.dict(AssistantFactory.INTEGRATIONS, {"FakeAssistant": FakeIntegration})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(integration_pool.clear)
+
+    def test_reuses_integration_per_user(self):
+        first = AssistantFactory.get_api_integration("FakeAssistant", "U1")
+        self.assertIs(AssistantFactory.get_api_integration("FakeAssistant", "U1"), first)
+        self.assertIsNot(AssistantFactory.get_api_integration("FakeAssistant", "U2"), first)
+
+    def test_rebuilds_expired_integration(self):
+        first = AssistantFactory.get_api_integration("FakeAssistant", "U1")
+        first.expired = True
+        second = AssistantFactory.get_api_integration("FakeAssistant", "U1")
+        self.assertIsNot(second, first)
+        self.assertIs(AssistantFactory.get_api_integration("FakeAssistant", "U1"), second)
+
+    def test_invalidate_user(self):
+        first = AssistantFactory.get_api_integration("FakeAssistant", "U1")
+        other = AssistantFactory.get_api_integration("FakeAssistant", "U2")
+        AssistantFactory.invalidate_integrations("U1")
+        self.assertIsNot(AssistantFactory.get_api_integration("FakeAssistant", "U1"), first)
+        self.assertIs(AssistantFactory.get_api_integration("FakeAssistant", "U2"), other)
+
+    def test_unknown_assistant(self):
+        self.assertIsNone(AssistantFactory.get_api_integration("UnknownAssistant", "U1"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from app.assistants.assistant_manager import AssistantManager
+
+def make_run(status, run_id="run_1", tool_calls=None):
+    run = SimpleNamespace(id=run_id, status=status, required_action=None)
+    if tool_calls is not None:
+        run.required_action = SimpleNamespace(submit_tool_outputs=SimpleNamespace(tool_calls=tool_calls))
+    return run
+
+class FakeRuns:
+    def __init__(self, statuses=(), streams=()):
+        self.statuses = list(statuses)
+        self.streams = list(streams)
+        self.retrieved = 0
+        self.submitted = []
+
+    async def retrieve(self, thread_id, run_id):
+        self.retrieved += 1
+        return make_run(self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0], run_id)
+
+    def stream(self, **params):
+        return FakeStream(self.streams.pop(0))
+
+    def submit_tool_outputs_stream(self, thread_id, run_id, tool_outputs):
+        self.submitted.append((run_id, tool_outputs))
+        return FakeStream(self.streams.pop(0))
+
+class FakeStream:
+    def __init__(self, events):
+        self.events = events
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def __aiter__(self):
+        for event, data in self.events:
+            yield SimpleNamespace(event=event, data=data)
+
+class TestRunPolling(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.runs = FakeRuns()
+        client = SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(runs=self.runs)))
+        self.manager = AssistantManager(None)
+        self.sleeps = []
+        real_sleep = asyncio.sleep
+
+        async def fake_sleep(delay):
+            self.sleeps.append(delay)
+            await real_sleep(0)
+
+        for target, value in (("app.assistants.assistant_manager.get_async_openai_client", lambda: client),
+                              ("app.assistants.assistant_manager.asyncio.sleep", fake_sleep),
+                              ("app.assistants.assistant_manager.settings.RUN_POLL_INITIAL_INTERVAL", 0.1),
+                              ("app.assistants.assistant_manager.settings.RUN_POLL_MAX_INTERVAL", 0.3),
+                              ("app.assistants.assistant_manager.settings.RUN_TIMEOUT", 60)):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_backs_off_up_to_max_interval(self):
+        self.runs.statuses = ["queued", "in_progress", "in_progress", "in_progress", "completed"]
+        run = await self.manager.wait_on_run("thread_1", "run_1")
+        self.assertEqual(run.status, "completed")
+        self.assertEqual(self.runs.retrieved, 5)
+        self.assertEqual([round(delay, 3) for delay in self.sleeps], [0.1, 0.15, 0.225, 0.3])
+
+    async def test_returns_on_requires_action_without_sleeping(self):
+        self.runs.statuses = ["requires_action"]
+        run = await self.manager.wait_on_run("thread_1", "run_1")
+        self.assertEqual(run.status, "requires_action")
+        self.assertEqual(self.sleeps, [])
+
+    async def test_failed_status_raises(self):
+        for status in ["failed", "cancelled", "expired", "incomplete"]:
+            self.runs.statuses = [status]
+            with self.assertRaisesRegex(Exception, status):
+                await self.manager.wait_on_run("thread_1", "run_1")
+
+    async def test_times_out(self):
+        self.runs.statuses = ["in_progress"]
+        with patch("app.assistants.assistant_manager.settings.RUN_TIMEOUT", 0):
+            with self.assertRaises(TimeoutError):
+                await self.manager.wait_on_run("thread_1", "run_1")
+        self.assertEqual(self.runs.retrieved, 1)
+
+    async def test_stream_submits_tool_outputs_on_the_same_run(self):
+        tool_calls = [MagicMock(id="call_1")]
+        self.runs.streams = [
+            [("thread.run.created", make_run("queued")),
+             ("thread.run.step.created", SimpleNamespace(status="in_progress")),
+             ("thread.run.requires_action", make_run("requires_action", tool_calls=tool_calls))],
+            [("thread.message.completed", SimpleNamespace()),
+             ("thread.run.completed", make_run("completed"))],
+        ]
+        handled = []
+
+        async def tool_handler(calls):
+            handled.append(calls)
+            return [{"tool_call_id": "call_1", "output": "done"}]
+
+        with patch.object(self.manager, "_build_run_params", return_value={"thread_id": "thread_1"}):
+            run = await self.manager.stream_run("thread_1", "asst_1", tool_handler)
+
+        self.assertEqual(run.status, "completed")
+        self.assertEqual(handled, [tool_calls])
+        self.assertEqual(self.runs.submitted, [("run_1", [{"tool_call_id": "call_1", "output": "done"}])])
+        self.assertEqual(self.sleeps, [])
+
+    async def test_stream_raises_on_failed_run(self):
+        self.runs.streams = [[("thread.run.failed", make_run("failed"))]]
+        with patch.object(self.manager, "_build_run_params", return_value={"thread_id": "thread_1"}):
+            with self.assertRaisesRegex(Exception, "failed"):
+                await self.manager.stream_run("thread_1", "asst_1", None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+from app.assistants.assistant_registry import AssistantRegistry
+
+class TestAssistantRegistry(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch("app.assistants.assistant_registry.get_assistant_ids",
+                        return_value={"TravelAssistant": "asst_manifest_travel"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.fetches = 0
+        self.remote = {"TravelAssistant": "asst_travel", "CalendarAssistant": "asst_calendar"}
+
+    async def fetch(self):
+        self.fetches += 1
+        await asyncio.sleep(0.01)
+        return dict(self.remote)
+
+    async def test_manifest_seeded_hit_skips_the_api(self):
+        registry = AssistantRegistry(ttl=60)
+        self.assertEqual(await registry.resolve("TravelAssistant", self.fetch), "asst_manifest_travel")
+        await asyncio.sleep(0.02)
+        self.assertEqual(self.fetches, 0)
+
+    async def test_stale_entry_is_served_while_one_refresh_runs(self):
+        registry = AssistantRegistry(ttl=0)
+        registry._ensure_seeded()
+        await asyncio.sleep(0.001)
+
+        first, second = await asyncio.gather(registry.resolve("TravelAssistant", self.fetch),
+                                             registry.resolve("TravelAssistant", self.fetch))
+        self.assertEqual((first, second), ("asst_manifest_travel", "asst_manifest_travel"))
+        self.assertEqual(self.fetches, 1)
+
+        await registry._refresh_task
+        self.assertEqual(registry.get("TravelAssistant"), "asst_travel")
+
+    async def test_concurrent_misses_share_one_refresh(self):
+        registry = AssistantRegistry(ttl=60)
+        results = await asyncio.gather(*(registry.resolve("CalendarAssistant", self.fetch) for _ in range(5)))
+        self.assertEqual(results, ["asst_calendar"] * 5)
+        self.assertEqual(self.fetches, 1)
+
+    async def test_unknown_name(self):
+        registry = AssistantRegistry(ttl=60)
+        self.assertIsNone(await registry.resolve("UnknownAssistant", self.fetch))
+        self.assertEqual(self.fetches, 1)
+
+    async def test_refresh_drops_assistants_whose_id_changed(self):
+        registry = AssistantRegistry(ttl=60)
+        registry.set_assistant("asst_manifest_travel", object())
+        await registry.refresh(self.fetch)
+        self.assertIsNone(registry.get_assistant("asst_manifest_travel"))
+        self.assertEqual(registry.get("TravelAssistant"), "asst_travel")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from utils.block_kit import markdown_to_blocks, render_message, SECTION_TEXT_LIMIT
+
+class TestBlockKit(unittest.TestCase):
+    def test_headings_and_dividers(self):
+        blocks = markdown_to_blocks("# Trip summary\nSome text\n---\n### Details\nMore text")
+        self.assertEqual([block["type"] for block in blocks], ["header", "section", "divider", "section", "section"])
+        self.assertEqual(blocks[0]["text"]["text"], "Trip summary")
+        self.assertEqual(blocks[3]["text"]["text"], "*Details*")
+
+    def test_inline_markdown(self):
+        blocks = markdown_to_blocks("See **this** [page](https://example.com) and ~~that~~ `a <b>`")
+        self.assertEqual(blocks[0]["text"]["text"], "See *this* <https://example.com|page> and ~that~ `a &lt;b&gt;`")
+
+    def test_flight_results_shape(self):
+        message = (
+            "1. Delta - $320 - 0 stop(s):\n"
+            "  - Departure: John F. Kennedy (JFK) on November 15 at 08:00\n"
+            "  - Duration: 6h 30m"
+        )
+        text = markdown_to_blocks(message)[0]["text"]["text"]
+        self.assertEqual(text.split("\n")[0], "1. Delta - $320 - 0 stop(s):")
+        self.assertIn("– *Departure:* John F. Kennedy (JFK) on November 15 at 08:00", text)
+
+    def test_event_fields(self):
+        text = markdown_to_blocks("Events:\n\nID: abc123\nTitle: Standup")[0]["text"]["text"]
+        self.assertEqual(text, "Events:\n\n*ID:* abc123\n*Title:* Standup")
+
+    def test_code_block_is_verbatim(self):
+        blocks = markdown_to_blocks("```\n**not bold**\n```")
+        self.assertEqual(blocks[0]["text"]["text"], "```\n**not bold**\n```")
+
+    def test_long_text_is_chunked(self):
+        message = "\n".join(f"Line {i} " + "x" * 100 for i in range(100))
+        blocks = markdown_to_blocks(message)
+        self.assertGreater(len(blocks), 1)
+        for block in blocks:
+            self.assertLessEqual(len(block["text"]["text"]), SECTION_TEXT_LIMIT)
+
+    def test_render_message(self):
+        payload = render_message("## Hello\n**World**", "C123")
+        self.assertEqual(payload["channel"], "C123")
+        self.assertEqual(payload["text"], "Hello World")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from unittest.mock import patch
+from utils.cache import TTLCache
+
+class TestTTLCache(unittest.TestCase):
+    def test_get_and_set(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    @patch("utils.cache.time.monotonic")
+    def test_entries_expire(self, monotonic):
+        monotonic.return_value = 100.0
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=60)
+        monotonic.return_value = 111.0
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+        self.assertEqual(len(cache), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+from googleapiclient.errors import HttpError
+from app.services.calendar.calendar_manager import CalendarManager, BATCH_LIMIT, FREEBUSY_ITEM_LIMIT
+
+class FakeBatch:
+    def __init__(self, callback, sizes):
+        self.callback = callback
+        self.sizes = sizes
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.sizes.append(len(self.requests))
+        for request_id, request in self.requests:
+            if "items" in request.get("body", {}):
+                calendars = {item["id"]: {"busy": []} for item in request["body"]["items"]}
+                calendars["nobody@example.com"] = {"errors": [{"reason": "notFound"}]}
+                self.callback(request_id, {"calendars": calendars}, None)
+            elif request.get("eventId") == "missing":
+                self.callback(request_id, None, HttpError(MagicMock(status=404), b"Not Found"))
+            else:
+                self.callback(request_id, {"id": request.get("eventId"), "summary": request.get("body", {}).get("summary"), "htmlLink": "link"}, None)
+
+class TestCalendarBatch(unittest.TestCase):
+    def setUp(self):
+        self.service = MagicMock()
+        self.batch_sizes = []
+        self.service.new_batch_http_request.side_effect = lambda callback: FakeBatch(callback, self.batch_sizes)
+        events = self.service.events.return_value
+        events.insert.side_effect = lambda **kwargs: kwargs
+        events.patch.side_effect = lambda **kwargs: kwargs
+        events.delete.side_effect = lambda **kwargs: kwargs
+        self.service.freebusy.return_value.query.side_effect = lambda **kwargs: kwargs
+        with patch("app.services.calendar.calendar_manager.get_google_service", return_value=self.service):
+            self.manager = CalendarManager("U1")
+
+    def test_batches_are_chunked_and_ordered(self):
+        requests = [{"eventId": str(i)} for i in range(BATCH_LIMIT * 2 + 5)]
+        results = self.manager.execute_batch(requests)
+        self.assertEqual(self.batch_sizes, [BATCH_LIMIT, BATCH_LIMIT, 5])
+        self.assertEqual([response["id"] for response, _ in results], [str(i) for i in range(len(requests))])
+
+    def test_update_events_patches_only_changed_fields(self):
+        result = self.manager.update_events([
+            {"event_id": "a", "summary": "", "start_time": "2024-05-01T10:00:00", "end_time": ""},
+            {"event_id": "missing", "summary": "Renamed", "start_time": "", "end_time": ""},
+        ])
+        first_patch = self.service.events.return_value.patch.call_args_list[0].kwargs
+        self.assertEqual(first_patch["body"], {"start": {"dateTime": "2024-05-01T10:00:00"}})
+        self.service.events.return_value.get.assert_not_called()
+        self.assertTrue(result.startswith("Updated 1 of 2 events."))
+        self.assertIn("Failed:\n- missing:", result)
+
+    def test_create_events(self):
+        result = self.manager.create_events([
+            {"summary": "Standup", "start_time": "2024-05-01T09:00:00", "end_time": "2024-05-01T09:15:00", "timezone": "UTC"},
+        ])
+        self.assertEqual(result, "Created 1 of 1 events.\n- Standup: link")
+
+    def test_freebusy_queries_are_chunked_into_one_batch(self):
+        calendar_ids = [f"user{i}@example.com" for i in range(FREEBUSY_ITEM_LIMIT + 10)] + ["nobody@example.com"]
+        start = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        busy, errors = self.manager.query_freebusy(calendar_ids, start, start + timedelta(days=1), "UTC")
+        self.assertEqual(self.batch_sizes, [2])
+        self.assertEqual(len(busy), FREEBUSY_ITEM_LIMIT + 10)
+        self.assertEqual(errors, {"nobody@example.com": "notFound"})
+
+if __name__ == '__main__':
+    unittest.main()
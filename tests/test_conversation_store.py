@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+from app.assistants.conversation_store import (
+    ConversationStore, ConversationState, SQLiteConversationBackend, conversation_key
+)
+
+class TestConversationStore(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        handle, self.db_file = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.addCleanup(os.remove, self.db_file)
+
+    def test_conversation_key(self):
+        self.assertEqual(conversation_key("U1"), "U1")
+        self.assertEqual(conversation_key("U1", "1700000000.000100"), "U1:1700000000.000100")
+
+    def test_add_turn_keeps_most_recent(self):
+        state = ConversationState("U1")
+        for turn in ["one", "two", "three"]:
+            state.add_turn(turn, 2)
+        self.assertEqual(state.recent_turns, ["two", "three"])
+
+    async def test_state_survives_a_new_store(self):
+        store = ConversationStore(SQLiteConversationBackend(self.db_file), maxsize=2)
+        state = await store.get("U1", "U1")
+        state.thread_id = "thread_1"
+        state.add_turn("hello", 2)
+        await store.save(state)
+
+        # A fresh store stands in for a recycled container
+        restored = await ConversationStore(SQLiteConversationBackend(self.db_file)).get("U1")
+        self.assertEqual(restored.thread_id, "thread_1")
+        self.assertEqual(restored.user_id, "U1")
+        self.assertEqual(restored.recent_turns, ["hello"])
+
+    async def test_users_do_not_share_state(self):
+        store = ConversationStore()
+        first = await store.get("U1", "U1")
+        first.thread_id = "thread_1"
+        second = await store.get("U2", "U2")
+        self.assertIsNone(second.thread_id)
+        self.assertIs(await store.get("U1"), first)
+
+    async def test_lock_is_shared_per_key(self):
+        store = ConversationStore()
+        lock = store.lock("U1")
+        self.assertIs(store.lock("U1"), lock)
+        self.assertIsNot(store.lock("U2"), lock)
+
+if __name__ == '__main__':
+    unittest.main()
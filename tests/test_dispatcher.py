@@ -0,0 +1,54 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+from app.assistants.conversation_store import ConversationState
+from app.assistants.dispatcher import Dispatcher
+
+def make_tool_call(call_id, name, arguments):
+    tool_call = MagicMock(id=call_id)
+    tool_call.function.name = name
+    tool_call.function.arguments = arguments
+    return tool_call
+
+class SlowIntegration:
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def execute(self, function_name, params):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.05 if function_name != "hang" else 10)
+        self.running -= 1
+        if function_name == "fail":
+            raise RuntimeError("boom")
+        return f"{function_name} done"
+
+class TestHandleToolCalls(unittest.IsolatedAsyncioTestCase):
+    async def test_calls_run_concurrently_with_partial_failures(self):
+        dispatcher = Dispatcher()
+        integration = SlowIntegration()
+        state = ConversationState("U1", user_id="U1", current_category="calendar")
+        tool_calls = [
+            make_tool_call("1", "list_events", json.dumps({})),
+            make_tool_call("2", "fail", json.dumps({})),
+            make_tool_call("3", "hang", json.dumps({})),
+            make_tool_call("4", "list_events", "not json"),
+        ]
+
+        with patch("app.assistants.dispatcher.AssistantFactory.get_api_integration", return_value=integration) as factory, \
+                patch("app.assistants.dispatcher.settings.TOOL_CALL_TIMEOUT", 0.2), \
+                patch("app.assistants.dispatcher.settings.TOOL_CALL_CONCURRENCY", 4):
+            outputs = await dispatcher.handle_tool_calls(tool_calls, state)
+
+        factory.assert_called_once()
+        self.assertEqual(integration.max_running, 3)
+        self.assertEqual([output["tool_call_id"] for output in outputs], ["1", "2", "3", "4"])
+        self.assertEqual(outputs[0]["output"], "list_events done")
+        self.assertIn("boom", outputs[1]["output"])
+        self.assertIn("timed out", outputs[2]["output"])
+        self.assertIn("invalid arguments", outputs[3]["output"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+import pytz
+from googleapiclient.errors import HttpError
+from app.services.calendar.event_cache import CalendarEventStore
+
+TZ = pytz.timezone("America/Los_Angeles")
+
+def event(event_id, start, end, **fields):
+    return dict(id=event_id, summary=event_id, start={"dateTime": start}, end={"dateTime": end}, **fields)
+
+class FakeCalendarService:
+    def __init__(self):
+        self.calls = []
+        self.responses = []
+
+    def events(self):
+        return self
+
+    def list(self, **params):
+        self.calls.append(params)
+        response = self.responses.pop(0)
+        request = MagicMock()
+        if isinstance(response, Exception):
+            request.execute.side_effect = response
+        else:
+            request.execute.return_value = response
+        return request
+
+class TestCalendarEventStore(unittest.TestCase):
+    def setUp(self):
+        self.service = FakeCalendarService()
+        self.store = CalendarEventStore("U1")
+        self.start = TZ.localize(datetime(2024, 5, 1))
+        self.end = TZ.localize(datetime(2024, 5, 8))
+        patcher = patch("app.services.calendar.event_cache.settings.CALENDAR_SYNC_MIN_INTERVAL", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def full_sync(self):
+        self.service.responses = [
+            {"items": [event("a", "2024-05-02T10:00:00-07:00", "2024-05-02T11:00:00-07:00")], "nextPageToken": "p2"},
+            {"items": [event("b", "2024-05-03T10:00:00-07:00", "2024-05-03T11:00:00-07:00", transparency="transparent")],
+             "nextSyncToken": "sync-1"},
+        ]
+        return self.store.get_events(self.service, self.start, self.end)
+
+    def test_full_sync_follows_pages(self):
+        self.assertEqual([e["id"] for e in self.full_sync()], ["a", "b"])
+        self.assertEqual(self.service.calls[1]["pageToken"], "p2")
+        self.assertEqual(self.store.sync_token, "sync-1")
+
+    def test_incremental_sync_applies_changes(self):
+        self.full_sync()
+        self.service.responses = [{
+            "items": [{"id": "a", "status": "cancelled"},
+                      event("c", "2024-05-04T09:00:00-07:00", "2024-05-04T09:30:00-07:00")],
+            "nextSyncToken": "sync-2"
+        }]
+        events = self.store.get_events(self.service, self.start, TZ.localize(datetime(2024, 5, 5)))
+        self.assertEqual([e["id"] for e in events], ["b", "c"])
+        self.assertEqual(self.service.calls[-1]["syncToken"], "sync-1")
+        self.assertNotIn("timeMin", self.service.calls[-1])
+
+    def test_expired_sync_token_triggers_full_sync(self):
+        self.full_sync()
+        self.service.responses = [
+            HttpError(MagicMock(status=410), b"Gone"),
+            {"items": [], "nextSyncToken": "sync-2"},
+        ]
+        self.assertEqual(self.store.get_events(self.service, self.start, self.end), [])
+        self.assertEqual(self.store.sync_token, "sync-2")
+
+    def test_busy_times_skip_transparent_events(self):
+        self.full_sync()
+        self.service.responses = [{"items": [], "nextSyncToken": "sync-2"}]
+        busy = self.store.get_busy_times(self.service, self.start, self.end)
+        self.assertEqual(busy, [{"start": "2024-05-02T10:00:00-07:00", "end": "2024-05-02T11:00:00-07:00"}])
+
+    def test_range_outside_window_widens_it(self):
+        self.full_sync()
+        self.service.responses = [{"items": [], "nextSyncToken": "sync-2"}]
+        later = TZ.localize(datetime(2024, 5, 20))
+        self.store.get_events(self.service, self.end, later)
+        self.assertEqual(self.service.calls[-1]["timeMin"], self.start.isoformat())
+        self.assertEqual(self.store.window, (self.start, later))
+
+    def test_wide_ranges_stream_without_caching(self):
+        self.service.responses = [
+            {"items": [event("a", "2024-05-02T10:00:00-07:00", "2024-05-02T11:00:00-07:00")], "nextPageToken": "p2"},
+            {"items": [{"id": "x", "status": "cancelled"},
+                       event("b", "2026-05-03T10:00:00-07:00", "2026-05-03T11:00:00-07:00")]},
+        ]
+        events = self.store.iter_events(self.service, self.start, TZ.localize(datetime(2027, 1, 1)))
+        self.assertEqual(next(events)["id"], "a")
+        self.assertEqual(len(self.service.calls), 1)
+        self.assertEqual([e["id"] for e in events], ["b"])
+        self.assertEqual(self.service.calls[0]["orderBy"], "startTime")
+        self.assertEqual(self.service.calls[1]["pageToken"], "p2")
+        self.assertIsNone(self.store.window)
+        self.assertEqual(self.store.events, {})
+
+if __name__ == '__main__':
+    unittest.main()
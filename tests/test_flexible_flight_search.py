@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+from app.services.travel.search_cache import SearchCache
+from app.services.travel.search_flight import FlightSearch
+from app.services.travel.result_store import TravelResults
+
+def flight_group(price, number, departure):
+    return {
+        "price": price,
+        "flights": [{
+            "airline": "TAP",
+            "flight_number": number,
+            "duration": 420,
+            "departure_airport": {"name": "Newark", "id": "EWR", "time": f"{departure} 18:00"},
+            "arrival_airport": {"name": "Lisbon", "id": "LIS", "time": f"{departure} 23:00"}
+        }]
+    }
+
+PRICES = {"2030-05-06": 480, "2030-05-07": 350, "2030-05-08": 410}
+
+class TestFlexibleFlightSearch(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("app.services.travel.search_flight.settings.SERPAPI_API_KEY", "key")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.search = FlightSearch()
+        self.queries = []
+
+    async def fake_serpapi_get(self, params):
+        self.queries.append(params)
+        departure = params["outbound_date"]
+        if departure == "2030-05-08":
+            return {"error": "rate limited"}
+        group = flight_group(PRICES[departure], f"TP {departure[-2:]}", departure)
+        # SerpAPI repeats itineraries between best_flights and other_flights
+        return {"best_flights": [group], "other_flights": [group, flight_group(900, "UA 1", departure)]}
+
+    def run_search(self, travel_request=None, **kwargs):
+        with patch("app.services.travel.search_flight.serpapi_get", self.fake_serpapi_get), \
+                patch("app.services.travel.search_flight.flight_search_cache", SearchCache(None, ttl=60)):
+            return asyncio.run(self.search.search_flights_flexible({"origin": "ewr", "destination": "lis", **(travel_request or {})}, **kwargs))
+
+    def test_price_calendar_is_ranked_and_deduplicated(self):
+        result = self.run_search(earliest_departure="2030-05-06", latest_departure="2030-05-08")
+        self.assertEqual(len(self.queries), 3)
+        self.assertTrue(all(q["type"] == "2" and q["departure_id"] == "EWR" for q in self.queries))
+        calendar = result.split("\n\n")[0].split("\n")
+        self.assertEqual(calendar[1:], ["- Tue, May 07: $350", "- Mon, May 06: $480", "(1 date combination(s) could not be searched)"])
+        self.assertEqual(result.count("TAP - $350"), 1)
+
+    def test_filtered_search_stores_every_itinerary(self):
+        results = TravelResults()
+        result = self.run_search({"max_price": 500}, earliest_departure="2030-05-06", latest_departure="2030-05-07", results=results)
+        self.assertNotIn("$900", result)
+        self.assertEqual(sorted(i.price for i in results.flights), [350, 480, 900, 900])
+        # Loosening the filter afterwards finds the pricier flights without searching again
+        self.assertIn("TAP - $900", self.search.refine_results(results, {"sort_by": "price"}))
+        self.assertEqual(len(self.queries), 2)
+
+    def test_round_trip_lengths(self):
+        pairs = self.search._flexible_dates("2030-05-06", "2030-05-07", 3, 4)
+        self.assertEqual(pairs, [("2030-05-06", "2030-05-09"), ("2030-05-06", "2030-05-10"),
+                                 ("2030-05-07", "2030-05-10"), ("2030-05-07", "2030-05-11")])
+
+if __name__ == '__main__':
+    unittest.main()
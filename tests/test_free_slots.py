@@ -0,0 +1,71 @@
+import unittest
+from datetime import datetime, time, timedelta
+import pytz
+from utils.free_slots import find_free_slots, merge_intervals, parse_intervals, group_slots_by_day, rank_meeting_times
+
+TZ = pytz.timezone("America/New_York")
+
+def at(day, hour, minute=0):
+    return TZ.localize(datetime(2024, 5, day, hour, minute))
+
+class TestFreeSlots(unittest.TestCase):
+    def test_parse_and_merge(self):
+        busy = parse_intervals([
+            {"start": "2024-05-01T15:00:00Z", "end": "2024-05-01T16:00:00Z"},
+            {"start": "2024-05-01T13:00:00Z", "end": "2024-05-01T14:30:00Z"},
+            {"start": "2024-05-01T14:00:00Z", "end": "2024-05-01T15:00:00Z"},
+        ], TZ)
+        self.assertEqual(merge_intervals(busy), [(at(1, 9), at(1, 12))])
+
+    def test_busy_spilling_over_midnight_blocks_next_morning(self):
+        busy = [(at(1, 20), at(2, 10))]
+        slots = find_free_slots(at(1, 0), at(3, 0), busy, timedelta(minutes=30), TZ, working_hours=(9, 17))
+        self.assertEqual([(s["start"], s["end"]) for s in slots], [(at(1, 9), at(1, 17)), (at(2, 10), at(2, 17))])
+
+    def test_buffer_and_granularity(self):
+        busy = [(at(1, 10), at(1, 10, 50))]
+        slots = find_free_slots(at(1, 0), at(2, 0), busy, timedelta(minutes=30), TZ,
+                                working_hours=(9, 12), buffer=timedelta(minutes=10), granularity=timedelta(minutes=15))
+        self.assertEqual([(s["start"], s["end"]) for s in slots], [(at(1, 9), at(1, 9, 50)), (at(1, 11, 0), at(1, 12))])
+
+    def test_short_gaps_are_skipped(self):
+        busy = [(at(1, 9), at(1, 10)), (at(1, 10, 20), at(1, 17))]
+        self.assertEqual(find_free_slots(at(1, 0), at(2, 0), busy, timedelta(minutes=30), TZ, working_hours=(9, 17)), [])
+
+    def test_per_day_working_hours(self):
+        # 2024-05-04 is a Saturday
+        hours = {day: (9, 17) for day in range(5)}
+        hours[5] = (time(10), time(12))
+        hours[6] = None
+        slots = find_free_slots(at(3, 0), at(6, 0), [], timedelta(hours=1), TZ, working_hours=hours)
+        self.assertEqual([(s["start"], s["end"]) for s in slots], [(at(3, 9), at(3, 17)), (at(4, 10), at(4, 12))])
+
+    def test_long_window_groups_by_day(self):
+        busy = [(at(1, 9) + timedelta(days=d), at(1, 12) + timedelta(days=d)) for d in range(90)]
+        slots = find_free_slots(at(1, 0), at(1, 0) + timedelta(days=90), busy, timedelta(hours=1), TZ, working_hours=(9, 17))
+        days = group_slots_by_day(slots, TZ)
+        self.assertEqual(len(days), 90)
+        self.assertEqual(days[0][1], [(at(1, 12), at(1, 17))])
+
+    def test_rank_meeting_times_prefers_most_attendees(self):
+        busy = {
+            "me": [(at(1, 9), at(1, 10))],
+            "a": [(at(1, 11), at(1, 12))],
+            "b": [(at(1, 13), at(1, 17))],
+        }
+        ranked = rank_meeting_times(at(1, 0), at(2, 0), busy, timedelta(hours=1), TZ,
+                                    working_hours=(9, 17), granularity=timedelta(hours=1), required=["me"])
+        self.assertEqual(ranked[0], {"start": at(1, 10), "end": at(1, 11), "available": ["me", "a", "b"], "unavailable": []})
+        self.assertEqual((ranked[1]["start"], ranked[1]["end"]), (at(1, 12), at(1, 13)))
+        self.assertEqual(ranked[2]["unavailable"], ["a"])
+        self.assertEqual((ranked[3]["start"], ranked[3]["end"], ranked[3]["unavailable"]), (at(1, 13), at(1, 17), ["b"]))
+        self.assertTrue(all(slot["start"] >= at(1, 10) for slot in ranked))
+
+    def test_rank_meeting_times_honours_required_attendees(self):
+        busy = {"me": [], "a": [(at(1, 9), at(1, 16))], "b": [(at(1, 9), at(1, 10))]}
+        ranked = rank_meeting_times(at(1, 0), at(2, 0), busy, timedelta(hours=1), TZ,
+                                    working_hours=(9, 17), granularity=timedelta(hours=1), required=["me", "a"])
+        self.assertEqual([(r["start"], r["end"], r["available"]) for r in ranked], [(at(1, 16), at(1, 17), ["me", "a", "b"])])
+
+if __name__ == '__main__':
+    unittest.main()
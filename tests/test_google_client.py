@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from google.oauth2.credentials import Credentials
+from app.google_client import GoogleAuthManager, get_discovery_document
+
+def make_credentials(expiry):
+    return Credentials(
+        token="access-token",
+        refresh_token="refresh-token",
+        token_uri="https://oauth2.googleapis.com/token",
+        client_id="client-id",
+        client_secret="client-secret",
+        scopes=["https://www.googleapis.com/auth/calendar"],
+        expiry=expiry
+    )
+
+class TestGoogleAuthManagerCredentials(unittest.TestCase):
+    def setUp(self):
+        with patch("app.google_client.boto3"):
+            self.manager = GoogleAuthManager()
+        self.manager.kms_client = MagicMock()
+        self.manager.kms_client.generate_data_key.return_value = {
+            "Plaintext": os.urandom(32),
+            "CiphertextBlob": b"encrypted-data-key"
+        }
+        self.manager.table = MagicMock()
+        self.items = {}
+        self.manager.table.put_item.side_effect = lambda Item: self.items.__setitem__(Item["user_id"], Item)
+        self.manager.table.get_item.side_effect = lambda Key: (
+            {"Item": self.items[Key["user_id"]]} if Key["user_id"] in self.items else {}
+        )
+
+    def test_envelope_round_trip_uses_kms_once(self):
+        expiry = datetime.utcnow() + timedelta(hours=1)
+        self.assertTrue(self.manager.save_credentials("U1", make_credentials(expiry)))
+        self.assertTrue(self.manager.save_credentials("U2", make_credentials(expiry)))
+        self.manager.credential_cache.clear()
+
+        credentials = self.manager.get_credentials("U1")
+        self.assertEqual(credentials.token, "access-token")
+        self.assertEqual(credentials.expiry, expiry)
+        self.manager.kms_client.generate_data_key.assert_called_once()
+        self.manager.kms_client.encrypt.assert_not_called()
+        self.manager.kms_client.decrypt.assert_not_called()
+
+    def test_item_is_bound_to_user(self):
+        self.manager.save_credentials("U1", make_credentials(datetime.utcnow() + timedelta(hours=1)))
+        self.items["U2"] = dict(self.items["U1"], user_id="U2")
+        self.assertIsNone(self.manager.get_credentials("U2"))
+
+    def test_cached_credentials_skip_dynamodb(self):
+        self.manager.save_credentials("U1", make_credentials(datetime.utcnow() + timedelta(hours=1)))
+        self.manager.get_credentials("U1")
+        self.manager.table.get_item.assert_not_called()
+
+    def test_reads_items_encrypted_directly_with_kms(self):
+        manifest = {
+            "token": "legacy-token",
+            "refresh_token": "refresh-token",
+            "token_uri": "https://oauth2.googleapis.com/token",
+            "client_id": "client-id",
+            "client_secret": "client-secret",
+            "scopes": ["https://www.googleapis.com/auth/calendar"]
+        }
+        self.items["U1"] = {"user_id": "U1", "manifest_data": b"kms-ciphertext"}
+        self.manager.kms_client.decrypt.return_value = {"Plaintext": json.dumps(manifest).encode()}
+
+        credentials = self.manager.get_credentials("U1")
+        self.assertEqual(credentials.token, "legacy-token")
+        self.manager.kms_client.decrypt.assert_called_once()
+
+class TestProactiveRefresh(unittest.TestCase):
+    def setUp(self):
+        with patch("app.google_client.boto3"):
+            self.manager = GoogleAuthManager()
+        self.manager.table = MagicMock()
+        self.release = threading.Event()
+        self.refresh_calls = 0
+
+        def refresh(credentials, request):
+            self.refresh_calls += 1
+            self.release.wait(5)
+            credentials.token = "new-token"
+            credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+        patcher = patch.object(Credentials, "refresh", autospec=True, side_effect=refresh)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.release.set)
+        save = patch.object(self.manager, "save_credentials", return_value=True)
+        save.start()
+        self.addCleanup(save.stop)
+
+    def test_expiring_token_is_returned_without_waiting(self):
+        credentials = make_credentials(datetime.utcnow() + timedelta(minutes=4, seconds=30))
+        self.manager.credential_cache.set("U1", credentials)
+
+        self.assertEqual(self.manager.get_credentials("U1").token, "access-token")
+        future = self.manager.refresh_credentials("U1", credentials)
+        self.release.set()
+        self.assertTrue(future.result(5))
+        self.assertEqual(credentials.token, "new-token")
+        self.assertEqual(self.refresh_calls, 1)
+
+    def test_concurrent_refreshes_are_coalesced(self):
+        credentials = make_credentials(datetime.utcnow() - timedelta(minutes=1))
+        first = self.manager.refresh_credentials("U1", credentials)
+        second = self.manager.refresh_credentials("U1", credentials)
+        self.assertIs(first, second)
+        self.release.set()
+        first.result(5)
+        self.assertEqual(self.refresh_calls, 1)
+
+    def test_expired_token_blocks_until_refreshed(self):
+        credentials = make_credentials(datetime.utcnow() - timedelta(minutes=1))
+        self.manager.credential_cache.set("U1", credentials)
+        self.release.set()
+        self.assertEqual(self.manager.get_credentials("U1").token, "new-token")
+
+    def test_scheduler_refreshes_active_users_only(self):
+        expiring = make_credentials(datetime.utcnow() + timedelta(minutes=2))
+        self.manager.credential_cache.set("U1", expiring)
+        self.manager.credential_cache.set("U2", make_credentials(datetime.utcnow() + timedelta(minutes=2)))
+        self.manager.active_users.set("U1", True)
+        self.release.set()
+        self.assertEqual(self.manager.refresh_expiring_credentials(), 1)
+
+class TestGoogleServiceCache(unittest.TestCase):
+    def setUp(self):
+        with patch("app.google_client.boto3"), patch("app.google_client.settings.GOOGLE_SERVICE_CACHE_SIZE", 2):
+            self.manager = GoogleAuthManager()
+        credentials = make_credentials(datetime.utcnow() + timedelta(hours=1))
+        patcher = patch.object(self.manager, "get_credentials", return_value=credentials)
+        self.get_credentials = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_discovery_document_is_shared(self):
+        self.assertIs(get_discovery_document("calendar", "v3"), get_discovery_document("calendar", "v3"))
+
+    def test_services_are_cached_and_bounded(self):
+        service = self.manager.get_service("U1", "calendar", "v3")
+        self.assertIs(self.manager.get_service("U1", "calendar", "v3"), service)
+        self.manager.get_service("U2", "calendar", "v3")
+        self.manager.get_service("U3", "gmail", "v1")
+        self.assertEqual(self.manager.get_cache_stats()["services"]["size"], 2)
+        self.assertIsNot(self.manager.get_service("U1", "calendar", "v3"), service)
+
+    def test_invalidate_user(self):
+        service = self.manager.get_service("U1", "calendar", "v3")
+        other = self.manager.get_service("U2", "calendar", "v3")
+        self.manager.invalidate_user("U1")
+        self.assertIsNot(self.manager.get_service("U1", "calendar", "v3"), service)
+        self.assertIs(self.manager.get_service("U2", "calendar", "v3"), other)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+from unittest.mock import MagicMock, AsyncMock, patch
+from app.assistants.intent_classifier import EmbeddingIntentClassifier
+from app.services.document_retrieval.embedding_manager import EmbeddingManager
+
+VECTORS = {
+    "calendar description": [1.0, 0.0, 0.0],
+    "what's on my calendar": [0.9, 0.1, 0.0],
+    "email description": [0.0, 1.0, 0.0],
+    "send an email": [0.1, 0.9, 0.0],
+    "travel description": [0.0, 0.0, 1.0],
+    "check my calendar today": [0.95, 0.05, 0.0],
+    "send an email to bob": [0.0, 1.0, 0.1],
+    "yes, book the second one": [0.1, 0.0, 0.95],
+}
+
+PROTOTYPE_TEXTS = [
+    ("calendar", ["calendar description", "what's on my calendar"]),
+    ("email", ["email description", "send an email"]),
+    ("travel", ["travel description"]),
+]
+
+class TestEmbeddingIntentClassifier(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        EmbeddingIntentClassifier._prototypes = None
+        EmbeddingIntentClassifier._build_task = None
+        self.embedding_manager = MagicMock(spec=EmbeddingManager)
+        self.embedding_manager.generate_embeddings_async = AsyncMock(
+            side_effect=lambda texts: [VECTORS.get(text, [0.6, 0.6, 0.0]) for text in texts]
+        )
+        patcher = patch.object(EmbeddingIntentClassifier, "_prototype_texts", return_value=PROTOTYPE_TEXTS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.classifier = EmbeddingIntentClassifier(self.embedding_manager, margin_threshold=0.1, followup_max_words=8)
+
+    def tearDown(self):
+        EmbeddingIntentClassifier._prototypes = None
+        EmbeddingIntentClassifier._build_task = None
+
+    async def test_classifies_clear_message(self):
+        self.assertEqual(await self.classifier.classify("check my calendar today"), "calendar")
+
+    async def test_ambiguous_message_falls_back(self):
+        # Equally close to calendar and email, so the margin is below the threshold
+        self.assertIsNone(await self.classifier.classify("something ambiguous"))
+
+    async def test_short_follow_up_defers_to_thread_context(self):
+        # Read alone this looks like travel, but inside a calendar thread the LLM decides with context
+        self.assertEqual(await self.classifier.classify("yes, book the second one"), "travel")
+        self.assertIsNone(await self.classifier.classify("yes, book the second one", current_category="calendar"))
+        self.assertEqual(await self.classifier.classify("yes, book the second one", current_category="travel"), "travel")
+        self.assertEqual(await self.classifier.classify("yes, book the second one", current_category="general"), "travel")
+
+    async def test_longer_message_can_switch_category_mid_thread(self):
+        self.classifier.followup_max_words = 3
+        self.assertEqual(await self.classifier.classify("send an email to bob", current_category="calendar"), "email")
+
+    async def test_prototypes_embedded_once(self):
+        await self.classifier.classify("send an email to bob")
+        await self.classifier.classify("send an email to bob")
+        # One prototype batch plus one call per message
+        self.assertEqual(self.embedding_manager.generate_embeddings_async.await_count, 3)
+
+    def test_score_takes_best_row_per_category(self):
+        EmbeddingIntentClassifier._prototypes = self.classifier._normalize(
+            np.asarray([VECTORS[t] for _, texts in PROTOTYPE_TEXTS for t in texts])
+        )
+        EmbeddingIntentClassifier._categories = ["calendar", "email", "travel"]
+        EmbeddingIntentClassifier._segment_starts = np.asarray([0, 2, 4])
+        ranked = self.classifier.score([0.1, 0.9, 0.0])
+        self.assertEqual(ranked[0][0], "email")
+        self.assertAlmostEqual(ranked[0][1], 1.0, places=5)
+
+if __name__ == '__main__':
+    unittest.main()
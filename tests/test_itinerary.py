@@ -0,0 +1,61 @@
+import asyncio
+import unittest
+from datetime import time
+from unittest.mock import patch
+from app.services.travel.itinerary import Itinerary, filter_itineraries, parse_itineraries, rank_itineraries
+from app.services.travel.search_cache import SearchCache
+from app.services.travel.search_flight import FlightSearch
+from tests.travel_fixtures import FLIGHT_RESPONSE as RESPONSE
+
+class TestItinerary(unittest.TestCase):
+    def test_parses_both_lists_and_keeps_cheapest_duplicate(self):
+        itineraries = parse_itineraries(RESPONSE)
+        self.assertEqual(sorted(i.price for i in itineraries), [250, 300, 410])
+        united = next(i for i in itineraries if i.airline == "United")
+        self.assertEqual((united.stops, united.duration), (1, 480))
+        with self.assertRaises(AttributeError):
+            united.extra = True
+
+    def test_nonstops_after_five_pm(self):
+        matching = filter_itineraries(parse_itineraries(RESPONSE), max_stops=0, depart_after=time(17))
+        self.assertEqual([i.airline for i in matching], ["JetBlue"])
+
+    def test_filter_by_airline_and_price(self):
+        matching = filter_itineraries(parse_itineraries(RESPONSE), airlines=["delta", "united"], max_price=310)
+        self.assertEqual(sorted(i.price for i in matching), [250, 300])
+
+    def test_rank_and_limit(self):
+        itineraries = parse_itineraries(RESPONSE)
+        self.assertEqual([i.price for i in rank_itineraries(itineraries, "price", 2)], [250, 300])
+        self.assertEqual([i.price for i in rank_itineraries(itineraries, "duration")], [410, 300, 250])
+        self.assertEqual([i.price for i in rank_itineraries(itineraries, "departure")], [300, 250, 410])
+
+    def test_malformed_results_are_skipped(self):
+        self.assertIsNone(Itinerary.from_serpapi({"price": 100, "flights": [{"airline": "X"}]}))
+
+    def test_refinements_reuse_the_cached_search(self):
+        requests = []
+
+        async def fake_serpapi_get(params):
+            requests.append(params)
+            return RESPONSE
+
+        async def run():
+            search = FlightSearch()
+            request = {"origin": "JFK", "destination": "LAX", "departure_date": "2030-05-06"}
+            broad = await search.search_flights({**request, "max_duration": 0})
+            short = await search.search_flights({**request, "max_duration": 360})
+            return broad, short
+
+        with patch("app.services.travel.search_flight.settings.SERPAPI_API_KEY", "key"), \
+                patch("app.services.travel.search_flight.serpapi_get", fake_serpapi_get), \
+                patch("app.services.travel.search_flight.flight_search_cache", SearchCache(None, ttl=60)):
+            broad, short = asyncio.run(run())
+
+        self.assertEqual(len(requests), 1)
+        self.assertNotIn("max_duration", requests[0])
+        self.assertIn("United", broad)
+        self.assertNotIn("United", short)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.runtime import SlackRuntime
+import main
+
+class TestSlackRuntime(unittest.TestCase):
+    def setUp(self):
+        self.runtime = SlackRuntime()
+        self.addCleanup(asyncio.set_event_loop, None)
+        self.addCleanup(lambda: self.runtime.loop and self.runtime.loop.close())
+        self.create_slack_bot = MagicMock(return_value=MagicMock(name="slack_app"))
+        self.update_assistants = AsyncMock(return_value={})
+        self.handler_class = MagicMock()
+        self.handler_class.return_value.handle.side_effect = lambda event, context: {"statusCode": 200}
+        for target, value in (("main.runtime", self.runtime),
+                              ("app.runtime.create_slack_bot", self.create_slack_bot),
+                              ("app.runtime.update_assistants", self.update_assistants),
+                              ("app.runtime.SlackRequestHandler", self.handler_class),
+                              ("app.runtime.ConfigManager", MagicMock),
+                              ("app.runtime.initialize_google_auth", MagicMock()),
+                              ("app.runtime.settings.KMS_KEY_ID", "key")):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_warm_invocations_reuse_the_app(self):
+        with patch("app.runtime.settings.SYNC_ASSISTANTS_ON_COLD_START", False):
+            first = main.lambda_handler({"body": "one"}, None)
+            loop = self.runtime.loop
+            second = main.lambda_handler({"body": "two"}, None)
+
+        self.assertEqual((first, second), ({"statusCode": 200}, {"statusCode": 200}))
+        self.create_slack_bot.assert_called_once()
+        self.handler_class.assert_called_once_with(self.create_slack_bot.return_value)
+        self.assertEqual(self.handler_class.return_value.handle.call_count, 2)
+        self.assertIs(self.runtime.loop, loop)
+        self.update_assistants.assert_not_awaited()
+
+    def test_sync_on_cold_start_when_enabled(self):
+        with patch("app.runtime.settings.SYNC_ASSISTANTS_ON_COLD_START", True):
+            main.lambda_handler({"body": "one"}, None)
+            main.lambda_handler({"body": "two"}, None)
+
+        self.update_assistants.assert_awaited_once()
+        self.create_slack_bot.assert_called_once()
+
+    def test_sync_event_syncs_without_handling_a_request(self):
+        with patch("app.runtime.settings.SYNC_ASSISTANTS_ON_COLD_START", False):
+            response = main.lambda_handler({"sync_assistants": True}, None)
+            main.lambda_handler({"body": "one"}, None)
+
+        self.assertEqual(response["statusCode"], 200)
+        self.update_assistants.assert_awaited_once()
+        self.create_slack_bot.assert_called_once()
+        self.handler_class.return_value.handle.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
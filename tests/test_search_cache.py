@@ -0,0 +1,108 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import httpx
+from app.services.travel.http_client import serpapi_get
+from app.services.travel.search_cache import SearchCache, search_cache_key
+
+class TestSearchCache(unittest.TestCase):
+    def setUp(self):
+        handle, self.db_file = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        self.addCleanup(os.remove, self.db_file)
+
+    def test_key_ignores_api_key_and_param_order(self):
+        first = search_cache_key({"engine": "google_flights", "api_key": "secret", "adults": 1, "stops": ""})
+        second = search_cache_key({"adults": "1", "api_key": "other", "engine": "google_flights"})
+        self.assertEqual(first, second)
+        self.assertNotIn("secret", first)
+
+    def test_results_survive_restart(self):
+        async def first():
+            return {"best_flights": [1]}
+
+        async def second():
+            fetches.append(1)
+            return {}
+
+        fetches = []
+        asyncio.run(SearchCache(self.db_file, ttl=60).get_or_fetch({"q": "SFO"}, first))
+        data = asyncio.run(SearchCache(self.db_file, ttl=60).get_or_fetch({"q": "SFO"}, second))
+        self.assertEqual(data, {"best_flights": [1]})
+        self.assertEqual(fetches, [])
+
+    def test_errors_are_not_cached(self):
+        async def failed():
+            return {"error": "rate limited"}
+
+        async def succeeded():
+            return {"ok": True}
+
+        async def run():
+            cache = SearchCache(None, ttl=60)
+            await cache.get_or_fetch({"q": "SFO"}, failed)
+            return await cache.get_or_fetch({"q": "SFO"}, succeeded)
+
+        self.assertEqual(asyncio.run(run()), {"ok": True})
+
+    def test_concurrent_searches_are_coalesced(self):
+        fetches = []
+
+        async def fetch():
+            fetches.append(1)
+            await asyncio.sleep(0.01)
+            return {"best_flights": []}
+
+        async def run():
+            cache = SearchCache(None, ttl=60)
+            return await asyncio.gather(*(cache.get_or_fetch({"q": "SFO"}, fetch) for _ in range(3)))
+
+        self.assertEqual(asyncio.run(run()), [{"best_flights": []}] * 3)
+        self.assertEqual(fetches, [1])
+
+class TestSerpAPIRetries(unittest.TestCase):
+    def setUp(self):
+        for name, value in (("SERPAPI_RETRY_BASE_DELAY", 0), ("SERPAPI_MAX_RETRIES", 2)):
+            patcher = patch(f"app.services.travel.http_client.settings.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_with(self, statuses, body=None):
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.params["q"])
+            status = statuses[len(calls) - 1]
+            if status >= 400 and body is not None:
+                return httpx.Response(status, **body)
+            return httpx.Response(status, json={"ok": True})
+
+        async def run():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            with patch("app.services.travel.http_client.get_travel_http_client", return_value=client):
+                return await serpapi_get({"q": "SFO"})
+
+        return asyncio.run(run()), calls
+
+    def test_retries_rate_limits_and_server_errors(self):
+        data, calls = self.run_with([429, 503, 200])
+        self.assertEqual(data, {"ok": True})
+        self.assertEqual(len(calls), 3)
+
+    def test_gives_up_after_max_retries(self):
+        with self.assertRaises(httpx.HTTPStatusError):
+            self.run_with([500, 500, 500])
+
+    def test_client_errors_are_not_retried(self):
+        with self.assertRaises(httpx.HTTPStatusError):
+            self.run_with([400], {"text": "Bad Request"})
+
+    def test_client_error_body_is_returned(self):
+        data, calls = self.run_with([401], {"json": {"error": "Invalid API key."}})
+        self.assertEqual(data, {"error": "Invalid API key."})
+        self.assertEqual(len(calls), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+from app.services.api_integrations.travel_integration import TravelIntegration
+from app.services.travel.result_store import TravelResultStore
+from tests.travel_fixtures import FLIGHT_RESPONSE as FLIGHTS
+
+HOTELS = {
+    "properties": [
+        {"name": "Hotel A", "property_token": "tok-a", "rate_per_night": {"lowest": "$300", "extracted_lowest": 300},
+         "overall_rating": 4.6, "reviews": 900, "extracted_hotel_class": 5},
+        {"name": "Hotel B", "property_token": "tok-b", "rate_per_night": {"lowest": "$120", "extracted_lowest": 120},
+         "overall_rating": 4.1, "reviews": 300, "extracted_hotel_class": 3},
+    ]
+}
+
+class TestTravelResultStore(unittest.TestCase):
+    def setUp(self):
+        for target, value in (("app.services.travel.search_flight.settings.SERPAPI_API_KEY", "key"),
+                              ("app.services.travel.search_hotel.settings.SERPAPI_API_KEY", "key"),
+                              ("app.services.api_integrations.travel_integration.travel_result_store", TravelResultStore())):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.integration = TravelIntegration()
+        self.requests = []
+
+    async def fake_serpapi_get(self, params):
+        self.requests.append(params)
+        if params.get("property_token"):
+            return {"name": "Hotel B", "phone": "555-0100", "check_in_date": params.get("check_in_date")}
+        return HOTELS if params["engine"] == "google_hotels" else FLIGHTS
+
+    def run_calls(self, *calls):
+        async def run():
+            outputs = []
+            for function_name, params in calls:
+                outputs.append(await self.integration.execute(function_name, {**params, "conversation_key": "U1:123", "user_id": "U1"}))
+            return outputs
+
+        with patch("app.services.travel.search_flight.serpapi_get", self.fake_serpapi_get), \
+                patch("app.services.travel.search_hotel.serpapi_get", self.fake_serpapi_get), \
+                patch("app.services.travel.search_flight.flight_search_cache.get_or_fetch", lambda params, fetch: fetch()):
+            return asyncio.run(run())
+
+    def test_flight_refinement_keeps_option_numbers_without_new_requests(self):
+        search, refined, details = self.run_calls(
+            ("search_flights", {"origin": "JFK", "destination": "LAX", "departure_date": "2030-05-06"}),
+            ("refine_flight_results", {"max_stops": 0, "depart_after": "17:00", "sort_by": "price", "page": 1}),
+            ("get_travel_option_details", {"kind": "flight", "option": 3}),
+        )
+        self.assertTrue(search.startswith("1. United - $250"))
+        self.assertTrue(refined.startswith("3. JetBlue - $410"))
+        self.assertIn("Flights: B6 23", details)
+        self.assertEqual(len(self.requests), 1)
+
+    def test_hotel_details_use_stored_property_token_once(self):
+        outputs = self.run_calls(
+            ("search_hotels", {"destination": "Lisbon", "check_in": "2030-05-06", "check_out": "2030-05-09"}),
+            ("refine_hotel_results", {"max_price": 200, "min_rating": 0, "min_class": 0, "sort_by": "price", "page": 1}),
+            ("get_travel_option_details", {"kind": "hotel", "option": 2}),
+            ("get_travel_option_details", {"kind": "hotel", "option": 2}),
+        )
+        self.assertTrue(outputs[1].startswith("2. Hotel B"))
+        self.assertIn("Phone: 555-0100", outputs[2])
+        self.assertEqual(outputs[2], outputs[3])
+        detail_requests = [r for r in self.requests if r.get("property_token")]
+        self.assertEqual(len(detail_requests), 1)
+        self.assertEqual((detail_requests[0]["property_token"], detail_requests[0]["check_in_date"]), ("tok-b", "2030-05-06"))
+
+    def test_refining_without_results(self):
+        output, = self.run_calls(("refine_hotel_results", {"sort_by": "price", "page": 1}))
+        self.assertIn("Search for hotels first", output)
+
+if __name__ == '__main__':
+    unittest.main()
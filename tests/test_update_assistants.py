@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from app.assistants.assistant_factory import AssistantFactory
+from app.assistants.assistant_registry import AssistantRegistry
+from app.assistants.update_assistants import sync_assistants
+
+SPECS = {
+    name: {"name": name, "instructions": f"You are {name}.", "tools": [{"type": "function", "function": {"name": "search"}}], "model": "gpt-4o"}
+    for name in ["TravelAssistant", "CalendarAssistant", "GmailAssistant"]
+}
+
+class FakeAssistantManager:
+    def __init__(self, remote):
+        self.remote = remote
+        self.registry = AssistantRegistry(ttl=60)
+        self.registry._seeded = True
+        self.created = []
+        self.updated = []
+
+    async def list_assistant_objects(self):
+        return list(self.remote)
+
+    async def create_assistant(self, name, instructions, tools, model, metadata=None):
+        self.created.append((name, metadata))
+        return SimpleNamespace(id=f"asst_new_{name}", name=name, metadata=metadata)
+
+    async def update_assistant(self, assistant_id, **fields):
+        self.updated.append((assistant_id, fields))
+
+class TestConfigHash(unittest.TestCase):
+    def test_hash_is_stable_and_tracks_config_changes(self):
+        spec = SPECS["TravelAssistant"]
+        reordered = {"model": spec["model"], "tools": spec["tools"], "instructions": spec["instructions"], "name": "Other"}
+        self.assertEqual(AssistantFactory.compute_config_hash(spec), AssistantFactory.compute_config_hash(reordered))
+        for field, value in (("instructions", "Changed."), ("tools", []), ("model", "gpt-4o-mini")):
+            self.assertNotEqual(AssistantFactory.compute_config_hash(spec),
+                                AssistantFactory.compute_config_hash({**spec, field: value}))
+
+class TestSyncAssistants(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        manifest_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(manifest_dir.cleanup)
+        self.manifest_path = os.path.join(manifest_dir.name, "assistant_manifest.json")
+        patcher = patch("app.assistants.update_assistants.AssistantFactory.get_assistant_spec", side_effect=SPECS.__getitem__)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch("app.assistants.update_assistants.AssistantConfig.get_all_assistant_names", return_value=list(SPECS))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def remote_assistant(self, name, config_hash):
+        return SimpleNamespace(id=f"asst_{name}", name=name, metadata={"config_hash": config_hash, "owner": "ops"})
+
+    async def test_creates_updates_and_skips_by_hash(self):
+        travel_hash = AssistantFactory.compute_config_hash(SPECS["TravelAssistant"])
+        manager = FakeAssistantManager([
+            self.remote_assistant("TravelAssistant", travel_hash),
+            self.remote_assistant("CalendarAssistant", "outdated"),
+        ])
+
+        manifest = await sync_assistants(manager, manifest_path=self.manifest_path)
+
+        self.assertEqual([name for name, _ in manager.created], ["GmailAssistant"])
+        self.assertEqual(manager.created[0][1], {"config_hash": AssistantFactory.compute_config_hash(SPECS["GmailAssistant"])})
+        self.assertEqual(len(manager.updated), 1)
+        assistant_id, fields = manager.updated[0]
+        self.assertEqual(assistant_id, "asst_CalendarAssistant")
+        self.assertEqual(fields["metadata"], {"owner": "ops", "config_hash": AssistantFactory.compute_config_hash(SPECS["CalendarAssistant"])})
+        self.assertEqual({name: entry["id"] for name, entry in manifest.items()}, {
+            "TravelAssistant": "asst_TravelAssistant",
+            "CalendarAssistant": "asst_CalendarAssistant",
+            "GmailAssistant": "asst_new_GmailAssistant",
+        })
+        self.assertEqual(manager.registry.get("GmailAssistant"), "asst_new_GmailAssistant")
+
+        with open(self.manifest_path) as file:
+            self.assertEqual(json.load(file), manifest)
+
+    async def test_unchanged_assistants_make_no_writes(self):
+        manager = FakeAssistantManager([
+            self.remote_assistant(name, AssistantFactory.compute_config_hash(spec)) for name, spec in SPECS.items()
+        ])
+        manifest = await sync_assistants(manager, manifest_path=self.manifest_path)
+        self.assertEqual((manager.created, manager.updated), ([], []))
+        self.assertEqual(set(manifest), set(SPECS))
+
+    async def test_partial_sync_keeps_other_manifest_entries(self):
+        with open(self.manifest_path, "w") as file:
+            json.dump({"GmailAssistant": {"id": "asst_old_gmail", "config_hash": "x"}}, file)
+        manager = FakeAssistantManager([])
+        manifest = await sync_assistants(manager, ["TravelAssistant"], self.manifest_path)
+        self.assertEqual(manifest["GmailAssistant"]["id"], "asst_old_gmail")
+        self.assertEqual(manifest["TravelAssistant"]["id"], "asst_new_TravelAssistant")
+
+if __name__ == '__main__':
+    unittest.main()
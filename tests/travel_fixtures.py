@@ -0,0 +1,23 @@
+"""SerpAPI responses shared by the travel tests"""
+
+def leg(airline, number, departs, arrives, duration):
+    return {
+        "airline": airline,
+        "flight_number": number,
+        "duration": duration,
+        "departure_airport": {"name": "JFK", "id": "JFK", "time": f"2030-05-06 {departs}"},
+        "arrival_airport": {"name": "LAX", "id": "LAX", "time": f"2030-05-06 {arrives}"}
+    }
+
+FLIGHT_RESPONSE = {
+    "best_flights": [
+        {"price": 320, "total_duration": 360, "flights": [leg("Delta", "DL 1", "08:00", "11:00", 360)]},
+    ],
+    "other_flights": [
+        {"price": 300, "total_duration": 360, "flights": [leg("Delta", "DL 1", "08:00", "11:00", 360)]},
+        {"price": 250, "total_duration": 480, "flights": [leg("United", "UA 5", "18:30", "20:00", 210),
+                                                          leg("United", "UA 6", "21:00", "23:30", 210)]},
+        {"price": 410, "total_duration": 350, "flights": [leg("JetBlue", "B6 23", "19:15", "22:05", 350)]},
+        {"price": 999, "flights": []},
+    ]
+}
@@ -0,0 +1,155 @@
+import re
+
+SECTION_TEXT_LIMIT = 3000
+HEADER_TEXT_LIMIT = 150
+FALLBACK_TEXT_LIMIT = 150
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+DIVIDER_PATTERN = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+BULLET_PATTERN = re.compile(r'^(\s*)[-*+]\s+(.*)$')
+FIELD_PATTERN = re.compile(r'^(\s*)([A-Z][A-Za-z0-9 /-]{0,30}):(\s+.*)?$')
+LINK_PATTERN = re.compile(r'\[([^\]]+)\]\((https?://[^\s)]+)\)')
+BOLD_PATTERN = re.compile(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1')
+STRIKE_PATTERN = re.compile(r'~~(?=\S)(.+?)(?<=\S)~~')
+INLINE_CODE_PATTERN = re.compile(r'(`[^`]+`)')
+
+def escape_mrkdwn(text):
+    """
+    Escape the characters Slack treats as control sequences.
+    """
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+def _convert_inline(text):
+    # Inline code spans are kept verbatim; markdown is only converted outside them
+    parts = INLINE_CODE_PATTERN.split(text)
+    for i, part in enumerate(parts):
+        if i % 2 == 1:
+            parts[i] = escape_mrkdwn(part)
+            continue
+        part = escape_mrkdwn(part)
+        part = LINK_PATTERN.sub(lambda m: f"<{m.group(2)}|{m.group(1)}>", part)
+        part = BOLD_PATTERN.sub(r'*\2*', part)
+        part = STRIKE_PATTERN.sub(r'~\1~', part)
+        parts[i] = part
+    return ''.join(parts)
+
+def _convert_line(line):
+    bullet = BULLET_PATTERN.match(line)
+    if bullet:
+        indent, content = bullet.groups()
+        depth = len(indent.expandtabs(4)) // 2
+        marker = '•' if depth == 0 else '–'
+        return f"{'    ' * depth}{marker} {_convert_field(content)}"
+    return _convert_field(line)
+
+def _convert_field(line):
+    # "Title: Standup" style lines from the calendar and travel formatters get a bold label
+    field = FIELD_PATTERN.match(line)
+    if field and field.group(3):
+        indent, label, value = field.groups()
+        return f"{indent}*{escape_mrkdwn(label)}:*{_convert_inline(value)}"
+    return _convert_inline(line)
+
+def _split_text(text, limit=SECTION_TEXT_LIMIT):
+    """
+    Split text into chunks under the limit, preferring paragraph and line boundaries.
+    """
+    chunks = []
+    current = ''
+    for line in text.split('\n'):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.append(line[:limit])
+            line = line[limit:]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = candidate
+    if current.strip():
+        chunks.append(current)
+    return [chunk.strip('\n') for chunk in chunks if chunk.strip()]
+
+def _section(text):
+    return {"type": "section", "text": {"type": "mrkdwn", "text": text}}
+
+def _header(text):
+    return {"type": "header", "text": {"type": "plain_text", "text": text[:HEADER_TEXT_LIMIT], "emoji": False}}
+
+def markdown_to_blocks(message):
+    """
+    Convert a markdown-ish message into a list of Block Kit blocks.
+
+    :param message: Message text using markdown headings, lists, links, code and dividers.
+    :return: List of header, section and divider blocks with no text over Slack's limits.
+    """
+    blocks = []
+    buffer = []
+
+    def flush():
+        text = '\n'.join(buffer).strip('\n')
+        buffer.clear()
+        for chunk in _split_text(text):
+            blocks.append(_section(chunk))
+
+    lines = message.replace('\r\n', '\n').split('\n')
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+
+        if line.strip().startswith('```'):
+            flush()
+            code_lines = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith('```'):
+                code_lines.append(lines[i])
+                i += 1
+            # Leave room for the fences when chunking long code blocks
+            for chunk in _split_text(escape_mrkdwn('\n'.join(code_lines)), SECTION_TEXT_LIMIT - 8):
+                blocks.append(_section(f"```\n{chunk}\n```"))
+            i += 1
+            continue
+
+        if DIVIDER_PATTERN.match(line):
+            flush()
+            blocks.append({"type": "divider"})
+        else:
+            heading = HEADING_PATTERN.match(line)
+            if heading:
+                flush()
+                level, title = len(heading.group(1)), heading.group(2)
+                if not title:
+                    pass
+                elif level <= 2:
+                    blocks.append(_header(title))
+                else:
+                    blocks.append(_section(f"*{_convert_inline(title)}*"))
+            else:
+                buffer.append(_convert_line(line))
+        i += 1
+
+    flush()
+    return blocks
+
+def fallback_text(message, limit=FALLBACK_TEXT_LIMIT):
+    """
+    Plain-text summary used for notifications and clients without Block Kit.
+    """
+    text = LINK_PATTERN.sub(r'\1', message)
+    text = BOLD_PATTERN.sub(r'\2', text)
+    text = re.sub(r'^\s*#{1,6}\s+', '', text, flags=re.MULTILINE)
+    text = ' '.join(text.split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + '...'
+
+def render_message(message, channel):
+    """
+    Build a chat.postMessage payload for the message.
+    """
+    return {
+        "channel": channel,
+        "text": fallback_text(message),
+        "blocks": markdown_to_blocks(message)
+    }
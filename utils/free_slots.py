@@ -0,0 +1,192 @@
+from datetime import datetime, date, time, timedelta, tzinfo
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+Interval = Tuple[datetime, datetime]
+HoursSpec = Optional[Tuple[Union[int, time], Union[int, time]]]
+WorkingHours = Union[HoursSpec, Dict[int, HoursSpec]]
+
+def _localize(tz: tzinfo, naive: datetime) -> datetime:
+    # pytz zones need localize() to pick the right offset; zoneinfo zones can be attached directly
+    return tz.localize(naive) if hasattr(tz, 'localize') else naive.replace(tzinfo=tz)
+
+def _as_time(value: Union[int, time]) -> time:
+    return value if isinstance(value, time) else time(value % 24)
+
+def parse_intervals(busy_times: Iterable[Dict[str, str]], tz: tzinfo) -> List[Interval]:
+    """
+    Parse freebusy-style {'start', 'end'} ISO strings once and sort them by start.
+
+    :param busy_times: Busy periods as returned by the freebusy API.
+    :param tz: Timezone the intervals are converted to.
+    :return: Sorted list of (start, end) datetimes.
+    """
+    intervals = []
+    for busy in busy_times:
+        start = datetime.fromisoformat(busy['start'])
+        end = datetime.fromisoformat(busy['end'])
+        start = start.astimezone(tz) if start.tzinfo else _localize(tz, start)
+        end = end.astimezone(tz) if end.tzinfo else _localize(tz, end)
+        if end > start:
+            intervals.append((start, end))
+    intervals.sort()
+    return intervals
+
+def merge_intervals(intervals: Iterable[Interval], buffer: timedelta = timedelta(0)) -> List[Interval]:
+    """
+    Merge overlapping or touching intervals, padding each by the buffer first.
+
+    :param intervals: (start, end) pairs, sorted by start.
+    :param buffer: Time kept free before and after every busy interval.
+    :return: Sorted, disjoint intervals.
+    """
+    merged: List[Interval] = []
+    for start, end in intervals:
+        start, end = start - buffer, end + buffer
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+def working_windows(start: datetime, end: datetime, working_hours: WorkingHours, tz: tzinfo) -> Iterator[Interval]:
+    """
+    Yield the working-hour windows between start and end, one per day.
+
+    :param working_hours: (start, end) hours or times for every day, a dict of
+        weekday (0 = Monday) to (start, end) or None for a day off, or None for the whole day.
+        An end at or before the start means the window runs past midnight.
+    """
+    current_date: date = start.astimezone(tz).date() - timedelta(days=1)
+    last_date: date = end.astimezone(tz).date()
+    while current_date <= last_date:
+        hours = working_hours.get(current_date.weekday()) if isinstance(working_hours, dict) else working_hours
+        if isinstance(working_hours, dict) and hours is None:
+            current_date += timedelta(days=1)
+            continue
+
+        day_start_time, day_end_time = (time(0), time(0)) if hours is None else (_as_time(hours[0]), _as_time(hours[1]))
+        day_start = _localize(tz, datetime.combine(current_date, day_start_time))
+        end_date = current_date + timedelta(days=1) if day_end_time <= day_start_time else current_date
+        day_end = _localize(tz, datetime.combine(end_date, day_end_time))
+
+        window_start, window_end = max(day_start, start), min(day_end, end)
+        if window_start < window_end:
+            yield window_start, window_end
+        current_date += timedelta(days=1)
+
+def _align(moment: datetime, granularity: timedelta, tz: tzinfo) -> datetime:
+    """Round up to the next multiple of granularity after local midnight"""
+    local = moment.astimezone(tz)
+    midnight = _localize(tz, datetime.combine(local.date(), time(0)))
+    steps = -(-(local - midnight) // granularity)
+    return midnight + steps * granularity
+
+def find_free_slots(start: datetime, end: datetime, busy: Iterable[Interval], duration: timedelta,
+                    tz: tzinfo, working_hours: WorkingHours = None, buffer: timedelta = timedelta(0),
+                    granularity: Optional[timedelta] = None) -> List[Dict[str, Any]]:
+    """
+    Find free windows long enough for the duration in a single sweep.
+
+    Busy intervals are merged once and walked with a pointer that only moves
+    forward, so the cost is O(busy log busy + days) for any window length.
+
+    :param start: Start of the search window (timezone-aware).
+    :param end: End of the search window (timezone-aware).
+    :param busy: Busy (start, end) intervals in any order, e.g. from parse_intervals.
+    :param duration: Minimum length of a free window.
+    :param tz: Timezone used for working hours and alignment.
+    :param working_hours: See working_windows.
+    :param buffer: Time kept free around every busy interval.
+    :param granularity: Free windows start on multiples of this after midnight, e.g. 15 minutes.
+    :return: List of {'start', 'end'} dicts, sorted by start.
+    """
+    merged = merge_intervals(sorted(busy), buffer)
+    slots = []
+    i = 0
+    for window_start, window_end in working_windows(start, end, working_hours, tz):
+        # Busy intervals that ended before this window can't affect any later window either
+        while i < len(merged) and merged[i][1] <= window_start:
+            i += 1
+
+        cursor = window_start
+        j = i
+        while cursor < window_end:
+            gap_end = window_end
+            if j < len(merged) and merged[j][0] < window_end:
+                gap_end = max(merged[j][0], cursor)
+
+            slot_start = _align(cursor, granularity, tz) if granularity else cursor
+            if slot_start + duration <= gap_end:
+                slots.append({"start": slot_start, "end": gap_end})
+
+            if gap_end >= window_end:
+                break
+            cursor = max(cursor, merged[j][1])
+            j += 1
+    return slots
+
+def group_slots_by_day(slots: List[Dict[str, Any]], tz: tzinfo) -> List[Tuple[date, List[Interval]]]:
+    """Group {'start', 'end'} slots by their local start date"""
+    days: List[Tuple[date, List[Interval]]] = []
+    for slot in slots:
+        day = slot["start"].astimezone(tz).date()
+        if not days or days[-1][0] != day:
+            days.append((day, []))
+        days[-1][1].append((slot["start"], slot["end"]))
+    return days
+
+def _overlaps(starts: List[datetime], ends: List[datetime], start: datetime, end: datetime) -> bool:
+    # First merged interval ending after start is the only one that can overlap [start, end)
+    index = bisect_right(ends, start)
+    return index < len(starts) and starts[index] < end
+
+def rank_meeting_times(start: datetime, end: datetime, busy_by_attendee: Dict[str, Iterable[Interval]],
+                       duration: timedelta, tz: tzinfo, working_hours: WorkingHours = None,
+                       buffer: timedelta = timedelta(0), granularity: timedelta = timedelta(minutes=30),
+                       required: Iterable[str] = (), limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Rank meeting times for a group by how many attendees are free.
+
+    Candidate starts are stepped by granularity through the working windows.
+    Consecutive candidates with the same set of free attendees are collapsed
+    into one range, and ranges are ordered by attendee count, then by time.
+
+    :param busy_by_attendee: Busy intervals per attendee.
+    :param required: Attendees who must be free for a time to be offered.
+    :param limit: Maximum number of ranges to return.
+    :return: List of {'start', 'end', 'available', 'unavailable'} dicts, where start..end is
+        the range of possible start times extended by the duration.
+    """
+    attendees = list(busy_by_attendee)
+    required = set(required)
+    merged = {}
+    for attendee, intervals in busy_by_attendee.items():
+        intervals = merge_intervals(sorted(intervals), buffer)
+        merged[attendee] = ([s for s, _ in intervals], [e for _, e in intervals])
+
+    ranges: List[Dict[str, Any]] = []
+    for window_start, window_end in working_windows(start, end, working_hours, tz):
+        candidate = _align(window_start, granularity, tz)
+        current = None
+        while candidate + duration <= window_end:
+            candidate_end = candidate + duration
+            available = [a for a in attendees if not _overlaps(*merged[a], candidate, candidate_end)]
+            if required.issubset(available) and available:
+                if current is not None and current["available"] == available and current["end"] == candidate_end - granularity:
+                    current["end"] = candidate_end
+                else:
+                    current = {
+                        "start": candidate,
+                        "end": candidate_end,
+                        "available": available,
+                        "unavailable": [a for a in attendees if a not in available]
+                    }
+                    ranges.append(current)
+            else:
+                current = None
+            candidate += granularity
+
+    ranges.sort(key=lambda r: (-len(r["available"]), r["start"]))
+    return ranges[:limit]
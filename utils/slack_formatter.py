@@ -2,6 +2,8 @@ import json
 import re
 from typing import Dict, Any, List
 from app.openai_helper import OpenAIClient
+from app.config.settings import settings
+from utils.block_kit import render_message
 from utils.logger import logger
 
 class SlackMessageFormatter:
@@ -21,6 +23,17 @@ class SlackMessageFormatter:
         return self.emoji_pattern.sub(r'', text)
 
     async def format_message(self, message: str, channel: str) -> Dict[str, Any]:
+        if settings.SLACK_LLM_FORMATTING:
+            return await self._format_with_llm(message, channel)
+        try:
+            formatted_message = self.remove_emojis_from_dict(render_message(message, channel))
+            logger.debug(f"Formatted Slack message: {formatted_message}")
+            return formatted_message
+        except Exception as e:
+            logger.error(f"Error formatting Slack message: {e}")
+            return self._fallback_format(message, channel)
+
+    async def _format_with_llm(self, message: str, channel: str) -> Dict[str, Any]:
         prompt = f"""
         Format the following message for Slack using block kit. The output should be a valid JSON object that can be directly used with the Slack API. Use appropriate block types, including sections, dividers, and context blocks where necessary. Ensure the formatting enhances readability and engagement. Do not use any emojis in the formatting.
 
@@ -52,7 +65,7 @@ class SlackMessageFormatter:
         """
 
         try:
-            response = self.openai_client.generate_text(prompt)
+            response = await self.openai_client.generate_text(prompt)
             # Attempt to find and extract the JSON object from the response
             json_start = response.find('{')
             json_end = response.rfind('}') + 1